@@ -7,14 +7,29 @@
 """
 
 import hashlib
+import re
 import secrets
 import jwt
 import logging
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Dict, Optional, Any
 
 logger = logging.getLogger(__name__)
 
+# 邮箱与用户名格式，模块加载时编译一次
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+# 用户名长度3-30，只能包含字母、数字、下划线
+_USERNAME_RE = re.compile(r'^[a-zA-Z0-9_]{3,30}$')
+
+# 已验证凭据缓存的条目上限和有效秒数
+CREDENTIAL_CACHE_SIZE = 4096
+CREDENTIAL_CACHE_TTL = 3600
+
 
 class PasswordManager:
     """密码管理器"""
@@ -76,6 +91,73 @@ class PasswordManager:
             return False
 
 
+class CredentialCache:
+    """
+    已验证凭据缓存
+    
+    bcrypt验证是登录中最耗时的一步，同一用户在有效期内用相同密码再次登录时跳过验证。
+    键包含用户当前的密码哈希，修改密码后旧条目自然不再命中；
+    密码只以进程内随机密钥的keyed哈希形式保存，不保存明文
+    """
+    
+    def __init__(self, max_items: int = CREDENTIAL_CACHE_SIZE, ttl: int = CREDENTIAL_CACHE_TTL):
+        """
+        初始化凭据缓存
+        
+        Args:
+            max_items: 最多缓存的凭据数量
+            ttl: 凭据缓存的有效秒数
+        """
+        self.max_items = max_items
+        self.ttl = ttl
+        self._key = secrets.token_bytes(32)
+        self._entries: "OrderedDict[tuple, float]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def _make_key(self, user_id: str, password_hash: str, password: str) -> tuple:
+        """生成缓存键"""
+        digest = hashlib.blake2b(password.encode('utf-8'), key=self._key, digest_size=32).digest()
+        return user_id, password_hash, digest
+    
+    def contains(self, user_id: str, password_hash: str, password: str) -> bool:
+        """
+        凭据是否在有效期内验证通过过
+        
+        Args:
+            user_id: 用户ID
+            password_hash: 用户当前的密码哈希
+            password: 原始密码
+            
+        Returns:
+            bool: 是否命中缓存
+        """
+        key = self._make_key(user_id, password_hash, password)
+        with self._lock:
+            expires_at = self._entries.get(key)
+            if expires_at is None:
+                return False
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return False
+            self._entries.move_to_end(key)
+            return True
+    
+    def add(self, user_id: str, password_hash: str, password: str):
+        """记录一次验证通过的凭据，超出上限时淘汰最久未使用的条目"""
+        key = self._make_key(user_id, password_hash, password)
+        with self._lock:
+            self._entries[key] = time.monotonic() + self.ttl
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_items:
+                self._entries.popitem(last=False)
+    
+    def invalidate(self, user_id: str):
+        """清除用户的全部缓存凭据（修改密码、删除账户时调用）"""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == user_id]:
+                del self._entries[key]
+
+
 class TokenManager:
     """JWT令牌管理器"""
     
@@ -252,6 +334,7 @@ class AuthUtils:
         return str(uuid.uuid4())
     
     @staticmethod
+    @lru_cache(maxsize=4096)
     def validate_email(email: str) -> bool:
         """
         验证邮箱格式
@@ -262,11 +345,10 @@ class AuthUtils:
         Returns:
             bool: 邮箱格式是否有效
         """
-        import re
-        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        return re.match(pattern, email) is not None
+        return _EMAIL_RE.match(email) is not None
     
     @staticmethod
+    @lru_cache(maxsize=4096)
     def validate_username(username: str) -> bool:
         """
         验证用户名格式
@@ -277,10 +359,7 @@ class AuthUtils:
         Returns:
             bool: 用户名格式是否有效
         """
-        import re
-        # 用户名长度3-30，只能包含字母、数字、下划线
-        pattern = r'^[a-zA-Z0-9_]{3,30}$'
-        return re.match(pattern, username) is not None
+        return _USERNAME_RE.match(username) is not None
     
     @staticmethod
     def validate_password(password: str) -> Dict[str, Any]:
@@ -11,7 +11,7 @@ from datetime import datetime, timedelta
 from typing import Dict, Optional, Any, List
 
 from storage import StorageAdapter, User, Session
-from .auth_utils import PasswordManager, TokenManager, AuthUtils
+from .auth_utils import PasswordManager, TokenManager, AuthUtils, CredentialCache
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +31,7 @@ class UserManager:
         """
         self.storage = storage
         self.password_manager = PasswordManager()
+        self.credential_cache = CredentialCache()
         self.token_manager = TokenManager(jwt_secret, token_expire_hours=jwt_expire_hours)
         logger.info("UserManager初始化完成")
     
@@ -143,13 +144,15 @@ class UserManager:
                     'message': '账户已被禁用'
                 }
             
-            # 验证密码
-            if not self.password_manager.verify_password(password, user.password_hash):
-                logger.warning(f"密码验证失败: {username_or_email}")
-                return {
-                    'success': False,
-                    'message': '密码错误'
-                }
+            # 验证密码（有效期内验证通过过的相同凭据跳过bcrypt）
+            if not self.credential_cache.contains(user.user_id, user.password_hash, password):
+                if not self.password_manager.verify_password(password, user.password_hash):
+                    logger.warning(f"密码验证失败: {username_or_email}")
+                    return {
+                        'success': False,
+                        'message': '密码错误'
+                    }
+                self.credential_cache.add(user.user_id, user.password_hash, password)
             
             # 生成JWT令牌
             token = self.token_manager.generate_token(
@@ -388,6 +391,7 @@ class UserManager:
                     }
                 
                 user.password_hash = self.password_manager.hash_password(new_password)
+                self.credential_cache.invalidate(user_id)
             
             if 'metadata' in updates:
                 user.metadata = updates['metadata']
@@ -435,6 +439,7 @@ class UserManager:
             # 清理用户的所有数据
             if not self.storage.cleanup_user_data(user_id):
                 logger.warning(f"用户数据清理不完整: {user.username}")
+            self.credential_cache.invalidate(user_id)
             
             logger.info(f"用户删除成功: {user.username}")
             return {
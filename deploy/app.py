@@ -8,6 +8,7 @@
 
 import os
 import sys
+import threading
 import gradio as gr
 import requests
 from pathlib import Path
@@ -19,31 +20,52 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 os.environ['SSL_VERIFY'] = 'false'
 
 # 导入重构后的模块
-from deploy.auth.auth_handlers import init_auth_bridge
+from deploy.auth.auth_handlers import (
+    init_auth_bridge, handle_login, handle_register, handle_logout, update_user_info,
+    clear_user_caches, mark_caches_dirty
+)
+from deploy.auth.auth_ui import create_auth_interface, create_user_info
 from deploy.ui.ui_handlers import (
-    handle_upload, update_progress, handle_question, handle_search, handle_translate,
-    update_translation_progress, handle_build_index, get_conversation_list,
-    load_conversation_history, start_new_chat, refresh_conversation_history,
+    handle_upload, handle_question, handle_search, handle_translate,
+    handle_build_index, get_conversation_list,
+    start_new_chat, refresh_conversation_history,
     load_selected_conversation, delete_selected_conversation_from_df,
-    auto_build_index, refresh_video_list, check_background_tasks
+    refresh_video_list, stream_progress, on_video_change,
+    stream_index_status
+)
+from deploy.ui.components import (
+    create_quick_questions, QUICK_QUESTION_JS, WHISPER_MODEL_CHOICES, WHISPER_PRECISION_CHOICES,
+    TARGET_LANG_CHOICES, SEARCH_TYPE_CHOICES
 )
 from deploy.utils.helpers import exit_if_no_flask_service, log_system_info
 
-# 尝试导入后端模块
-try:
-    from integration.gradio_bridge import GradioBridge
-    print("✓ GradioBridge 导入成功")
-except ImportError as e:
-    print(f"✗ GradioBridge 导入失败: {e}")
-    GradioBridge = None
+# 后端桥接器在首次检查认证状态时才导入，不拖慢界面构建和启动
+_GradioBridge = None
+_bridge_imported = False
+
 
-# 尝试导入视频清理功能
-try:
-    from modules.utils.video_cleaner import register_video_cleanup
-    register_video_cleanup()
-    print("✓ 视频清理功能已启用")
-except ImportError as e:
-    print(f"✗ VideoCleaner 导入失败: {e}")
+def _get_bridge_class():
+    """导入并缓存 GradioBridge，导入失败时返回None"""
+    global _GradioBridge, _bridge_imported
+    if not _bridge_imported:
+        try:
+            from integration.gradio_bridge import GradioBridge
+            _GradioBridge = GradioBridge
+            print("✓ GradioBridge 导入成功")
+        except ImportError as e:
+            print(f"✗ GradioBridge 导入失败: {e}")
+        _bridge_imported = True
+    return _GradioBridge
+
+
+def _register_video_cleanup():
+    """注册退出时的视频清理（会安装信号处理函数，需在主线程调用）"""
+    try:
+        from modules.utils.video_cleaner import register_video_cleanup
+        register_video_cleanup()
+        print("✓ 视频清理功能已启用")
+    except ImportError as e:
+        print(f"✗ VideoCleaner 导入失败: {e}")
 
 
 class PageRouter:
@@ -51,11 +73,29 @@ class PageRouter:
     
     def __init__(self):
         self.current_page = "login"
-        self.auth_bridge = init_auth_bridge(GradioBridge)
+        self._auth_bridge = None
+        self._bridge_initialized = False
+        self._bridge_lock = threading.Lock()
+    
+    @property
+    def auth_bridge(self):
+        """认证桥接器，首次访问（页面加载检查认证状态或显示登录页）时才初始化"""
+        if not self._bridge_initialized:
+            with self._bridge_lock:
+                if not self._bridge_initialized:
+                    self._auth_bridge = init_auth_bridge(_get_bridge_class())
+                    self._bridge_initialized = True
+        return self._auth_bridge
+    
+    def prepare_auth_bridge(self):
+        """在后台线程中提前初始化认证桥接器，与界面构建和服务启动并行；首次访问时若仍在初始化则等待其完成"""
+        threading.Thread(target=lambda: self.auth_bridge, name="auth-bridge-init", daemon=True).start()
         
     def show_login_page(self):
         """显示登录页面"""
         self.current_page = "login"
+        # 登录前确保认证桥接器已初始化
+        self.auth_bridge
         return (
             gr.update(visible=True),   # login_page
             gr.update(visible=False),  # main_page
@@ -76,70 +116,6 @@ class PageRouter:
         return self.current_page
 
 
-def create_login_page(router):
-    """创建登录页面"""
-    with gr.Column(visible=True) as login_page:
-        gr.Markdown("# 🔐 用户登录")
-        gr.Markdown("请登录以使用视频智能问答助手")
-        
-        with gr.Row():
-            with gr.Column(scale=1):
-                pass  # 空白列用于居中
-            with gr.Column(scale=2):
-                with gr.Tabs() as login_tabs:
-                    with gr.Tab("登录"):
-                        with gr.Column():
-                            login_username = gr.Textbox(
-                                label="用户名/邮箱", 
-                                placeholder="请输入用户名或邮箱"
-                            )
-                            login_password = gr.Textbox(
-                                label="密码", 
-                                type="password",
-                                placeholder="请输入密码"
-                            )
-                            login_btn = gr.Button("登录", variant="primary", size="lg")
-                            login_message = gr.Textbox(
-                                label="", 
-                                visible=False, 
-                                interactive=False,
-                                elem_classes=["feedback-message"]
-                            )
-                    
-                    with gr.Tab("注册"):
-                        with gr.Column():
-                            reg_username = gr.Textbox(
-                                label="用户名", 
-                                placeholder="3-30位字母、数字、下划线"
-                            )
-                            reg_email = gr.Textbox(
-                                label="邮箱", 
-                                placeholder="请输入有效邮箱地址"
-                            )
-                            reg_password = gr.Textbox(
-                                label="密码", 
-                                type="password",
-                                placeholder="至少6位，建议包含大小写字母、数字和特殊字符"
-                            )
-                            reg_confirm_password = gr.Textbox(
-                                label="确认密码", 
-                                type="password",
-                                placeholder="请再次输入密码"
-                            )
-                            reg_btn = gr.Button("注册", variant="primary", size="lg")
-                            reg_message = gr.Textbox(
-                                label="", 
-                                visible=False, 
-                                interactive=False,
-                                elem_classes=["feedback-message"]
-                            )
-            with gr.Column(scale=1):
-                pass  # 空白列用于居中
-    
-    return login_page, (login_username, login_password, login_btn, login_message, 
-                       reg_username, reg_email, reg_password, reg_confirm_password, reg_btn, reg_message, login_tabs)
-
-
 def create_main_app_page():
     """创建主应用页面"""
     with gr.Column(visible=False) as main_page:
@@ -162,17 +138,20 @@ def create_main_app_page():
                             )
                             
                             whisper_model = gr.Dropdown(
-                                choices=[
-                                    ("tiny (75MB, 最快)", "tiny"),
-                                    ("base (142MB, 平衡)", "base"),
-                                    ("small (466MB, 较准确)", "small"),
-                                    ("medium (1.5GB, 很准确)", "medium"),
-                                    ("large (2.9GB, 最准确)", "large")
-                                ],
+                                choices=WHISPER_MODEL_CHOICES,
                                 value="base",
                                 label="Whisper模型选择",
                                 info="更大的模型更准确但需要更多时间和资源"
                             )
+                            
+                            # 高级选项：强制指定识别精度，默认按设备和模型大小自动选择
+                            with gr.Accordion("高级选项", open=False):
+                                whisper_precision = gr.Dropdown(
+                                    choices=WHISPER_PRECISION_CHOICES,
+                                    value="auto",
+                                    label="Whisper计算精度",
+                                    info="量化精度越低越快、占用越少，准确率略有下降"
+                                )
                         
                         video_input = gr.File(
                             label="上传视频文件",
@@ -215,7 +194,7 @@ def create_main_app_page():
                     with gr.Row():
                         translate_btn = gr.Button("翻译文本", variant="secondary", visible=False)
                         target_lang = gr.Dropdown(
-                            choices=["请选择语言", "English", "中文"],
+                            choices=TARGET_LANG_CHOICES,
                             value="请选择语言",
                             label="",
                             show_label=False,
@@ -280,11 +259,7 @@ def create_main_app_page():
                             
                             # 搜索类型选择
                             search_type = gr.Radio(
-                                choices=[
-                                    ("混合检索 (推荐)", "hybrid"),
-                                    ("向量检索", "vector"),
-                                    ("关键词检索 (BM25)", "bm25")
-                                ],
+                                choices=SEARCH_TYPE_CHOICES,
                                 value="hybrid",
                                 label="搜索类型",
                                 info="混合检索结合了语义相似度和关键词匹配"
@@ -315,21 +290,15 @@ def create_main_app_page():
                             send_btn = gr.Button("发送", variant="primary", scale=1)
                         
                         # 快捷问题建议
-                        with gr.Accordion("快捷问题", open=False):
-                            quick_questions = [
-                                "这个视频的主要内容是什么？",
-                                "视频中提到了哪些关键点？",
-                                "能总结一下视频的核心观点吗？",
-                                "视频中的结论是什么？"
-                            ]
-                            
-                            for i, question in enumerate(quick_questions):
-                                gr.Button(question, size="sm").click(
-                                    lambda q=question: q,
-                                    outputs=question_input
-                                )
+                        quick_questions = create_quick_questions()
+                        quick_questions.click(
+                            None,
+                            quick_questions,
+                            question_input,
+                            js=QUICK_QUESTION_JS
+                        )
     
-    return main_page, (upload_status, video_input, cuda_enabled, whisper_model, upload_btn, 
+    return main_page, (upload_status, video_input, cuda_enabled, whisper_model, whisper_precision, upload_btn, 
                       progress_html, processing_log, video_player, video_info, processing_status,
                       transcript_display, translate_btn, target_lang, translated_display,
                       translate_progress_html, translate_progress_bar, video_selector, refresh_btn,
@@ -339,37 +308,23 @@ def create_main_app_page():
                       chatbot, question_input, send_btn)
 
 
-def create_user_info_section():
-    """创建用户信息区域"""
-    with gr.Row(visible=False) as user_info_section:
-        with gr.Column(scale=4):
-            user_display = gr.Textbox(
-                label="当前用户", 
-                interactive=False,
-                value="未登录"
-            )
-        with gr.Column(scale=1):
-            logout_btn = gr.Button("登出", variant="secondary")
-    
-    return user_info_section, user_display, logout_btn
-
-
 def create_video_qa_interface_routed():
     """创建带页面路由的视频问答界面"""
     
-    # 创建路由器
+    # 创建路由器，认证桥接器在后台初始化
     router = PageRouter()
+    router.prepare_auth_bridge()
     
     # 创建界面
     with gr.Blocks(title="视频智能问答助手") as demo:
         # 创建登录页面
-        login_page, login_components = create_login_page(router)
-        (login_username, login_password, login_btn, login_message, 
-         reg_username, reg_email, reg_password, reg_confirm_password, reg_btn, reg_message, login_tabs) = login_components
+        (login_page, login_username, login_password, login_btn, login_message,
+         reg_username, reg_email, reg_password, reg_confirm_password, reg_btn, reg_message,
+         login_tabs) = create_auth_interface()
         
         # 创建主应用页面
         main_page, main_components = create_main_app_page()
-        (upload_status, video_input, cuda_enabled, whisper_model, upload_btn, 
+        (upload_status, video_input, cuda_enabled, whisper_model, whisper_precision, upload_btn, 
          progress_html, processing_log, video_player, video_info, processing_status,
          transcript_display, translate_btn, target_lang, translated_display,
          translate_progress_html, translate_progress_bar, video_selector, refresh_btn,
@@ -379,20 +334,17 @@ def create_video_qa_interface_routed():
          chatbot, question_input, send_btn) = main_components
         
         # 创建用户信息区域
-        user_info_section, user_display, logout_btn = create_user_info_section()
-        
-        # 导入认证处理函数
-        from deploy.auth.auth_handlers import handle_login, handle_register, handle_logout, update_user_info
+        user_info_section, user_display, logout_btn = create_user_info()
         
         # 绑定登录事件
-        def login_flow(username, password):
+        async def login_flow(username, password):
             """登录流程控制"""
-            login_result = handle_login(username, password)
+            login_result = await handle_login(username, password)
             
             # 检查登录是否成功（通过消息内容判断）
             if "登录成功" in str(login_result.get('value', '')):
                 # 登录成功，清空表单并继续后续步骤
-                user_info_update = update_user_info()
+                user_info_update = await update_user_info()
                 page_updates = router.show_main_page()
                 return (login_result, page_updates[0], user_info_update[0], 
                        user_info_update[1], page_updates[1], page_updates[2],
@@ -407,13 +359,14 @@ def create_video_qa_interface_routed():
             fn=login_flow,
             inputs=[login_username, login_password],
             outputs=[login_message, login_page, user_display, user_info_section, main_page, user_info_section,
-                    login_username, login_password]
+                    login_username, login_password],
+            queue=False
         )
         
         # 绑定注册事件
-        def register_flow(username, email, password, confirm_password):
+        async def register_flow(username, email, password, confirm_password):
             """注册流程控制"""
-            register_result = handle_register(username, email, password, confirm_password)
+            register_result = await handle_register(username, email, password, confirm_password)
             
             # 检查注册是否成功（通过消息内容判断）
             if "注册成功" in str(register_result.get('value', '')):
@@ -440,7 +393,8 @@ def create_video_qa_interface_routed():
         reg_btn.click(
             fn=register_flow,
             inputs=[reg_username, reg_email, reg_password, reg_confirm_password],
-            outputs=[reg_message, login_tabs, reg_username, reg_email, reg_password, reg_confirm_password]
+            outputs=[reg_message, login_tabs, reg_username, reg_email, reg_password, reg_confirm_password],
+            queue=False
         )
         
         # 绑定登出事件
@@ -450,43 +404,48 @@ def create_video_qa_interface_routed():
                     conversation_history_df, chatbot, question_input, search_results, search_query,
                     transcript_display, translated_display, video_info, processing_status, 
                     processing_log, progress_html, upload_status, index_status, index_progress_html,
-                    translate_progress_html, translate_progress_bar, history_status, video_player]
+                    translate_progress_html, translate_progress_bar, history_status, video_player],
+            queue=False
         )
         
         # 绑定主应用事件（与原来相同）
+        # 处理和索引构建进度由后台任务主动推送，进度变化时才更新界面（翻译进度由翻译回调自身推送）
+        progress_outputs = [processing_log, transcript_display, translate_btn, target_lang, translated_display,
+                            progress_html, index_status, index_progress_html]
+        
+        # 上传返回后开始推送（随后的索引构建也在同一推送中更新）；每次上传都重新开始推送，
+        # 重复上传同一视频时视频信息不变、不会触发 change 事件，但进度记录已被重置
+        # 推送的输出都是字符串或 gr.update，输入是原始JSON，跳过Gradio的预处理和后处理
         upload_btn.click(
             handle_upload,
-            inputs=[video_input, cuda_enabled, whisper_model],
-            outputs=[upload_status, video_player, video_info, processing_status, processing_log, progress_html, transcript_display, translate_btn, target_lang, translated_display]
-        )
-        
-        # 定时更新处理进度
-        progress_timer = gr.Timer(2)
-        progress_timer.tick(
-            update_progress,
-            inputs=[video_info],
-            outputs=[processing_log, transcript_display, translate_btn, target_lang, translated_display, progress_html, translate_progress_bar, index_status]
-        )
-        
-        # 定时检查翻译和索引构建进度
-        background_timer = gr.Timer(3)
-        background_timer.tick(
-            check_background_tasks,
+            inputs=[video_input, cuda_enabled, whisper_model, whisper_precision],
+            outputs=[upload_status, video_player, video_info, processing_status, processing_log, progress_html, transcript_display, translate_btn, target_lang, translated_display],
+            concurrency_id="upload",
+            concurrency_limit=4
+        ).then(
+            stream_progress,
             inputs=[video_info],
-            outputs=[translate_progress_html, index_progress_html]
+            outputs=progress_outputs,
+            concurrency_limit=None,
+            preprocess=False,
+            postprocess=False
         )
         
         # 问答事件
         send_btn.click(
             handle_question,
             inputs=[question_input, chatbot, video_selector],
-            outputs=[question_input, chatbot]
+            outputs=[question_input, chatbot],
+            concurrency_id="llm",
+            concurrency_limit=4
         )
         
         question_input.submit(
             handle_question,
             inputs=[question_input, chatbot, video_selector],
-            outputs=[question_input, chatbot]
+            outputs=[question_input, chatbot],
+            concurrency_id="llm",
+            concurrency_limit=4
         )
         
         # 搜索事件
@@ -500,59 +459,78 @@ def create_video_qa_interface_routed():
         translate_btn.click(
             handle_translate,
             inputs=[video_info, target_lang],
-            outputs=[processing_status, translated_display, translate_progress_html, translate_progress_bar]
+            outputs=[processing_status, translated_display, translate_progress_html, translate_progress_bar],
+            concurrency_id="translate",
+            concurrency_limit=2,
+            preprocess=False,
+            postprocess=False
         )
         
-        # 翻译进度更新
-        translation_progress_timer = gr.Timer(1)
-        translation_progress_timer.tick(
-            update_translation_progress,
-            inputs=[video_info],
-            outputs=[translate_progress_bar]
+        # 新对话事件
+        # 聊天框和输入框在浏览器端直接清空，服务端只清除对话记录且不进入队列
+        new_chat_btn.click(
+            None,
+            None,
+            [chatbot, question_input],
+            js="() => [[], '']"
         )
         
-        # 新对话事件
         new_chat_btn.click(
             start_new_chat,
             inputs=[video_selector],
-            outputs=[chatbot, question_input]
+            queue=False,
+            preprocess=False
         )
         
-        # 刷新视频列表
+        # 刷新视频列表（只读缓存的视频列表并提交后台索引构建，不进入队列直接执行）
         refresh_btn.click(
             refresh_video_list,
-            outputs=[video_selector, index_status]
+            outputs=[video_selector, index_status],
+            queue=False,
+            postprocess=False
         )
         
         # 视频选择时自动构建索引并加载对话历史
         video_selector.change(
-            fn=lambda x: (
-                auto_build_index(x)[0],
-                load_conversation_history(x)
-            ),
+            fn=on_video_change,
             inputs=[video_selector],
-            outputs=[index_status, chatbot]
+            outputs=[index_status, chatbot],
+            concurrency_id="ui",
+            concurrency_limit=32,
+            preprocess=False
+        ).then(
+            # 提交了索引构建时推送构建状态，构建结束即停止；没有构建任务时不推送
+            stream_index_status,
+            inputs=[video_selector],
+            outputs=[index_status, index_progress_html],
+            concurrency_limit=None,
+            preprocess=False,
+            postprocess=False
         )
         
-        # 历史对话事件绑定
+        # 历史对话事件绑定（读写本地对话文件，耗时很短，均不进入队列）
         refresh_history_btn.click(
             refresh_conversation_history,
-            outputs=[conversation_history_df, history_status]
+            outputs=[conversation_history_df, history_status],
+            queue=False
         )
         
         conversation_history_df.select(
             fn=load_selected_conversation,
             inputs=[conversation_history_df],
-            outputs=[chatbot]
+            outputs=[chatbot],
+            queue=False
         )
         
         delete_history_btn.click(
             fn=lambda df: delete_selected_conversation_from_df(df),
             inputs=[conversation_history_df],
-            outputs=[history_status]
+            outputs=[history_status],
+            queue=False
         ).then(
             refresh_conversation_history,
-            outputs=[conversation_history_df, history_status]
+            outputs=[conversation_history_df, history_status],
+            queue=False
         )
         from utils.user_context import user_context
 
@@ -560,18 +538,17 @@ def create_video_qa_interface_routed():
         def check_auth_state():
             """检查认证状态并同步用户上下文"""
             try:
-                # 获取Flask层面的用户状态
-                flask_user = router.auth_bridge.current_user if router.auth_bridge else None
-                
-                # 获取Gradio层面的用户状态
+                # 两层的用户状态各读取一次，后续判断只使用这份快照
+                bridge = router.auth_bridge
+                flask_user = bridge.current_user if bridge else None
                 gradio_user_id = user_context.get_current_user_id()
+                gradio_user_data = user_context.get_current_user_data() or {}
                 
                 # 如果Gradio有用户但Flask没有，同步到Flask
-                if gradio_user_id and not flask_user:
-                    from deploy.auth.auth_handlers import auth_bridge
-                    auth_bridge.current_user = {
+                if gradio_user_id and not flask_user and bridge:
+                    bridge.current_user = {
                         'user_id': gradio_user_id,
-                        'username': user_context.get_current_user_data().get('username', gradio_user_id),
+                        'username': gradio_user_data.get('username', gradio_user_id),
                         'token': None  # 需要重新登录获取token
                     }
                     print(f"同步用户状态：Gradio用户({gradio_user_id}) -> Flask")
@@ -579,6 +556,7 @@ def create_video_qa_interface_routed():
                 # 如果Flask有用户但Gradio没有，同步到Gradio
                 elif flask_user and not gradio_user_id:
                     user_context.set_user(flask_user['user_id'], flask_user['username'])
+                    mark_caches_dirty()
                     print(f"同步用户状态：Flask用户({flask_user['user_id']}) -> Gradio")
                 
                 # 如果两者都有用户但用户ID不匹配，以Flask为准并清理Gradio状态
@@ -589,21 +567,8 @@ def create_video_qa_interface_routed():
                     user_context.set_user(flask_user['user_id'], flask_user['username'])
                     
                     # 清理所有缓存
-                    try:
-                        from deploy.core.conversation_manager_isolated import get_conversation_manager
-                        conversation_manager = get_conversation_manager()
-                        if hasattr(conversation_manager, 'conversation_chains'):
-                            conversation_manager.conversation_chains.clear()
-                    except Exception as e:
-                        print(f"⚠️ 清理对话管理器缓存失败: {e}")
-                    
-                    try:
-                        from deploy.core.video_processor_isolated import get_isolated_processor
-                        processor = get_isolated_processor()
-                        if hasattr(processor, 'processing_status'):
-                            processor.processing_status.clear()
-                    except Exception as e:
-                        print(f"⚠️ 清理视频处理器缓存失败: {e}")
+                    clear_user_caches()
+                    mark_caches_dirty()
                     
                     print(f"✅ 用户状态已同步到Flask用户({flask_user['user_id']})")
                 
@@ -618,17 +583,23 @@ def create_video_qa_interface_routed():
                 # 出错时默认显示登录页面
                 return router.show_login_page()
         
+        def load_user_data():
+            """已登录时加载视频列表和历史对话（历史对话只读取一次）"""
+            if not user_context.is_logged_in():
+                return [], None, ""
+            history_df, history_message = refresh_conversation_history()
+            return refresh_video_list()[0], history_df, history_message
+        
         # 页面加载时检查认证状态
+        # 认证检查和页面加载时的数据读取都是轻量操作，不进入队列
         demo.load(
             fn=check_auth_state,
-            outputs=[login_page, main_page, user_info_section]
+            outputs=[login_page, main_page, user_info_section],
+            queue=False
         ).then(
-            fn=lambda: (
-                refresh_video_list()[0] if user_context.is_logged_in() else [],
-                refresh_conversation_history()[0] if user_context.is_logged_in() else None,
-                refresh_conversation_history()[1] if user_context.is_logged_in() else ""
-            ),
-            outputs=[video_selector, conversation_history_df, history_status]
+            fn=load_user_data,
+            outputs=[video_selector, conversation_history_df, history_status],
+            queue=False
         )
     
     return demo
@@ -640,6 +611,9 @@ if __name__ == "__main__":
     # 检查Flask认证服务
     exit_if_no_flask_service()
     
+    # 注册退出时的视频清理
+    _register_video_cleanup()
+    
     # 创建并启动界面
     demo = create_video_qa_interface_routed()
     
@@ -670,11 +644,18 @@ if __name__ == "__main__":
     }
     """
     
-    demo.launch(
-        server_name="localhost",
-        server_port=None,
+    # 关闭调试模式；安装了 uvloop/httptools 时 uvicorn 会自动选用，事件循环和HTTP解析走C实现
+    demo.queue(default_concurrency_limit=16, max_size=64).launch(
+        # 监听所有网卡并固定端口（与根目录 start.py 打印的访问地址和 Flask 的 CORS 配置一致），不在启动时扫描空闲端口
+        # 注意：登录状态保存在进程内全局的用户上下文中（同一时间只有一个登录用户），监听 0.0.0.0 时局域网内
+        # 其他客户端打开页面会经 check_auth_state 直接进入当前登录用户的会话；只在可信网络中使用，
+        # 或设置 GRADIO_SERVER_NAME=127.0.0.1 只允许本机访问
+        server_name=os.environ.get("GRADIO_SERVER_NAME", "0.0.0.0"),
+        server_port=int(os.environ.get("GRADIO_SERVER_PORT", 7860)),
         share=False,
-        debug=True,
+        debug=False,
+        show_error=True,
+        ssr_mode=False,
         theme=gr.themes.Soft(),
         css=custom_css
     )
@@ -4,12 +4,106 @@
 认证处理函数
 """
 
+import logging
+import re
+from dataclasses import asdict, dataclass
+
 import gradio as gr
 
-# 全局变量
+from deploy.utils.user_context import user_context
+
+# 登录登出的过程日志使用DEBUG级别，部署时按INFO及以上输出即不产生格式化和写出开销
+logger = logging.getLogger(__name__)
+
+# 登录、登出时需要清理缓存的各管理器（导入失败时跳过对应的清理）
+try:
+    from deploy.core.conversation_manager_isolated import get_conversation_manager
+    from deploy.core.video_processor_isolated import (
+        get_isolated_processor, invalidate_user_videos, clear_processing_records
+    )
+    from deploy.core.index_builder_isolated import get_index_builder
+    from deploy.core.translator_isolated import get_translator_manager
+except ImportError as e:
+    print(f"⚠ 核心模块导入失败，登录登出时不清理相关缓存: {e}")
+    get_conversation_manager = get_isolated_processor = get_index_builder = get_translator_manager = None
+    invalidate_user_videos = clear_processing_records = None
+
+# 切换用户时需要清理的缓存 [(名称, 清理函数)]，其他模块可通过 register_user_cache_clearer 追加
+_USER_CACHE_CLEARERS = []
+if get_conversation_manager is not None:
+    _USER_CACHE_CLEARERS.extend([
+        ("对话管理器", lambda: getattr(get_conversation_manager(), 'conversation_chains', {}).clear()),
+        ("视频处理状态", clear_processing_records),
+        ("视频列表", invalidate_user_videos),
+        ("索引构建器", lambda: get_index_builder().clear_components()),
+        ("翻译管理器", lambda: getattr(get_translator_manager(), 'translation_progress', {}).clear())
+    ])
+
+# 注册表单的格式规则 (字段名, 正则, 错误提示)，与认证服务端的校验规则一致，依次检查并返回第一个不满足的提示
+_REGISTER_RULES = (
+    ("username", re.compile(r'^[a-zA-Z0-9_]{3,30}$'), "❌ 用户名应为3-30位字母、数字或下划线"),
+    ("email", re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'), "❌ 请输入有效的邮箱地址"),
+    ("password", re.compile(r'^.{6,}$', re.DOTALL), "❌ 密码长度至少6位")
+)
+
+# 登录/注册反馈消息的样式类
+_ERR_CLASSES = ("feedback-message", "error")
+_OK_CLASSES = ("feedback-message", "success")
+
+
+def _err(message):
+    """错误反馈消息的更新"""
+    return gr.update(visible=True, value=message, elem_classes=_ERR_CLASSES)
+
+
+def _ok(message):
+    """成功反馈消息的更新"""
+    return gr.update(visible=True, value=message, elem_classes=_OK_CLASSES)
+
+
+# 上次清理之后是否有用户登录过（按用户缓存的数据可能不为空），没有时清理直接跳过
+_caches_dirty = False
+
+
+def mark_caches_dirty():
+    """标记按用户缓存的数据可能不为空（设置当前用户后调用）"""
+    global _caches_dirty
+    _caches_dirty = True
+
+
+def register_user_cache_clearer(name, clearer):
+    """注册切换用户时需要清理的缓存"""
+    _USER_CACHE_CLEARERS.append((name, clearer))
+
+
+def clear_user_caches():
+    """依次清理所有按用户缓存的数据，单项失败不影响其他项；自上次清理后没有用户登录过时跳过"""
+    global _caches_dirty
+    if not _caches_dirty:
+        return
+    _caches_dirty = False
+    for name, clearer in _USER_CACHE_CLEARERS:
+        try:
+            clearer()
+        except Exception as e:
+            logger.warning("清理%s缓存失败: %s", name, e)
+
+
+@dataclass(slots=True, frozen=True)
+class AuthSession:
+    """当前登录用户"""
+    user_id: str
+    username: str
+    token: str
+    
+    def to_dict(self) -> dict:
+        """转换为认证桥接器使用的用户字典"""
+        return asdict(self)
+
+
+# 全局变量（Gradio各事件回调之间没有共享的上下文，登录状态只能保存在模块中；令牌随 AuthSession 一起保存）
 auth_bridge = None
 current_user = None
-auth_token = None
 
 
 def init_auth_bridge(GradioBridge):
@@ -28,246 +122,159 @@ def init_auth_bridge(GradioBridge):
     return None
 
 
-def handle_login(username, password):
-    """处理用户登录"""
-    global current_user, auth_token
+async def handle_login(username, password):
+    """处理用户登录（等待认证服务响应时不占用工作线程）"""
+    global current_user
     
     if not username or not password:
-        return gr.update(visible=True, value="❌ 请输入用户名和密码", elem_classes=["feedback-message", "error"]), gr.update()
+        return _err("❌ 请输入用户名和密码"), gr.update()
     
     if not auth_bridge:
-        return gr.update(visible=True, value="❌ 认证服务不可用", elem_classes=["feedback-message", "error"]), gr.update()
+        return _err("❌ 认证服务不可用"), gr.update()
     
     # 先清理任何现有的用户状态（防止用户切换时的状态污染）
     try:
         # 清理Gradio层面的用户上下文
-        from deploy.utils.user_context import user_context
         if user_context.get_current_user_id():
-            print(f"清理前一个用户状态: {user_context.get_current_user_id()}")
+            logger.debug("清理前一个用户状态: %s", user_context.get_current_user_id())
             user_context.clear_user()
         
-        # 清理对话管理器缓存
-        try:
-            from deploy.core.conversation_manager_isolated import get_conversation_manager
-            conversation_manager = get_conversation_manager()
-            if hasattr(conversation_manager, 'conversation_chains'):
-                conversation_manager.conversation_chains.clear()
-        except Exception as e:
-            print(f"⚠️ 清理对话管理器缓存失败: {e}")
-        
-        # 清理视频处理器缓存
-        try:
-            from deploy.core.video_processor_isolated import get_isolated_processor
-            processor = get_isolated_processor()
-            if hasattr(processor, 'processing_status'):
-                processor.processing_status.clear()
-        except Exception as e:
-            print(f"⚠️ 清理视频处理器缓存失败: {e}")
+        # 清理各管理器中按用户缓存的数据
+        clear_user_caches()
         
-        print("✅ 前一个用户状态已清理")
+        logger.debug("前一个用户状态已清理")
     except Exception as e:
-        print(f"⚠️ 清理用户状态时发生错误: {e}")
+        logger.warning("清理用户状态时发生错误: %s", e)
     
     # 调用后端登录接口
-    result = auth_bridge.login_user(username, password)
+    result = await auth_bridge.login_user_async(username, password)
     
     if result['success']:
-        current_user = {
-            'user_id': result['user_id'],
-            'username': result['username'],
-            'token': result['token']
-        }
-        auth_token = result['token']
+        current_user = AuthSession(result['user_id'], result['username'], result['token'])
         
-        # 更新认证桥接器的当前用户
-        auth_bridge.current_user = current_user
+        # 更新认证桥接器的当前用户（桥接器和页面路由仍按字典读取）
+        auth_bridge.current_user = current_user.to_dict()
         
         # 设置用户上下文
-        from deploy.utils.user_context import user_context
         user_context.set_user(result['user_id'], result['username'])
+        mark_caches_dirty()
         
         # 创建用户数据目录
         try:
             user_data_dir = auth_bridge.create_user_data_dir(result['user_id'])
-            print(f"用户数据目录创建成功: {user_data_dir}")
+            logger.debug("用户数据目录创建成功: %s", user_data_dir)
         except Exception as e:
-            print(f"用户数据目录创建失败: {e}")
+            logger.warning("用户数据目录创建失败: %s", e)
         
-        print(f"✅ 用户登录成功: {result['username']} (ID: {result['user_id']})")
-        return gr.update(visible=True, value="✅ 登录成功！", elem_classes=["feedback-message", "success"])
+        logger.info("用户登录成功: %s (ID: %s)", result['username'], result['user_id'])
+        return _ok("✅ 登录成功！")
     else:
-        return gr.update(visible=True, value=f"❌ 登录失败: {result['message']}", elem_classes=["feedback-message", "error"])
+        return _err(f"❌ 登录失败: {result['message']}")
 
 
-def handle_register(username, email, password, confirm_password):
-    """处理用户注册"""
+async def handle_register(username, email, password, confirm_password):
+    """处理用户注册（等待认证服务响应时不占用工作线程）"""
     if not username or not email or not password:
-        return gr.update(visible=True, value="❌ 请填写所有字段", elem_classes=["feedback-message", "error"])
+        return _err("❌ 请填写所有字段")
     
     if password != confirm_password:
-        return gr.update(visible=True, value="❌ 两次输入的密码不一致", elem_classes=["feedback-message", "error"])
-    
-    # 基本验证
-    if len(username) < 3 or len(username) > 30:
-        return gr.update(visible=True, value="❌ 用户名长度应为3-30位", elem_classes=["feedback-message", "error"])
+        return _err("❌ 两次输入的密码不一致")
     
-    if '@' not in email:
-        return gr.update(visible=True, value="❌ 请输入有效的邮箱地址", elem_classes=["feedback-message", "error"])
-    
-    if len(password) < 6:
-        return gr.update(visible=True, value="❌ 密码长度至少6位", elem_classes=["feedback-message", "error"])
+    # 基本验证（在访问认证服务之前完成）
+    fields = {"username": username, "email": email, "password": password}
+    for field, pattern, message in _REGISTER_RULES:
+        if not pattern.match(fields[field]):
+            return _err(message)
     
     if not auth_bridge:
-        return gr.update(visible=True, value="❌ 认证服务不可用", elem_classes=["feedback-message", "error"])
+        return _err("❌ 认证服务不可用")
     
     # 调用后端注册接口
-    result = auth_bridge.register_user(username, email, password)
+    result = await auth_bridge.register_user_async(username, email, password)
     
     if result['success']:
-        return gr.update(visible=True, value="✅ 注册成功！请登录", elem_classes=["feedback-message", "success"])
+        return _ok("✅ 注册成功！请登录")
     else:
         error_msg = result.get('message', '注册失败')
         if 'errors' in result:
             error_msg += f": {', '.join(result['errors'])}"
-        return gr.update(visible=True, value=f"❌ 注册失败: {error_msg}", elem_classes=["feedback-message", "error"])
+        return _err(f"❌ 注册失败: {error_msg}")
+
+
+# 登出时重置界面的更新，与 handle_logout 的输出组件一一对应；内容固定，模块加载时构建一次
+_LOGOUT_RESET_UPDATES = (
+    gr.update(visible=True),   # login_page
+    gr.update(visible=False),  # main_page
+    gr.update(visible=False),  # user_info_section
+    gr.update(value="未登录"), # user_display
+    gr.update(choices=[], value=None),  # video_selector
+    gr.update(value=[]),       # conversation_history_df
+    gr.update(value=[]),       # chatbot
+    gr.update(value=""),       # question_input
+    gr.update(value=[]),       # search_results
+    gr.update(value=""),       # search_query
+    gr.update(value="", visible=False),  # transcript_display
+    gr.update(value="", visible=False),  # translated_display
+    gr.update(value=None, visible=False),  # video_info
+    gr.update(value="", visible=False),  # processing_status
+    gr.update(value="", visible=False),  # processing_log
+    gr.update(value="", visible=False),  # progress_html
+    gr.update(value="", visible=False),  # upload_status
+    gr.update(value="", visible=False),  # index_status
+    gr.update(value="", visible=False),  # index_progress_html
+    gr.update(value="", visible=False),  # translate_progress_html
+    gr.update(value="", visible=False),  # translate_progress_bar
+    gr.update(value="", visible=False),  # history_status
+    gr.update(visible=False)   # video_player
+)
+
+
+def _logout_reset_updates():
+    """复制登出重置更新（Gradio后处理时会从更新字典中取出value，不能直接返回共享的字典）"""
+    return tuple(dict(update) for update in _LOGOUT_RESET_UPDATES)
 
 
 def handle_logout():
     """处理用户登出"""
-    global current_user, auth_token
+    global current_user
+    
+    # 已经是登出状态（如页面刷新时重复触发登出）且缓存自上次清理后未被使用，只需重置界面
+    if current_user is None and not user_context.is_logged_in() and not _caches_dirty:
+        return _logout_reset_updates()
     
     try:
         # 先清除Flask层面的认证状态
-        if auth_token and auth_bridge:
-            result = auth_bridge.logout_user()
+        if current_user and current_user.token and auth_bridge:
+            auth_bridge.logout_user()
             current_user = None
-            auth_token = None
             auth_bridge.current_user = None
-            print("✅ Flask认证状态已清除")
+            logger.debug("Flask认证状态已清除")
         
         # 然后清除Gradio层面的用户上下文
-        from deploy.utils.user_context import user_context
         user_context.clear_user()
-        print("✅ Gradio用户上下文已清除")
-        
-        # 清理对话管理器缓存
-        try:
-            from deploy.core.conversation_manager_isolated import get_conversation_manager
-            conversation_manager = get_conversation_manager()
-            if hasattr(conversation_manager, 'conversation_chains'):
-                conversation_manager.conversation_chains.clear()
-            print("✅ 对话管理器缓存已清除")
-        except Exception as e:
-            print(f"⚠️ 清理对话管理器缓存失败: {e}")
-        
-        # 清理视频处理器缓存
-        try:
-            from deploy.core.video_processor_isolated import get_isolated_processor
-            processor = get_isolated_processor()
-            if hasattr(processor, 'processing_status'):
-                processor.processing_status.clear()
-            print("✅ 视频处理器缓存已清除")
-        except Exception as e:
-            print(f"⚠️ 清理视频处理器缓存失败: {e}")
+        logger.debug("Gradio用户上下文已清除")
         
-        # 清理索引构建器缓存
-        try:
-            from deploy.core.index_builder_isolated import get_index_builder
-            index_builder = get_index_builder()
-            # 清理检索器缓存
-            if index_builder.vector_store and hasattr(index_builder.vector_store, 'clear'):
-                index_builder.vector_store.clear()
-            if index_builder.bm25_retriever and hasattr(index_builder.bm25_retriever, 'clear'):
-                index_builder.bm25_retriever.clear()
-            if index_builder.hybrid_retriever and hasattr(index_builder.hybrid_retriever, 'clear'):
-                index_builder.hybrid_retriever.clear()
-            print("✓ 索引构建器缓存已清除")
-        except Exception as e:
-            print(f"⚠️ 清理索引构建器缓存失败: {e}")
-        
-        # 清理翻译管理器缓存
-        try:
-            from deploy.core.translator_isolated import get_translator_manager
-            translator_manager = get_translator_manager()
-            if hasattr(translator_manager, 'translation_progress'):
-                translator_manager.translation_progress.clear()
-            print("✅ 翻译管理器缓存已清除")
-        except Exception as e:
-            print(f"⚠️ 清理翻译管理器缓存失败: {e}")
+        # 清理各管理器中按用户缓存的数据
+        clear_user_caches()
+        logger.debug("用户缓存已清除")
         
         # 清理全局变量
         current_user = None
-        auth_token = None
-        
-        # 强制垃圾回收
-        import gc
-        gc.collect()
-        print("✅ 垃圾回收完成")
         
         # 返回完整的界面清理更新
-        return (
-            gr.update(visible=True),   # login_page
-            gr.update(visible=False),  # main_page  
-            gr.update(visible=False),  # user_info_section
-            gr.update(value="未登录"), # user_display
-            gr.update(choices=[], value=None),  # video_selector
-            gr.update(value=[]),       # conversation_history_df
-            gr.update(value=[]),       # chatbot
-            gr.update(value=""),       # question_input
-            gr.update(value=[]),       # search_results
-            gr.update(value=""),       # search_query
-            gr.update(value="", visible=False),  # transcript_display
-            gr.update(value="", visible=False),  # translated_display
-            gr.update(value=None, visible=False),  # video_info
-            gr.update(value="", visible=False),  # processing_status
-            gr.update(value="", visible=False),  # processing_log
-            gr.update(value="", visible=False),  # progress_html
-            gr.update(value="", visible=False),  # upload_status
-            gr.update(value="", visible=False),  # index_status
-            gr.update(value="", visible=False),  # index_progress_html
-            gr.update(value="", visible=False),  # translate_progress_html
-            gr.update(value="", visible=False),  # translate_progress_bar
-            gr.update(value="", visible=False),  # history_status
-            gr.update(visible=False)   # video_player
-        )
+        return _logout_reset_updates()
         
     except Exception as e:
-        print(f"⚠️ 登出过程中发生错误: {e}")
+        logger.warning("登出过程中发生错误: %s", e)
         # 即使出错也要返回基本清理
-        return (
-            gr.update(visible=True),   # login_page
-            gr.update(visible=False),  # main_page
-            gr.update(visible=False),  # user_info_section
-            gr.update(value="未登录"), # user_display
-            gr.update(choices=[], value=None),  # video_selector
-            gr.update(value=[]),       # conversation_history_df
-            gr.update(value=[]),       # chatbot
-            gr.update(value=""),       # question_input
-            gr.update(value=[]),       # search_results
-            gr.update(value=""),       # search_query
-            gr.update(value="", visible=False),  # transcript_display
-            gr.update(value="", visible=False),  # translated_display
-            gr.update(value=None, visible=False),  # video_info
-            gr.update(value="", visible=False),  # processing_status
-            gr.update(value="", visible=False),  # processing_log
-            gr.update(value="", visible=False),  # progress_html
-            gr.update(value="", visible=False),  # upload_status
-            gr.update(value="", visible=False),  # index_status
-            gr.update(value="", visible=False),  # index_progress_html
-            gr.update(value="", visible=False),  # translate_progress_html
-            gr.update(value="", visible=False),  # translate_progress_bar
-            gr.update(value="", visible=False),  # history_status
-            gr.update(visible=False)   # video_player
-        )
+        return _logout_reset_updates()
 
 
-def update_user_info():
-    """更新用户信息显示"""
-    global current_user
-    
+async def update_user_info():
+    """更新用户信息显示（只读取内存状态，直接在事件循环中执行，不占用工作线程）"""
     if current_user:
         return (
-            gr.update(value=f"用户: {current_user['username']}"), 
+            gr.update(value=f"用户: {current_user.username}"), 
             gr.update(visible=True)
         )
     else:
@@ -277,12 +284,10 @@ def update_user_info():
         )
 
 
-def check_auth_status():
-    """检查认证状态"""
-    global current_user
-    
+async def check_auth_status():
+    """检查认证状态（只读取内存状态，直接在事件循环中执行，不占用工作线程）"""
     if current_user:
-        return gr.update(value=f"用户: {current_user['username']}")
+        return gr.update(value=f"用户: {current_user.username}")
     else:
         return gr.update(value="未登录")
 
@@ -299,16 +304,10 @@ def get_auth_bridge():
 
 def update_video_selector_for_user():
     """更新视频选择器（基于用户）"""
-    global current_user
+    if not current_user or get_isolated_processor is None:
+        return gr.update(choices=[], value=None)
     
-    if not current_user or not auth_bridge:
-        return gr.Dropdown(choices=[], value=None)
-    
-    # 获取用户专属视频列表
-    result = auth_bridge.get_user_videos(current_user['user_id'])
-    if result['success']:
-        videos = result['videos']
-        choices = [f"{v['filename']}" for v in videos]
-        return gr.Dropdown(choices=choices, value=choices[0] if choices else None)
-    else:
-        return gr.Dropdown(choices=[], value=None)
\ No newline at end of file
+    # 选项为 (显示文本, 视频ID)，与 refresh_video_list 共用处理器的视频列表缓存，
+    # 显示文本在上传时已生成，视频目录未变化时不重新扫描
+    choices = get_isolated_processor().get_user_video_choices()
+    return gr.update(choices=choices, value=choices[0][1] if choices else None)
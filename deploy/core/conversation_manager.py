@@ -10,13 +10,16 @@ import json
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 
+from modules.utils.file_utils import load_json_file
+
 # 尝试导入对话链相关模块
 try:
     from modules.qa.conversation_chain import ConversationChain
+    from modules.qa.conversation_data import ConversationTurn
     print("✓ ConversationChain 导入成功")
 except ImportError as e:
     print(f"✗ ConversationChain 导入失败: {e}")
-    ConversationChain = None
+    ConversationChain = ConversationTurn = None
 
 
 class ConversationManager:
@@ -25,6 +28,8 @@ class ConversationManager:
     def __init__(self):
         """初始化对话管理器"""
         self.conversation_chains = {}
+        # 已解析的转录片段 {文件路径: (修改时间, segments)}，文件修改后重新解析
+        self._transcript_cache = {}
         self._init_retrievers()
     
     def _init_retrievers(self):
@@ -66,6 +71,22 @@ class ConversationManager:
             video_id = self._current_translating_video_id
             update_translation_progress(video_id, current, total, message)
     
+    def _load_transcript(self, video_id):
+        """读取视频的转录片段（按文件修改时间缓存解析结果），不存在时返回None"""
+        transcript_file = f"data/transcripts/{video_id}_transcript.json"
+        try:
+            mtime = os.stat(transcript_file).st_mtime_ns
+        except OSError:
+            return None
+        
+        cached = self._transcript_cache.get(transcript_file)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        
+        segments = load_json_file(transcript_file).get('segments')
+        self._transcript_cache[transcript_file] = (mtime, segments)
+        return segments
+    
     def create_conversation_chain(self, video_id, load_history=True):
         """为视频创建对话链
         
@@ -110,14 +131,10 @@ class ConversationManager:
                     self._load_conversation_history(conversation_chain, video_id)
                 
                 # 设置转录内容
-                transcript_file = f"data/transcripts/{video_id}_transcript.json"
-                if os.path.exists(transcript_file):
-                    import json
-                    with open(transcript_file, 'r', encoding='utf-8') as f:
-                        transcript_data = json.load(f)
-                        if 'segments' in transcript_data:
-                            conversation_chain.set_full_transcript(transcript_data['segments'])
-                            print(f"已为视频 {video_id} 设置转录内容，共 {len(transcript_data['segments'])} 个片段")
+                segments = self._load_transcript(video_id)
+                if segments is not None:
+                    conversation_chain.set_full_transcript(segments)
+                    print(f"已为视频 {video_id} 设置转录内容，共 {len(segments)} 个片段")
                 
                 return conversation_chain
             except Exception as e:
@@ -160,14 +177,10 @@ class ConversationManager:
                     conversation_chain = ConversationChain(session_id=new_session_id)
                     
                     # 设置转录内容
-                    transcript_file = f"data/transcripts/{video_id}_transcript.json"
-                    if os.path.exists(transcript_file):
-                        import json
-                        with open(transcript_file, 'r', encoding='utf-8') as f:
-                            transcript_data = json.load(f)
-                            if 'segments' in transcript_data:
-                                conversation_chain.set_full_transcript(transcript_data['segments'])
-                                print(f"已为视频 {video_id} 设置转录内容，共 {len(transcript_data['segments'])} 个片段")
+                    segments = self._load_transcript(video_id)
+                    if segments is not None:
+                        conversation_chain.set_full_transcript(segments)
+                        print(f"已为视频 {video_id} 设置转录内容，共 {len(segments)} 个片段")
                     
                     print(f"已创建全新对话链，会话ID: {new_session_id}")
                     return conversation_chain
@@ -188,14 +201,10 @@ class ConversationManager:
                 conversation_chain = ConversationChain(retriever=hybrid_retriever, session_id=new_session_id)
                 
                 # 设置转录内容
-                transcript_file = f"data/transcripts/{video_id}_transcript.json"
-                if os.path.exists(transcript_file):
-                    import json
-                    with open(transcript_file, 'r', encoding='utf-8') as f:
-                        transcript_data = json.load(f)
-                        if 'segments' in transcript_data:
-                            conversation_chain.set_full_transcript(transcript_data['segments'])
-                            print(f"已为视频 {video_id} 设置转录内容，共 {len(transcript_data['segments'])} 个片段")
+                segments = self._load_transcript(video_id)
+                if segments is not None:
+                    conversation_chain.set_full_transcript(segments)
+                    print(f"已为视频 {video_id} 设置转录内容，共 {len(segments)} 个片段")
                 
                 print(f"已创建全新对话链，会话ID: {new_session_id}")
                 return conversation_chain
@@ -228,11 +237,38 @@ class ConversationManager:
             if os.path.exists(conversation_history_path):
                 conversation_chain.load_conversation(conversation_history_path)
                 print(f"已加载视频 {video_id} 的对话历史")
-            else:
-                print(f"视频 {video_id} 暂无对话历史")
+            
+            # 对话链记录中没有轮次时（只有界面对话记录，或旧版界面消息写在 .json 中），用界面对话消息恢复
+            if not conversation_chain.conversation_history:
+                restored = self._restore_turns_from_gradio_history(conversation_chain, video_id)
+                if restored:
+                    print(f"已从界面对话记录恢复视频 {video_id} 的 {restored} 轮对话")
+                elif not os.path.exists(conversation_history_path):
+                    print(f"视频 {video_id} 暂无对话历史")
         except Exception as e:
             print(f"加载对话历史失败: {e}")
     
+    def _restore_turns_from_gradio_history(self, conversation_chain, video_id):
+        """把界面对话消息恢复为对话链的轮次（用户消息与随后的助手回复组成一轮），返回恢复的轮数"""
+        if ConversationTurn is None:
+            return 0
+        
+        restored = 0
+        user_query = None
+        for message in self._iter_gradio_conversation_history(video_id):
+            if message.get('role') == 'user':
+                user_query = message.get('content', '')
+            elif message.get('role') == 'assistant' and user_query is not None:
+                conversation_chain.current_turn_id += 1
+                conversation_chain._update_history(ConversationTurn(
+                    turn_id=conversation_chain.current_turn_id,
+                    user_query=user_query,
+                    response=message.get('content', '')
+                ))
+                user_query = None
+                restored += 1
+        return restored
+    
     def _save_conversation_history(self, conversation_chain, video_id):
         """保存对话历史"""
         try:
@@ -245,47 +281,76 @@ class ConversationManager:
         except Exception as e:
             print(f"保存对话历史失败: {e}")
     
+    def _gradio_history_paths(self, video_id):
+        """Gradio界面对话记录的文件路径：(逐行追加的消息JSONL, 只写一次的会话信息JSON)"""
+        return (
+            f"data/memory/{video_id}_conversation_history.jsonl",
+            f"data/memory/{video_id}_conversation_meta.json"
+        )
+    
     def _save_gradio_conversation_history(self, new_messages, video_id):
-        """直接保存Gradio界面的对话历史到文件"""
+        """直接保存Gradio界面的对话历史到文件（只追加本轮新消息，不重写已有记录）"""
         try:
             # 确保目录存在
             os.makedirs("data/memory", exist_ok=True)
             
-            conversation_history_path = f"data/memory/{video_id}_conversation_history.json"
+            history_path, meta_path = self._gradio_history_paths(video_id)
             
-            # 检查文件是否已存在
-            if os.path.exists(conversation_history_path):
-                # 如果文件存在，读取现有内容并合并
-                try:
-                    with open(conversation_history_path, 'r', encoding='utf-8') as f:
-                        existing_data = json.load(f)
-                except:
-                    existing_data = {
-                        'session_id': video_id,
-                        'created_at': datetime.now().isoformat(),
-                        'history': [],
-                        'config': {}
-                    }
-            else:
-                # 如果文件不存在，创建新的数据结构
-                existing_data = {
+            # 会话信息只在首次保存时写入
+            if not os.path.exists(meta_path):
+                meta = {
                     'session_id': video_id,
                     'created_at': datetime.now().isoformat(),
-                    'history': [],
                     'config': {}
                 }
+                with open(meta_path, 'w', encoding='utf-8') as f:
+                    json.dump(meta, f, ensure_ascii=False, indent=2)
             
-            # 合并新的对话历史
-            existing_data['history'].extend(new_messages)
-            
-            # 保存到文件
-            with open(conversation_history_path, 'w', encoding='utf-8') as f:
-                json.dump(existing_data, f, ensure_ascii=False, indent=2)
+            # 每条消息一行追加到文件末尾
+            with open(history_path, 'a', encoding='utf-8', buffering=1) as f:
+                for message in new_messages:
+                    f.write(json.dumps(message, ensure_ascii=False) + "\n")
             
             print(f"已保存视频 {video_id} 的Gradio对话历史")
         except Exception as e:
             print(f"保存Gradio对话历史失败: {e}")
     
+    def _iter_gradio_conversation_history(self, video_id):
+        """
+        按保存顺序逐条读取Gradio界面的对话消息，不整体载入内存
+        
+        旧版本把界面消息整体写在 .json 的 history 中，先读出这部分，再逐行读取JSONL；
+        跳过写入中断留下的不完整行
+        """
+        legacy_path = f"data/memory/{video_id}_conversation_history.json"
+        if os.path.exists(legacy_path):
+            try:
+                legacy_history = load_json_file(legacy_path).get('history', [])
+            except Exception as e:
+                print(f"读取旧版对话历史失败: {e}")
+                legacy_history = []
+            for message in legacy_history:
+                if isinstance(message, dict) and 'role' in message and 'content' in message:
+                    yield message
+        
+        history_path, _ = self._gradio_history_paths(video_id)
+        if not os.path.exists(history_path):
+            return
+        
+        with open(history_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+    
+    def get_gradio_conversation_history(self, video_id):
+        """获取Gradio界面显示的对话消息列表 [{"role", "content"}]"""
+        return list(self._iter_gradio_conversation_history(video_id))
+    
     def clear_conversation(self, video_id):
         """清空指定视频的对话历史，创建全新的对话链实例"""
         try:
@@ -293,11 +358,12 @@ class ConversationManager:
                 # 完全移除旧的对话链实例
                 del self.conversation_chains[video_id]
                 
-                # 删除保存的对话历史文件
+                # 删除保存的对话历史文件（对话链记录和界面对话记录）
                 conversation_history_path = f"data/memory/{video_id}_conversation_history.json"
-                if os.path.exists(conversation_history_path):
-                    os.remove(conversation_history_path)
-                    print(f"已删除视频 {video_id} 的对话历史文件")
+                for path in (conversation_history_path, *self._gradio_history_paths(video_id)):
+                    if os.path.exists(path):
+                        os.remove(path)
+                        print(f"已删除视频 {video_id} 的对话历史文件: {path}")
                 
                 print(f"已清除视频 {video_id} 的对话链实例，下次使用将创建新实例")
                 return True
@@ -311,8 +377,9 @@ class ConversationManager:
         try:
             # 检查对话历史是否存在
             conversation_history_path = f"data/memory/{video_id}_conversation_history.json"
-            print(f"检查对话历史文件: {conversation_history_path}")
-            if not os.path.exists(conversation_history_path):
+            gradio_history_path, _ = self._gradio_history_paths(video_id)
+            print(f"检查对话历史文件: {conversation_history_path}, {gradio_history_path}")
+            if not os.path.exists(conversation_history_path) and not os.path.exists(gradio_history_path):
                 print("对话历史文件不存在")
                 return {"error": "对话历史不存在"}
             
@@ -345,7 +412,8 @@ class ConversationManager:
                     return {
                         "success": True,
                         "message": f"成功加载对话历史（无索引）",
-                        "video_name": video_name
+                        "video_name": video_name,
+                        "chat_history": self.get_gradio_conversation_history(video_id)
                     }
                 except Exception as e2:
                     print(f"创建基本对话链失败: {e2}")
@@ -368,7 +436,8 @@ class ConversationManager:
                 return {
                     "success": True,
                     "message": f"成功加载对话历史和索引",
-                    "video_name": video_name
+                    "video_name": video_name,
+                    "chat_history": self.get_gradio_conversation_history(video_id)
                 }
             else:
                 return {"error": "创建对话链失败"}
@@ -427,14 +496,10 @@ class ConversationManager:
             self._load_conversation_history(conversation_chain, video_id)
             
             # 尝试加载转录内容（如果存在）
-            transcript_file = f"data/transcripts/{video_id}_transcript.json"
-            if os.path.exists(transcript_file):
-                import json
-                with open(transcript_file, 'r', encoding='utf-8') as f:
-                    transcript_data = json.load(f)
-                    if 'segments' in transcript_data:
-                        conversation_chain.set_full_transcript(transcript_data['segments'])
-                        print(f"已为视频 {video_id} 设置转录内容，共 {len(transcript_data['segments'])} 个片段")
+            segments = self._load_transcript(video_id)
+            if segments is not None:
+                conversation_chain.set_full_transcript(segments)
+                print(f"已为视频 {video_id} 设置转录内容，共 {len(segments)} 个片段")
             
             print(f"成功从索引创建对话链: {video_id}")
             return conversation_chain
@@ -10,6 +10,7 @@ import os
 import sys
 import json
 import time
+import threading
 from pathlib import Path
 from typing import List, Dict, Optional, Any
 from datetime import datetime
@@ -19,6 +20,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(
 
 # 导入用户上下文
 from deploy.utils.user_context import get_current_user_id, get_current_user_paths, require_user_login
+from modules.utils.file_utils import load_json_file
 
 # 导入原有模块
 try:
@@ -38,11 +40,14 @@ class IsolatedConversationManager:
         """初始化对话管理器"""
         self.conversation_chains = {}  # {user_id: {video_id: ConversationChain}}
         self._current_user_id = None
+        # 对话链创建会加载检索模型，创建和登记需在锁内完成，避免并发回调重复创建
+        self._chains_lock = threading.RLock()
     
     def _clear_user_data(self, user_id: str):
         """清除指定用户的所有数据"""
-        if user_id in self.conversation_chains:
-            del self.conversation_chains[user_id]
+        with self._chains_lock:
+            removed = self.conversation_chains.pop(user_id, None)
+        if removed is not None:
             print(f"✅ 已清除用户 {user_id} 的对话管理器数据")
     
     def _ensure_user_context(self):
@@ -65,26 +70,26 @@ class IsolatedConversationManager:
             video_id: 视频ID
             load_history: 是否加载历史对话
         """
-        # 确保用户上下文一致性
-        self._ensure_user_context()
-        
-        user_id = get_current_user_id()
-        if not user_id:
-            raise ValueError("用户未登录")
-        
-        # 确保用户字典存在
-        if user_id not in self.conversation_chains:
-            self.conversation_chains[user_id] = {}
-        
-        # 检查是否已存在对话链
-        if video_id in self.conversation_chains[user_id]:
-            return self.conversation_chains[user_id][video_id]
-        
-        # 创建新的对话链
-        conversation_chain = self._create_conversation_chain_internal(video_id, load_history)
-        self.conversation_chains[user_id][video_id] = conversation_chain
-        
-        return conversation_chain
+        with self._chains_lock:
+            # 确保用户上下文一致性
+            self._ensure_user_context()
+            
+            user_id = get_current_user_id()
+            if not user_id:
+                raise ValueError("用户未登录")
+            
+            # 确保用户字典存在
+            user_chains = self.conversation_chains.setdefault(user_id, {})
+            
+            # 检查是否已存在对话链
+            if video_id in user_chains:
+                return user_chains[video_id]
+            
+            # 创建新的对话链
+            conversation_chain = self._create_conversation_chain_internal(video_id, load_history)
+            user_chains[video_id] = conversation_chain
+            
+            return conversation_chain
     
     def _create_conversation_chain_internal(self, video_id: str, load_history: bool = True):
         """内部创建对话链的方法"""
@@ -149,11 +154,10 @@ class IsolatedConversationManager:
             # 设置转录内容
             transcript_file = user_paths.get_transcript_path(video_id)
             if transcript_file.exists():
-                with open(transcript_file, 'r', encoding='utf-8') as f:
-                    transcript_data = json.load(f)
-                    if 'segments' in transcript_data:
-                        conversation_chain.set_full_transcript(transcript_data['segments'])
-                        print(f"已为视频 {video_id} 设置转录内容，共 {len(transcript_data['segments'])} 个片段")
+                transcript_data = load_json_file(transcript_file)
+                if 'segments' in transcript_data:
+                    conversation_chain.set_full_transcript(transcript_data['segments'])
+                    print(f"已为视频 {video_id} 设置转录内容，共 {len(transcript_data['segments'])} 个片段")
             
             return conversation_chain
             
@@ -218,10 +222,10 @@ class IsolatedConversationManager:
         if not user_id:
             return False
         
-        if user_id in self.conversation_chains and video_id in self.conversation_chains[user_id]:
-            # 移除对话链实例
-            del self.conversation_chains[user_id][video_id]
-            
+        with self._chains_lock:
+            removed = self.conversation_chains.get(user_id, {}).pop(video_id, None)
+        
+        if removed is not None:
             # 删除保存的对话历史文件
             user_paths = get_current_user_paths()
             if user_paths:
@@ -355,6 +359,53 @@ class IsolatedConversationManager:
         except Exception as e:
             return f"问答失败: {str(e)}", chat_history
     
+    @require_user_login
+    def chat_with_video_stream(self, video_id: str, question: str, chat_history: List[Dict]):
+        """
+        基于视频内容进行流式问答
+        
+        先追加用户消息和空的助手消息，之后只在原地延长最后一条助手消息，
+        每收到一段回答就产出同一个历史列表
+        """
+        # 确保用户上下文一致性
+        self._ensure_user_context()
+        
+        # 确保历史记录格式正确
+        if not isinstance(chat_history, list):
+            chat_history = []
+        
+        chat_history.append({"role": "user", "content": question})
+        answer = {"role": "assistant", "content": ""}
+        chat_history.append(answer)
+        yield chat_history
+        
+        user_id = get_current_user_id()
+        if not user_id:
+            answer["content"] = "用户未登录"
+            yield chat_history
+            return
+        
+        # 获取或创建对话链
+        conversation_chain = self.get_conversation_chain(video_id)
+        if not conversation_chain:
+            conversation_chain = self.create_conversation_chain(video_id)
+        
+        if conversation_chain is None:
+            answer["content"] = "对话链初始化失败，请重启应用或联系管理员"
+            yield chat_history
+            return
+        
+        try:
+            for delta in conversation_chain.chat_stream(question):
+                answer["content"] += delta
+                yield chat_history
+            
+            # 保存对话历史
+            self.save_conversation_history(video_id)
+        except Exception as e:
+            answer["content"] = f"问答失败: {str(e)}"
+            yield chat_history
+    
     @require_user_login
     def load_conversation_without_video(self, video_id: str):
         """无需视频文件加载对话历史和索引"""
@@ -381,9 +432,8 @@ class IsolatedConversationManager:
             self._load_conversation_history(conversation_chain, video_id)
             
             # 添加到管理器
-            if user_id not in self.conversation_chains:
-                self.conversation_chains[user_id] = {}
-            self.conversation_chains[user_id][video_id] = conversation_chain
+            with self._chains_lock:
+                self.conversation_chains.setdefault(user_id, {})[video_id] = conversation_chain
             
             return {
                 "success": True,
@@ -396,9 +446,8 @@ class IsolatedConversationManager:
             conversation_chain = self._create_conversation_chain_internal(video_id, load_history=True)
             
             # 添加到管理器
-            if user_id not in self.conversation_chains:
-                self.conversation_chains[user_id] = {}
-            self.conversation_chains[user_id][video_id] = conversation_chain
+            with self._chains_lock:
+                self.conversation_chains.setdefault(user_id, {})[video_id] = conversation_chain
             
             return {
                 "success": True,
@@ -6,6 +6,7 @@
 
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Any, Optional
 
 
@@ -42,6 +43,38 @@ class IndexBuilder:
             self.bm25_retriever = None
             self.hybrid_retriever = None
     
+    def _build_indexes(self, video_id, documents):
+        """
+        并行构建并保存向量索引和BM25索引
+        
+        Returns:
+            (向量索引路径, BM25索引路径)
+        """
+        vector_index_path = f"data/vectors/{video_id}_vector_index.pkl"
+        bm25_index_path = f"data/vectors/{video_id}_bm25_index.pkl"
+        
+        # 向量编码（GPU）与BM25分词（CPU）互不依赖，并行构建
+        self.vector_store.clear()
+        self.bm25_retriever.clear()
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            vector_future = executor.submit(self.vector_store.add_documents, documents, "text")
+            bm25_future = executor.submit(self.bm25_retriever.add_documents, documents, "text")
+            vector_future.result()
+            bm25_future.result()
+        
+        # 混合检索器直接接管已构建的索引，无需重新添加文档
+        if self.hybrid_retriever:
+            self.hybrid_retriever.attach(self.vector_store, self.bm25_retriever)
+        
+        # 保存索引均为I/O操作，并行写入
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            vector_future = executor.submit(self.vector_store.save_index, vector_index_path)
+            bm25_future = executor.submit(self.bm25_retriever.save_index, bm25_index_path)
+            vector_future.result()
+            bm25_future.result()
+        
+        return vector_index_path, bm25_index_path
+    
     def build_vector_index(self, video_id):
         """
         为视频内容构建向量索引和BM25索引
@@ -74,24 +107,7 @@ class IndexBuilder:
                 }
                 documents.append(doc)
             
-            # 构建向量索引
-            self.vector_store.clear()
-            self.vector_store.add_documents(documents, text_field="text")
-            vector_index_path = f"data/vectors/{video_id}_vector_index.pkl"
-            self.vector_store.save_index(vector_index_path)
-            
-            # 构建BM25索引
-            self.bm25_retriever.clear()
-            self.bm25_retriever.add_documents(documents, text_field="text")
-            bm25_index_path = f"data/vectors/{video_id}_bm25_index.pkl"
-            self.bm25_retriever.save_index(bm25_index_path)
-            
-            # 如果有混合检索器，也添加文档
-            if self.hybrid_retriever:
-                self.hybrid_retriever.clear()
-                self.hybrid_retriever.add_documents(documents, text_field="text")
-                hybrid_index_path = f"data/vectors/{video_id}_hybrid_index.pkl"
-                self.hybrid_retriever.save_indexes(vector_index_path, bm25_index_path)
+            vector_index_path, bm25_index_path = self._build_indexes(video_id, documents)
             
             video_info["vector_index_built"] = True
             video_info["vector_index_path"] = vector_index_path
@@ -137,24 +153,7 @@ class IndexBuilder:
                 }
                 documents.append(doc)
             
-            # 构建向量索引
-            self.vector_store.clear()
-            self.vector_store.add_documents(documents, text_field="text")
-            vector_index_path = f"data/vectors/{video_id}_vector_index.pkl"
-            self.vector_store.save_index(vector_index_path)
-            
-            # 构建BM25索引
-            self.bm25_retriever.clear()
-            self.bm25_retriever.add_documents(documents, text_field="text")
-            bm25_index_path = f"data/vectors/{video_id}_bm25_index.pkl"
-            self.bm25_retriever.save_index(bm25_index_path)
-            
-            # 如果有混合检索器，也添加文档
-            if self.hybrid_retriever:
-                self.hybrid_retriever.clear()
-                self.hybrid_retriever.add_documents(documents, text_field="text")
-                hybrid_index_path = f"data/vectors/{video_id}_hybrid_index.pkl"
-                self.hybrid_retriever.save_indexes(vector_index_path, bm25_index_path)
+            vector_index_path, bm25_index_path = self._build_indexes(video_id, documents)
             
             video_info["vector_index_built"] = True
             video_info["vector_index_path"] = vector_index_path
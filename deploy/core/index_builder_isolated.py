@@ -10,14 +10,19 @@ import os
 import sys
 import json
 import pickle
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple
 
 # 添加项目根目录到Python路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 # 导入用户上下文
 from deploy.utils.user_context import get_current_user_id, get_current_user_paths, require_user_login
+from deploy.core.progress_events import progress_notifier
 
 # 导入用户隔离的检索模块
 try:
@@ -36,6 +41,14 @@ except ImportError as e:
     except ImportError as e2:
         print(f"⚠ 原有检索模块导入失败: {e2}")
 
+# 后台索引构建线程数：构建使用共享的向量存储和BM25检索器，整个构建过程持有 _index_lock，
+# 多个构建线程只会排队等锁，因此只用一个线程，其余任务在线程池队列中等待
+INDEX_THREADS = 1
+
+# 检索结果缓存的条目上限和有效秒数；索引文件重建后键随文件修改时间变化，旧结果不会再命中
+SEARCH_CACHE_SIZE = 2048
+SEARCH_CACHE_TTL = 30
+
 
 class IsolatedIndexBuilder:
     """用户隔离的索引构建器"""
@@ -46,6 +59,21 @@ class IsolatedIndexBuilder:
         self.bm25_retriever = None
         self.hybrid_retriever = None
         self._init_components()
+        
+        # 检索组件为共享实例，构建和检索时需要互斥
+        self._index_lock = threading.RLock()
+        
+        # 共享检索组件当前已加载的索引（索引文件路径与修改时间），同一视频连续检索时不重复加载
+        self._loaded_index = None
+        
+        # 检索结果缓存 {(索引键, 查询, 检索类型, 结果数): (过期时间, 结果)}
+        self._search_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._search_cache_lock = threading.Lock()
+        
+        # 后台索引构建线程池，以及正在构建的任务 {(user_id, video_id): Future}
+        self._index_pool = ThreadPoolExecutor(max_workers=INDEX_THREADS, thread_name_prefix="index-builder")
+        self._pending_builds: Dict[Tuple[str, str], Future] = {}
+        self._pending_lock = threading.Lock()
     
     def _init_components(self):
         """初始化组件"""
@@ -119,6 +147,89 @@ class IsolatedIndexBuilder:
         if not user_paths:
             return {"error": "用户路径获取失败"}
         
+        return self.build_index(video_id, transcript_data, user_id, user_paths)
+    
+    @require_user_login
+    def submit_user_index(self, video_id: str, transcript_data: Dict) -> Future:
+        """在后台线程池中为用户构建索引，同一视频正在构建时直接返回已有任务
+        
+        Args:
+            video_id: 视频ID
+            transcript_data: 转录数据
+            
+        Returns:
+            Future: 构建任务，结果与 build_user_index 的返回值相同
+        """
+        # 用户上下文是全局的，提交时就确定用户和路径，避免执行时用户已切换
+        user_id = get_current_user_id()
+        user_paths = get_current_user_paths()
+        if not user_id or not user_paths:
+            future = Future()
+            future.set_result({"error": "用户未登录" if not user_id else "用户路径获取失败"})
+            return future
+        
+        key = (user_id, video_id)
+        with self._pending_lock:
+            future = self._pending_builds.get(key)
+            if future is not None and not future.done():
+                return future
+            
+            future = self._index_pool.submit(self.build_index, video_id, transcript_data, user_id, user_paths)
+            self._pending_builds[key] = future
+        
+        def remove_pending(done_future):
+            with self._pending_lock:
+                if self._pending_builds.get(key) is done_future:
+                    del self._pending_builds[key]
+            progress_notifier.notify(video_id)
+        
+        future.add_done_callback(remove_pending)
+        progress_notifier.notify(video_id)
+        return future
+    
+    def has_pending_builds(self) -> bool:
+        """是否有任何用户的索引正在后台构建（完成的任务会被回调移除）"""
+        with self._pending_lock:
+            return bool(self._pending_builds)
+    
+    def is_index_building(self, video_id: str) -> bool:
+        """当前用户的指定视频是否正在后台构建索引"""
+        user_id = get_current_user_id()
+        if not user_id:
+            return False
+        
+        with self._pending_lock:
+            future = self._pending_builds.get((user_id, video_id))
+        return future is not None and not future.done()
+    
+    def has_current_index(self, video_id: str) -> bool:
+        """当前用户的视频索引文件是否齐全，且不早于转录文件（转录未变化，无需重建）"""
+        user_paths = get_current_user_paths()
+        if not user_paths:
+            return False
+        
+        try:
+            index_mtime = min(
+                user_paths.get_vector_index_path(video_id).stat().st_mtime_ns,
+                user_paths.get_bm25_index_path(video_id).stat().st_mtime_ns
+            )
+        except FileNotFoundError:
+            return False
+        
+        try:
+            return index_mtime >= user_paths.get_transcript_path(video_id).stat().st_mtime_ns
+        except FileNotFoundError:
+            return True
+    
+    def build_index(self, video_id: str, transcript_data: Dict, user_id: str, user_paths) -> Dict:
+        """为指定用户构建并保存索引（不读取当前用户上下文，供已确定用户的后台任务调用）
+        
+        Args:
+            video_id: 视频ID
+            transcript_data: 转录数据
+            user_id: 用户ID
+            user_paths: 用户路径管理器
+        """
         if not transcript_data or "segments" not in transcript_data:
             return {"error": "转录数据无效"}
         
@@ -138,49 +249,13 @@ class IsolatedIndexBuilder:
             if not documents:
                 return {"error": "没有可用的文档片段"}
             
-            # 构建向量索引
-            if self.vector_store:
-                self.vector_store.clear()
-                self.vector_store.add_documents(documents, text_field="text")
-                
-                # 使用用户隔离的保存方法（如果可用）
-                if hasattr(self.vector_store, 'save_user_index'):
-                    self.vector_store.save_user_index(video_id)
-                else:
-                    # 回退到原有方法
-                    vector_index_path = user_paths.get_vector_index_path(video_id)
-                    self.vector_store.save_index(vector_index_path)
-            else:
+            if not self.vector_store:
                 return {"error": "向量存储未初始化"}
-            
-            # 构建BM25索引
-            if self.bm25_retriever:
-                self.bm25_retriever.clear()
-                self.bm25_retriever.add_documents(documents, text_field="text")
-                
-                # 使用用户隔离的保存方法（如果可用）
-                if hasattr(self.bm25_retriever, 'save_user_index'):
-                    self.bm25_retriever.save_user_index(video_id)
-                else:
-                    # 回退到原有方法
-                    bm25_index_path = user_paths.get_bm25_index_path(video_id)
-                    self.bm25_retriever.save_index(bm25_index_path)
-            else:
+            if not self.bm25_retriever:
                 return {"error": "BM25检索器未初始化"}
             
-            # 构建混合索引元数据
-            hybrid_index_path = user_paths.get_hybrid_index_path(video_id)
-            hybrid_index_data = {
-                "video_id": video_id,
-                "user_id": user_id,
-                "vector_weight": 0.6,
-                "bm25_weight": 0.4,
-                "fusion_method": "weighted_average",
-                "document_count": len(documents)
-            }
-            
-            with open(hybrid_index_path, 'wb') as f:
-                pickle.dump(hybrid_index_data, f)
+            with self._index_lock:
+                self._build_and_save(video_id, documents, user_id, user_paths)
             
             return {
                 "success": True,
@@ -192,6 +267,73 @@ class IsolatedIndexBuilder:
         except Exception as e:
             return {"error": f"索引构建失败: {str(e)}"}
     
+    def _build_and_save(self, video_id: str, documents: List[Dict], user_id: str, user_paths):
+        """用共享的检索组件构建索引并保存（调用方需持有 _index_lock）"""
+        # 共享组件将被清空重建，下次检索需要重新加载索引
+        self._loaded_index = None
+        
+        # 向量编码（GPU）与BM25分词（CPU）互不依赖，并行构建
+        self.vector_store.clear()
+        self.bm25_retriever.clear()
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            vector_future = executor.submit(self.vector_store.add_documents, documents, "text")
+            # 同一视频重建索引时复用已保存的分词结果
+            tokens_cache_path = self.bm25_retriever.get_tokens_cache_path(user_paths.get_bm25_index_path(video_id))
+            bm25_future = executor.submit(self.bm25_retriever.add_documents, documents, "text",
+                                          None, tokens_cache_path)
+            vector_future.result()
+            bm25_future.result()
+        
+        # 混合检索器直接接管已构建的索引，无需重新添加文档
+        if self.hybrid_retriever:
+            self.hybrid_retriever.attach(self.vector_store, self.bm25_retriever)
+        
+        # 混合索引元数据只引用向量和BM25索引文件并记录融合参数，不重复保存文档
+        hybrid_index_path = user_paths.get_hybrid_index_path(video_id)
+        
+        def save_hybrid_metadata():
+            if self.hybrid_retriever:
+                self.hybrid_retriever.save_index_metadata(
+                    hybrid_index_path,
+                    user_paths.get_vector_index_path(video_id),
+                    user_paths.get_bm25_index_path(video_id),
+                    video_id=video_id,
+                    user_id=user_id,
+                    document_count=len(documents)
+                )
+                return
+            
+            hybrid_index_data = {
+                "video_id": video_id,
+                "user_id": user_id,
+                "vector_weight": 0.6,
+                "bm25_weight": 0.4,
+                "fusion_method": "weighted_average",
+                "document_count": len(documents)
+            }
+            with open(hybrid_index_path, 'wb') as f:
+                pickle.dump(hybrid_index_data, f)
+        
+        # 三个索引文件的保存均为I/O操作，并行写入
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = [
+                executor.submit(self._save_vector_index, video_id, user_paths),
+                executor.submit(self._save_bm25_index, video_id, user_paths),
+                executor.submit(save_hybrid_metadata)
+            ]
+            for future in futures:
+                future.result()
+    
+    def _save_vector_index(self, video_id: str, user_paths):
+        """保存向量索引到提交构建时确定的用户目录"""
+        # 不使用 save_user_index：它保存到创建共享检索器时的用户目录，不一定是本次构建的用户，
+        # 会与混合索引元数据中引用的路径不一致
+        self.vector_store.save_index(user_paths.get_vector_index_path(video_id))
+    
+    def _save_bm25_index(self, video_id: str, user_paths):
+        """保存BM25索引到提交构建时确定的用户目录"""
+        self.bm25_retriever.save_index(user_paths.get_bm25_index_path(video_id))
+    
     @require_user_login
     def search_in_video(self, video_id: str, query: str, search_type: str = "hybrid", top_k: int = 5):
         """在指定视频中搜索
@@ -215,71 +357,132 @@ class IsolatedIndexBuilder:
             vector_index_path = user_paths.get_vector_index_path(video_id)
             bm25_index_path = user_paths.get_bm25_index_path(video_id)
             
-            if not vector_index_path.exists() or not bm25_index_path.exists():
+            try:
+                index_key = (str(vector_index_path), vector_index_path.stat().st_mtime_ns,
+                             bm25_index_path.stat().st_mtime_ns)
+            except FileNotFoundError:
                 return {"error": "索引不存在，请先构建索引"}
             
-            # 加载索引
-            if self.vector_store:
-                self.vector_store.clear()
-                self.vector_store.load_index(vector_index_path)
+            # 相同查询在索引未变化时直接返回缓存结果（空白差异视为同一查询）
+            cache_key = (index_key, " ".join(query.split()), search_type, top_k)
+            cached = self._get_cached_search(cache_key)
+            if cached is not None:
+                return cached
             
-            if self.bm25_retriever:
-                self.bm25_retriever.clear()
-                self.bm25_retriever.load_index(bm25_index_path)
+            # 在加锁前编码查询：并发检索的查询由向量存储合并为一批编码，锁内只做打分
+            query_embedding = None
+            if search_type in ("vector", "hybrid") and hasattr(self.vector_store, "encode_query"):
+                query_embedding = self.vector_store.encode_query(query)
             
-            # 执行搜索
-            if search_type == "vector" and self.vector_store:
-                results = self.vector_store.search(query, top_k=top_k)
-                formatted_results = []
-                for result in results:
-                    formatted_results.append({
-                        "type": "vector",
-                        "text": result["document"]["text"],
-                        "start": result["document"]["start"],
-                        "end": result["document"]["end"],
-                        "score": result["similarity"],
-                        "timestamp": result["document"]["start"]
-                    })
-            elif search_type == "bm25" and self.bm25_retriever:
-                results = self.bm25_retriever.search(query, top_k=top_k)
-                formatted_results = []
-                for result in results:
-                    formatted_results.append({
-                        "type": "bm25",
-                        "text": result["document"]["text"],
-                        "start": result["document"]["start"],
-                        "end": result["document"]["end"],
-                        "score": result["score"],
-                        "timestamp": result["document"]["start"]
-                    })
-            elif search_type == "hybrid" and self.hybrid_retriever:
-                results = self.hybrid_retriever.search(query, top_k=top_k)
-                formatted_results = []
-                for result in results:
-                    formatted_results.append({
-                        "type": "hybrid",
-                        "text": result["text"],
-                        "start": result["start"],
-                        "end": result["end"],
-                        "score": result["score"],
-                        "timestamp": result["start"],
-                        "vector_score": result.get("similarity", 0),
-                        "bm25_score": result.get("bm25_score", 0)
-                    })
-            else:
-                return {"error": f"不支持的搜索类型: {search_type}"}
+            # 检索组件为共享实例，加载和检索期间不能被后台构建替换
+            with self._index_lock:
+                # 加载索引（共享组件中已是该索引时跳过）
+                if self._loaded_index != index_key:
+                    self._loaded_index = None
+                    if self.vector_store:
+                        self.vector_store.clear()
+                        self.vector_store.load_index(vector_index_path)
+                    
+                    if self.bm25_retriever:
+                        self.bm25_retriever.clear()
+                        self.bm25_retriever.load_index(bm25_index_path)
+                    self._loaded_index = index_key
+                
+                # 执行搜索
+                if search_type == "vector" and self.vector_store:
+                    results = self.vector_store.search(query, top_k=top_k, query_embedding=query_embedding)
+                    formatted_results = []
+                    for result in results:
+                        formatted_results.append({
+                            "type": "vector",
+                            "text": result["document"]["text"],
+                            "start": result["document"]["start"],
+                            "end": result["document"]["end"],
+                            "score": result["similarity"],
+                            "timestamp": result["document"]["start"]
+                        })
+                elif search_type == "bm25" and self.bm25_retriever:
+                    results = self.bm25_retriever.search(query, top_k=top_k)
+                    formatted_results = []
+                    for result in results:
+                        formatted_results.append({
+                            "type": "bm25",
+                            "text": result["document"]["text"],
+                            "start": result["document"]["start"],
+                            "end": result["document"]["end"],
+                            "score": result["score"],
+                            "timestamp": result["document"]["start"]
+                        })
+                elif search_type == "hybrid" and self.hybrid_retriever:
+                    results = self.hybrid_retriever.search(query, top_k=top_k, query_embedding=query_embedding)
+                    formatted_results = []
+                    for result in results:
+                        formatted_results.append({
+                            "type": "hybrid",
+                            "text": result["text"],
+                            "start": result["start"],
+                            "end": result["end"],
+                            "score": result["score"],
+                            "timestamp": result["start"],
+                            "vector_score": result.get("similarity", 0),
+                            "bm25_score": result.get("bm25_score", 0)
+                        })
+                else:
+                    return {"error": f"不支持的搜索类型: {search_type}"}
+                
+                search_result = {
+                    "success": True,
+                    "results": formatted_results,
+                    "query": query,
+                    "search_type": search_type,
+                    "total_results": len(formatted_results)
+                }
             
-            return {
-                "success": True,
-                "results": formatted_results,
-                "query": query,
-                "search_type": search_type,
-                "total_results": len(formatted_results)
-            }
+            self._set_cached_search(cache_key, search_result)
+            return dict(search_result, results=list(formatted_results))
             
         except Exception as e:
             return {"error": f"搜索失败: {str(e)}"}
     
+    def clear_components(self):
+        """
+        清空共享检索组件中已加载的索引以及检索结果缓存（切换用户时调用）
+        
+        后台正在构建索引时不等待构建结束：组件此时属于构建任务，构建完成后下次检索会重新加载
+        """
+        self._loaded_index = None
+        if self._index_lock.acquire(blocking=False):
+            try:
+                self._loaded_index = None
+                for component in (self.vector_store, self.bm25_retriever, self.hybrid_retriever):
+                    if component and hasattr(component, 'clear'):
+                        component.clear()
+            finally:
+                self._index_lock.release()
+        with self._search_cache_lock:
+            self._search_cache.clear()
+    
+    def _get_cached_search(self, cache_key: tuple) -> Optional[Dict]:
+        """读取未过期的检索结果缓存，返回副本"""
+        with self._search_cache_lock:
+            cached = self._search_cache.get(cache_key)
+            if cached is None:
+                return None
+            if cached[0] <= time.monotonic():
+                del self._search_cache[cache_key]
+                return None
+            self._search_cache.move_to_end(cache_key)
+            search_result = cached[1]
+        return dict(search_result, results=list(search_result["results"]))
+    
+    def _set_cached_search(self, cache_key: tuple, search_result: Dict):
+        """写入检索结果缓存，超出上限时淘汰最久未使用的条目"""
+        with self._search_cache_lock:
+            self._search_cache[cache_key] = (time.monotonic() + SEARCH_CACHE_TTL, search_result)
+            self._search_cache.move_to_end(cache_key)
+            while len(self._search_cache) > SEARCH_CACHE_SIZE:
+                self._search_cache.popitem(last=False)
+    
     @require_user_login
     def delete_user_index(self, video_id: str):
         """删除用户索引
@@ -303,12 +506,19 @@ class IsolatedIndexBuilder:
             if vector_index_path.exists():
                 vector_index_path.unlink()
                 deleted_files.append("向量索引")
+            for suffix in (".npy", ".hnsw"):
+                sidecar_path = vector_index_path.with_suffix(suffix)
+                if sidecar_path.exists():
+                    sidecar_path.unlink()
             
             # 删除BM25索引
             bm25_index_path = user_paths.get_bm25_index_path(video_id)
             if bm25_index_path.exists():
                 bm25_index_path.unlink()
                 deleted_files.append("BM25索引")
+            tokens_cache_path = bm25_index_path.with_suffix(".tokens.npz")
+            if tokens_cache_path.exists():
+                tokens_cache_path.unlink()
             
             # 删除混合索引元数据
             hybrid_index_path = user_paths.get_hybrid_index_path(video_id)
@@ -372,14 +582,20 @@ class IsolatedIndexBuilder:
 
 # 全局实例
 _index_builder = None
+_index_builder_lock = threading.RLock()
 
 
 def get_index_builder() -> IsolatedIndexBuilder:
     """获取索引构建器实例（单例）"""
     global _index_builder
-    if _index_builder is None:
-        _index_builder = IsolatedIndexBuilder()
-    return _index_builder
+    if _index_builder is not None:
+        return _index_builder
+    
+    # 初始化会加载检索模型，加锁避免并发回调重复创建
+    with _index_builder_lock:
+        if _index_builder is None:
+            _index_builder = IsolatedIndexBuilder()
+        return _index_builder
 
 
 if __name__ == "__main__":
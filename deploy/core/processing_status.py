@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+视频处理状态记录
+
+进度轮询会频繁读写处理状态，这里缓存日志时间戳，减少轮询路径上的格式化开销；
+同一视频始终使用同一条记录（重新上传时原地重置），记录每次变化都会通知界面的进度推送
+"""
+
+import time
+import threading
+from collections import deque
+
+from deploy.core.progress_events import progress_notifier
+
+# 每条处理记录最多保留的日志条数
+LOG_MAXLEN = 200
+
+# 按秒缓存的 "%H:%M:%S" 时间戳
+_last_ts = 0
+_last_ts_str = ""
+
+
+def log_timestamp() -> str:
+    """获取当前时间的 HH:MM:SS 字符串，同一秒内复用格式化结果"""
+    global _last_ts, _last_ts_str
+    now = int(time.time())
+    if now != _last_ts:
+        _last_ts_str = time.strftime('%H:%M:%S', time.localtime(now))
+        _last_ts = now
+    return _last_ts_str
+
+
+class ProcessingRecord(dict):
+    """
+    可复用的处理状态记录，保持与原先状态字典相同的键
+
+    每条记录（即每个视频）有自己的可重入锁：后台处理线程写入、界面回调读取时
+    只在同一视频的记录上互斥，不同视频之间互不等待
+    """
+
+    def __init__(self):
+        self.video_id = None
+        self._lock = threading.RLock()
+        super().__init__(
+            progress=0.0,
+            current_step="",
+            log_messages=deque(maxlen=LOG_MAXLEN),
+            transcript_parts=[],
+            status="processing"
+        )
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            super().__setitem__(key, value)
+        progress_notifier.notify(self.video_id)
+
+    def update(self, *args, **fields):
+        """在同一把锁内一次写入多个字段，读取方不会看到只更新了一半的状态"""
+        with self._lock:
+            super().update(*args, **fields)
+        progress_notifier.notify(self.video_id)
+
+    def snapshot(self) -> dict:
+        """在锁内复制当前状态（日志和已识别片段复制为列表），供界面回调读取"""
+        with self._lock:
+            state = dict(self)
+            state["log_messages"] = list(self["log_messages"])
+            state["transcript_parts"] = list(self["transcript_parts"])
+        return state
+
+    def reset(self, current_step: str = "", progress: float = 0.0, status: str = "processing",
+              video_id: str = None):
+        """重置记录以便复用"""
+        with self._lock:
+            self.video_id = video_id
+            self["log_messages"].clear()
+            self["transcript_parts"].clear()
+            self.update(progress=progress, current_step=current_step, status=status)
+        return self
+
+    def add_transcript_part(self, text: str):
+        """追加一段已识别的转录文本，识别过程中界面即可显示部分转录"""
+        with self._lock:
+            self["transcript_parts"].append(text)
+        progress_notifier.notify(self.video_id)
+
+    def log(self, message: str):
+        """追加一条带时间戳的日志"""
+        with self._lock:
+            self["log_messages"].append(f"[{log_timestamp()}] {message}")
+        progress_notifier.notify(self.video_id)
+
+
+def reset_record(status_map: dict, video_id: str, current_step: str = "",
+                 progress: float = 0.0, status: str = "processing") -> ProcessingRecord:
+    """
+    重置视频的状态记录，没有记录时新建
+
+    已有记录时原地重置而不替换：仍在运行的处理任务持有的是同一条记录，
+    之后的进度会继续写到界面读取的这条记录上
+    """
+    record = status_map.get(video_id)
+    if not isinstance(record, ProcessingRecord):
+        record = ProcessingRecord()
+        status_map[video_id] = record
+    return record.reset(current_step, progress, status, video_id)
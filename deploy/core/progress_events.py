@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+进度变更通知
+
+后台线程（视频处理、翻译、索引构建）更新进度时调用 notify，
+界面的推送回调在 asyncio 中等待对应视频的进度变化，不再按固定间隔轮询
+"""
+
+import asyncio
+import threading
+from typing import Dict, List, Optional, Tuple
+
+
+class ProgressNotifier:
+    """按视频ID记录进度版本号，并唤醒等待该视频进度变化的协程"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions: Dict[str, int] = {}
+        self._waiters: Dict[str, List[Tuple[asyncio.AbstractEventLoop, asyncio.Event]]] = {}
+
+    def version(self, video_id: str) -> int:
+        """获取视频当前的进度版本号"""
+        with self._lock:
+            return self._versions.get(video_id, 0)
+
+    def notify(self, video_id: str) -> None:
+        """标记视频进度已变化（可在任意线程调用）"""
+        if not video_id:
+            return
+
+        with self._lock:
+            self._versions[video_id] = self._versions.get(video_id, 0) + 1
+            waiters = self._waiters.pop(video_id, [])
+
+        for loop, event in waiters:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # 等待方的事件循环已关闭
+                pass
+
+    async def wait_for_change(self, video_id: str, seen_version: int,
+                              timeout: Optional[float] = None) -> int:
+        """
+        等待视频进度版本号变化
+
+        Args:
+            video_id: 视频ID
+            seen_version: 调用方已处理过的版本号
+            timeout: 最长等待秒数，None表示一直等待
+
+        Returns:
+            int: 返回时的版本号，超时未变化时与 seen_version 相同
+        """
+        loop = asyncio.get_running_loop()
+        event = asyncio.Event()
+        waiter = (loop, event)
+
+        with self._lock:
+            current = self._versions.get(video_id, 0)
+            if current != seen_version:
+                return current
+            self._waiters.setdefault(video_id, []).append(waiter)
+
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._lock:
+                waiters = self._waiters.get(video_id)
+                if waiters and waiter in waiters:
+                    waiters.remove(waiter)
+                    if not waiters:
+                        del self._waiters[video_id]
+
+        return self.version(video_id)
+
+
+# 全局进度通知器
+progress_notifier = ProgressNotifier()
+
+
+def get_progress_notifier() -> ProgressNotifier:
+    """获取全局进度通知器"""
+    return progress_notifier
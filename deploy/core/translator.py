@@ -21,7 +21,8 @@ class TranslatorManager:
             from modules.text.translator import TextTranslator
             self.translator = TextTranslator(
                 default_method="deep-translator",
-                progress_callback=self._on_translation_progress
+                progress_callback=self._on_translation_progress,
+                persistent_cache=True
             )
             self.mock_mode = False
             print("✓ 翻译器初始化成功")
@@ -9,7 +9,6 @@
 import os
 import sys
 import time
-import json
 from pathlib import Path
 from typing import Dict, Any, Optional
 
@@ -18,6 +17,8 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(
 
 # 导入用户上下文
 from deploy.utils.user_context import get_current_user_id, get_current_user_paths, require_user_login
+from modules.utils.file_utils import dump_json_file, load_json_file
+from deploy.core.progress_events import progress_notifier
 
 
 class IsolatedTranslatorManager:
@@ -27,6 +28,7 @@ class IsolatedTranslatorManager:
         """初始化翻译管理器"""
         self._init_translator()
         self.translation_progress = {}  # 用户隔离的翻译进度
+        self._active_translations = set()  # 正在翻译的 (用户ID, 视频ID)
     
     def _init_translator(self):
         """初始化翻译器"""
@@ -34,7 +36,8 @@ class IsolatedTranslatorManager:
             from modules.text.translator import TextTranslator
             self.translator = TextTranslator(
                 default_method="deep-translator",
-                progress_callback=self._on_translation_progress
+                progress_callback=self._on_translation_progress,
+                persistent_cache=True
             )
             self.mock_mode = False
             print("✓ 翻译器初始化成功")
@@ -51,6 +54,36 @@ class IsolatedTranslatorManager:
             video_id = self._current_translating_video_id
             self.update_translation_progress(video_id, current, total, message)
     
+    def update_translation_progress(self, video_id: str, current: int, total: int, message: str):
+        """更新当前用户指定视频的翻译进度"""
+        user_id = get_current_user_id()
+        if not user_id:
+            return
+        
+        self._set_progress(user_id, video_id, current, total,
+                           current / total if total > 0 else 0.0, message)
+    
+    def _set_progress(self, user_id: str, video_id: str, current: int, total: int,
+                      progress: float, message: str):
+        """写入翻译进度并通知界面推送"""
+        self.translation_progress[f"{user_id}_{video_id}"] = {
+            "current": current,
+            "total": total,
+            "progress": progress,
+            "message": message,
+            "timestamp": time.time()
+        }
+        progress_notifier.notify(video_id)
+    
+    def has_active_translations(self) -> bool:
+        """是否有任何用户的翻译正在进行（不查询用户上下文）"""
+        return bool(self._active_translations)
+    
+    def is_translating(self, video_id: str) -> bool:
+        """当前用户的指定视频是否正在翻译"""
+        user_id = get_current_user_id()
+        return bool(user_id) and (user_id, video_id) in self._active_translations
+    
     @require_user_login
     def translate_transcript(self, video_id: str, target_lang: str):
         """
@@ -74,38 +107,27 @@ class IsolatedTranslatorManager:
         
         try:
             # 读取转录文件
-            with open(transcript_path, 'r', encoding='utf-8') as f:
-                transcript_data = json.load(f)
+            transcript_data = load_json_file(transcript_path)
             
             # 设置当前正在翻译的视频ID，用于进度回调
             self._current_translating_video_id = video_id
             
             # 初始化翻译进度
-            progress_key = f"{user_id}_{video_id}"
-            self.translation_progress[progress_key] = {
-                "current": 0,
-                "total": 0,
-                "progress": 0.0,
-                "message": "准备翻译...",
-                "timestamp": time.time()
-            }
+            self._active_translations.add((user_id, video_id))
+            self._set_progress(user_id, video_id, 0, 0, 0.0, "准备翻译...")
             
             # 执行翻译
-            translated_transcript = self.translator.translate_transcript(transcript_data, target_lang)
+            try:
+                translated_transcript = self.translator.translate_transcript(transcript_data, target_lang)
+            finally:
+                self._active_translations.discard((user_id, video_id))
             
             # 保存翻译结果到用户专属目录
             translated_path = user_paths.get_transcript_path(f"{video_id}_translated_{target_lang}")
-            with open(translated_path, 'w', encoding='utf-8') as f:
-                json.dump(translated_transcript, f, ensure_ascii=False, indent=2)
+            dump_json_file(translated_transcript, translated_path)
             
             # 更新翻译完成状态
-            self.translation_progress[progress_key] = {
-                "current": 1,
-                "total": 1,
-                "progress": 1.0,
-                "message": "翻译完成",
-                "timestamp": time.time()
-            }
+            self._set_progress(user_id, video_id, 1, 1, 1.0, "翻译完成")
             
             return {
                 "success": True,
@@ -115,14 +137,7 @@ class IsolatedTranslatorManager:
             }
         except Exception as e:
             # 更新错误状态
-            progress_key = f"{user_id}_{video_id}"
-            self.translation_progress[progress_key] = {
-                "current": 0,
-                "total": 0,
-                "progress": 0.0,
-                "message": f"翻译失败: {str(e)}",
-                "timestamp": time.time()
-            }
+            self._set_progress(user_id, video_id, 0, 0, 0.0, f"翻译失败: {str(e)}")
             return {"error": f"翻译失败: {str(e)}"}
     
     @require_user_login
@@ -146,38 +161,27 @@ class IsolatedTranslatorManager:
         
         try:
             # 读取转录文件
-            with open(transcript_path, 'r', encoding='utf-8') as f:
-                transcript_data = json.load(f)
+            transcript_data = load_json_file(transcript_path)
             
             # 设置当前正在翻译的视频ID，用于进度回调
             self._current_translating_video_id = video_id
             
             # 初始化翻译进度
-            progress_key = f"{user_id}_{video_id}"
-            self.translation_progress[progress_key] = {
-                "current": 0,
-                "total": 0,
-                "progress": 0.0,
-                "message": "准备翻译...",
-                "timestamp": time.time()
-            }
+            self._active_translations.add((user_id, video_id))
+            self._set_progress(user_id, video_id, 0, 0, 0.0, "准备翻译...")
             
             # 执行翻译
-            translated_transcript = self.translator.translate_transcript(transcript_data, target_lang)
+            try:
+                translated_transcript = self.translator.translate_transcript(transcript_data, target_lang)
+            finally:
+                self._active_translations.discard((user_id, video_id))
             
             # 保存翻译结果到用户专属目录
             translated_path = user_paths.get_transcript_path(f"{video_id}_translated_{target_lang}")
-            with open(translated_path, 'w', encoding='utf-8') as f:
-                json.dump(translated_transcript, f, ensure_ascii=False, indent=2)
+            dump_json_file(translated_transcript, translated_path)
             
             # 更新翻译完成状态
-            self.translation_progress[progress_key] = {
-                "current": 1,
-                "total": 1,
-                "progress": 1.0,
-                "message": "翻译完成",
-                "timestamp": time.time()
-            }
+            self._set_progress(user_id, video_id, 1, 1, 1.0, "翻译完成")
             
             return {
                 "success": True,
@@ -188,14 +192,7 @@ class IsolatedTranslatorManager:
             }
         except Exception as e:
             # 更新错误状态
-            progress_key = f"{user_id}_{video_id}"
-            self.translation_progress[progress_key] = {
-                "current": 0,
-                "total": 0,
-                "progress": 0.0,
-                "message": f"翻译失败: {str(e)}",
-                "timestamp": time.time()
-            }
+            self._set_progress(user_id, video_id, 0, 0, 0.0, f"翻译失败: {str(e)}")
             return {"error": f"翻译失败: {str(e)}"}
     
     @require_user_login
@@ -237,8 +234,7 @@ class IsolatedTranslatorManager:
             return {"error": "翻译文件不存在"}
         
         try:
-            with open(translated_path, 'r', encoding='utf-8') as f:
-                translated_data = json.load(f)
+            translated_data = load_json_file(translated_path)
             
             return {
                 "success": True,
@@ -251,9 +247,10 @@ class IsolatedTranslatorManager:
     
     def _clear_user_data(self, user_id: str):
         """清除指定用户的翻译进度数据"""
-        keys_to_remove = [key for key in self.translation_progress.keys() if key.startswith(f"{user_id}_")]
+        keys_to_remove = [key for key in list(self.translation_progress) if key.startswith(f"{user_id}_")]
         for key in keys_to_remove:
-            del self.translation_progress[key]
+            self.translation_progress.pop(key, None)
+        self._active_translations = {item for item in self._active_translations if item[0] != user_id}
         print(f"✅ 已清除用户 {user_id} 的翻译进度数据")
 
 
@@ -6,10 +6,12 @@
 
 import os
 import time
-import shutil
 from pathlib import Path
 from typing import Dict, Any, Optional
 
+from modules.utils.file_utils import fast_copy_file
+from .processing_status import reset_record
+
 # 全局变量
 processing_status = {}
 video_data = {}
@@ -167,7 +169,7 @@ class VideoProcessor:
             
             # 复制文件到上传目录
             upload_path = Path(f"data/uploads/{video_id}{video_path.suffix}")
-            shutil.copy2(video_file, upload_path)
+            fast_copy_file(video_file, upload_path)
             
             # 验证视频
             video_info = self.video_loader.validate_video(upload_path)
@@ -188,12 +190,8 @@ class VideoProcessor:
             }
             
             # 开始处理
-            processing_status[video_id] = {
-                "progress": 0.0,
-                "current_step": "开始处理...",
-                "log_messages": [f"[{time.strftime('%H:%M:%S')}] 视频上传成功: {video_path.name}"],
-                "status": "processing"
-            }
+            status = reset_record(processing_status, video_id, current_step="开始处理...")
+            status.log(f"视频上传成功: {video_path.name}")
             
             return {
                 "video_id": video_id,
@@ -242,18 +240,18 @@ class VideoProcessor:
             if progress < 0.2:
                 # 提取音频
                 status["current_step"] = "提取音频中..."
-                status["log_messages"].append(f"[{time.strftime('%H:%M:%S')}] 开始提取音频")
+                status.log("开始提取音频")
                 status["progress"] = 0.2
                 
                 video_path = Path(video_info["file_path"])
                 audio_path = self.audio_extractor.extract_audio(video_path)
                 video_info["audio_path"] = str(audio_path)
-                status["log_messages"].append(f"[{time.strftime('%H:%M:%S')}] 音频提取完成")
+                status.log("音频提取完成")
                 
             elif progress < 0.7:
                 # 语音转文本
                 status["current_step"] = "语音转文本中..."
-                status["log_messages"].append(f"[{time.strftime('%H:%M:%S')}] 开始语音转文本")
+                status.log("开始语音转文本")
                 status["progress"] = 0.7
                 
                 if "audio_path" in video_info:
@@ -265,7 +263,7 @@ class VideoProcessor:
                     transcript_path = Path(f"data/transcripts/{video_id}_transcript.json")
                     self.file_manager.save_transcript_json(transcript_result, transcript_path)
                     
-                    status["log_messages"].append(f"[{time.strftime('%H:%M:%S')}] 语音转文本完成")
+                    status.log("语音转文本完成")
                     
                     # 清理临时音频文件
                     if audio_path.exists():
@@ -274,7 +272,7 @@ class VideoProcessor:
             elif progress < 0.9:
                 # 处理流程中的其他步骤
                 status["current_step"] = "准备完成..."
-                status["log_messages"].append(f"[{time.strftime('%H:%M:%S')}] 处理即将完成")
+                status.log("处理即将完成")
                 status["progress"] = 0.9
                     
             else:
@@ -282,13 +280,13 @@ class VideoProcessor:
                 status["progress"] = 1.0
                 status["current_step"] = "处理完成"
                 status["status"] = "completed"
-                status["log_messages"].append(f"[{time.strftime('%H:%M:%S')}] 所有处理任务完成")
+                status.log("所有处理任务完成")
                 video_info["status"] = "completed"
                 
         except Exception as e:
             status["status"] = "error"
             status["current_step"] = f"处理失败: {str(e)}"
-            status["log_messages"].append(f"[{time.strftime('%H:%M:%S')}] 错误: {str(e)}")
+            status.log(f"错误: {str(e)}")
     
     def get_video_info(self, video_id):
         """
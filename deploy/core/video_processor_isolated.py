@@ -9,8 +9,11 @@
 import os
 import sys
 import time
-import shutil
+import hashlib
 import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Dict, Optional, Any
 from datetime import datetime
@@ -20,6 +23,8 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(
 
 # 导入用户上下文
 from deploy.utils.user_context import get_current_user_id, get_current_user_paths, require_user_login
+from modules.utils.file_utils import fast_copy_file, load_json_file
+from deploy.core.processing_status import ProcessingRecord, reset_record
 
 # 导入原有模块
 try:
@@ -37,19 +42,95 @@ except ImportError as e:
     print(f"⚠ 模块导入失败: {e}")
 
 
+@lru_cache(maxsize=256)
+def _read_video_data(data_file: str, mtime_ns: int, size: int) -> Dict:
+    """解析视频数据文件，mtime/size 参与缓存键，文件被改写后自动失效"""
+    return load_json_file(data_file)
+
+
+# 视频数据的写入代数，每次保存视频数据时递增，用于判断视频列表缓存是否过期
+_video_data_generation = 0
+
+# 用户ID -> (缓存键, 视频列表)
+_video_list_cache: Dict[str, tuple] = {}
+_video_list_lock = threading.Lock()
+
+
+# 视频处理（音频提取 + Whisper识别）线程数，GPU同一时间只跑一个识别任务
+PROCESSING_THREADS = 1
+
+# 所有处理器共享的后台处理线程池，上传回调只提交任务，不在请求线程上做识别
+_processing_pool = ThreadPoolExecutor(max_workers=PROCESSING_THREADS, thread_name_prefix="video-processor")
+
+# 所有处理器共享的处理状态记录 {user_id: {video_id: 记录}}，以及正在后台处理的任务 {(user_id, video_id): Future}；
+# 上传可能使用任意设备/模型/精度配置的处理器，界面只按当前用户和视频ID读取，不需要知道任务在哪个处理器上
+_processing_records: Dict[str, Dict[str, ProcessingRecord]] = {}
+_processing_jobs: Dict[tuple, Future] = {}
+_jobs_lock = threading.Lock()
+
+# 创建处理器时是否在后台预先加载并预热Whisper模型（设为0时在首次识别时加载）
+WHISPER_PRELOAD = os.environ.get("WHISPER_PRELOAD", "1") != "0"
+
+
+def invalidate_user_videos(user_id: Optional[str] = None):
+    """
+    丢弃视频列表缓存，下次读取时重新扫描
+
+    Args:
+        user_id: 用户ID，为None时丢弃所有用户的缓存
+    """
+    with _video_list_lock:
+        if user_id is None:
+            _video_list_cache.clear()
+        else:
+            _video_list_cache.pop(user_id, None)
+
+
+def get_user_processing_status(user_id: Optional[str] = None) -> Dict[str, ProcessingRecord]:
+    """
+    获取用户的处理状态记录 {video_id: 记录}
+
+    Args:
+        user_id: 用户ID，为None时使用当前用户；用户未登录时返回空字典
+    """
+    user_id = user_id or get_current_user_id()
+    if not user_id:
+        return {}
+    with _jobs_lock:
+        return _processing_records.setdefault(user_id, {})
+
+
+def clear_processing_records():
+    """丢弃已结束（完成或失败）的处理状态记录；仍在处理中的记录保留，后台任务继续写入，用户重新登录后可继续查看进度"""
+    with _jobs_lock:
+        for records in _processing_records.values():
+            for video_id, record in list(records.items()):
+                if record.get("status") != "processing":
+                    del records[video_id]
+
+
+def _dir_mtime_ns(path: Path) -> int:
+    """目录的修改时间，不存在时返回0"""
+    try:
+        return path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return 0
+
+
 class IsolatedVideoProcessor:
     """用户隔离的视频处理器"""
     
-    def __init__(self, cuda_enabled=True, whisper_model="base"):
+    def __init__(self, cuda_enabled=True, whisper_model="base", whisper_precision="auto"):
         """初始化视频处理器
         
         Args:
             cuda_enabled: 是否启用CUDA加速
             whisper_model: Whisper模型大小
+            whisper_precision: Whisper计算精度，auto时按设备和模型大小自动选择
         """
         self.cuda_enabled = cuda_enabled
         self.whisper_model = whisper_model
-        self.processing_status = {}  # 用户隔离的处理状态
+        self.whisper_precision = whisper_precision
         
         # 初始化核心组件
         self.video_loader = VideoLoader()
@@ -65,11 +146,28 @@ class IsolatedVideoProcessor:
         # 设置设备
         import torch
         device = "cuda" if cuda_enabled and torch.cuda.is_available() else "cpu"
-        self.whisper_asr = WhisperASR(model_size=whisper_model, device=device)
+        self.whisper_asr = WhisperASR(model_size=whisper_model, device=device, compute_type=whisper_precision)
+        
+        # 在处理线程上预热模型，之后的识别任务排在其后并复用已加载的模型
+        if WHISPER_PRELOAD:
+            _processing_pool.submit(self._warmup_whisper)
         
         # 初始化可选组件
         self._init_optional_components()
     
+    @property
+    def processing_status(self) -> Dict[str, ProcessingRecord]:
+        """当前用户的处理状态记录（所有处理器共享）"""
+        return get_user_processing_status()
+    
+    def _warmup_whisper(self):
+        """后台加载并预热Whisper模型，失败时留到首次识别再加载"""
+        try:
+            self.whisper_asr.warmup()
+            print(f"✓ Whisper模型已预热 ({self.whisper_model})")
+        except Exception as e:
+            print(f"⚠ Whisper模型预热失败: {e}")
+    
     def _init_optional_components(self):
         """初始化可选组件"""
         try:
@@ -126,10 +224,24 @@ class IsolatedVideoProcessor:
             }
         
         try:
-            # 生成唯一的视频ID（只使用时间戳+原始文件名）
+            # 使用文件内容的SHA-256摘要作为视频ID，相同视频重复上传时可直接复用处理结果
             user_id = get_current_user_id()
             video_path = Path(video_file)
-            video_id = f"{int(time.time())}_{video_path.stem}"
+            video_id = self._compute_video_hash(video_path)
+            
+            existing_result = self._reuse_processed_video(video_id, video_path.name)
+            if existing_result:
+                return existing_result
+            
+            # 相同视频正在后台处理时直接沿用该任务，不重置其进度记录
+            if self._has_live_job(user_id, video_id):
+                return {
+                    "video_id": video_id,
+                    "filename": video_path.name,
+                    "status": "processing",
+                    "message": "该视频正在后台处理中...",
+                    "user_id": user_id
+                }
             
             # 使用用户专属的上传路径
             upload_path = user_paths.get_upload_path(video_id, video_path.name)
@@ -138,23 +250,20 @@ class IsolatedVideoProcessor:
             upload_path.parent.mkdir(parents=True, exist_ok=True)
             
             # 复制文件到用户专属目录
-            shutil.copy2(video_file, upload_path)
+            fast_copy_file(video_file, upload_path)
             
             # 验证视频
             video_info = self.video_loader.validate_video(upload_path)
             
             # 初始化处理状态
-            self.processing_status[video_id] = {
-                "progress": 0.0,
-                "current_step": "开始处理视频",
-                "log_messages": [f"[{time.strftime('%H:%M:%S')}] 开始处理: {video_path.name}"],
-                "status": "processing"
-            }
+            status = reset_record(self.processing_status, video_id, current_step="开始处理视频")
+            status.log(f"开始处理: {video_path.name}")
             
             # 保存视频信息到用户专属位置
             video_data = {
                 "video_id": video_id,
                 "filename": video_path.name,
+                "dropdown_label": f"{video_id}: {video_path.name}",
                 "file_path": str(upload_path),
                 "video_info": video_info,
                 "status": "uploaded",
@@ -170,14 +279,14 @@ class IsolatedVideoProcessor:
             # 保存视频数据到用户隔离的存储中
             self._save_video_data(video_id, video_data)
             
-            # 开始实际处理
-            self._continue_processing(video_id, cuda_enabled, whisper_model)
+            # 提交到后台线程处理，进度通过处理状态记录推送到界面
+            self._submit_processing(video_id, cuda_enabled, whisper_model)
             
             return {
                 "video_id": video_id,
                 "filename": video_path.name,
                 "status": "processing",
-                "message": "视频上传成功，开始处理...",
+                "message": "视频上传成功，正在后台处理...",
                 "user_id": user_id
             }
             
@@ -187,6 +296,36 @@ class IsolatedVideoProcessor:
                 "message": f"视频上传失败: {str(e)}"
             }
     
+    def _compute_video_hash(self, video_path: Path, chunk_size: int = 1024 * 1024) -> str:
+        """按1MiB分块计算视频文件的SHA-256摘要，返回前16位十六进制作为视频ID"""
+        sha256 = hashlib.sha256()
+        with open(video_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                sha256.update(chunk)
+        return sha256.hexdigest()[:16]
+    
+    def _reuse_processed_video(self, video_id: str, filename: str):
+        """如果该视频已处理完成且转录文件存在，直接复用已有结果"""
+        video_data = self._load_video_data(video_id)
+        if not video_data or video_data.get("status") != "completed":
+            return None
+        
+        user_paths = get_current_user_paths()
+        if not user_paths or not user_paths.get_transcript_path(video_id).exists():
+            return None
+        
+        status = reset_record(self.processing_status, video_id, current_step="处理完成",
+                                progress=1.0, status="completed")
+        status.log(f"检测到重复视频，复用已有处理结果: {filename}")
+        
+        return {
+            "video_id": video_id,
+            "filename": video_data.get("filename", filename),
+            "status": "completed",
+            "message": "视频已存在，直接使用已有处理结果",
+            "user_id": get_current_user_id()
+        }
+    
     @require_user_login
     def extract_audio(self, video_id, video_path):
         """提取音频（用户隔离版本）"""
@@ -194,6 +333,10 @@ class IsolatedVideoProcessor:
         if not user_paths:
             raise ValueError("用户路径获取失败")
         
+        return self._extract_audio(video_id, video_path, user_paths)
+    
+    def _extract_audio(self, video_id, video_path, user_paths):
+        """提取音频到指定用户的临时目录"""
         # 使用用户专属的临时路径
         temp_audio_path = user_paths.get_temp_path(f"{video_id}_extracted.wav")
         
@@ -201,7 +344,7 @@ class IsolatedVideoProcessor:
         audio_path = self.audio_extractor.extract_audio(Path(video_path))
         
         # 复制到用户专属目录
-        shutil.copy2(audio_path, temp_audio_path)
+        fast_copy_file(audio_path, temp_audio_path)
         
         return temp_audio_path
     
@@ -212,6 +355,10 @@ class IsolatedVideoProcessor:
         if not user_paths:
             raise ValueError("用户路径获取失败")
         
+        return self._save_transcript(video_id, transcript_result, user_paths)
+    
+    def _save_transcript(self, video_id, transcript_result, user_paths):
+        """保存转录结果到指定用户的转录目录"""
         # 使用用户专属的转录路径
         transcript_path = user_paths.get_transcript_path(video_id)
         
@@ -223,18 +370,45 @@ class IsolatedVideoProcessor:
     @require_user_login
     def get_user_video_list(self):
         """获取用户的视频列表"""
+        entry = self._get_video_list_entry()
+        if entry is None:
+            return []
+        return [dict(video) for video in entry[1]]
+    
+    def get_user_video_choices(self):
+        """获取视频下拉框选项 [(显示文本, 视频ID)]，视频列表未变化时直接复用缓存"""
+        entry = self._get_video_list_entry()
+        if entry is None:
+            return []
+        return list(entry[2])
+    
+    def _get_video_list_entry(self):
+        """
+        获取当前用户的视频列表缓存项，过期时重新扫描
+        
+        Returns:
+            Optional[tuple]: (缓存键, 视频列表, 下拉框选项)，用户未登录时返回None
+        """
         user_id = get_current_user_id()
         if not user_id:
-            return []
+            return None
         
         user_paths = get_current_user_paths()
         if not user_paths:
-            return []
+            return None
+        
+        # 视频数据没有写入、目录没有增删文件时直接复用上次扫描的结果
+        data_dir = user_paths.get_user_data_path()
+        upload_dir = user_paths.get_upload_path()
+        cache_key = (_video_data_generation, _dir_mtime_ns(data_dir), _dir_mtime_ns(upload_dir))
+        with _video_list_lock:
+            cached = _video_list_cache.get(user_id)
+        if cached is not None and cached[0] == cache_key:
+            return cached
         
         videos = []
         
         # 首先从用户数据目录中查找已处理的视频
-        data_dir = user_paths.get_user_data_path()
         if data_dir.exists():
             for data_file in data_dir.glob("*_data.json"):
                 try:
@@ -247,14 +421,16 @@ class IsolatedVideoProcessor:
                             "upload_time": video_data.get("upload_time", 0),
                             "user_id": user_id,
                             "status": video_data.get("status", "unknown"),
-                            "has_transcript": bool(video_data.get("transcript"))
+                            "has_transcript": bool(video_data.get("transcript")),
+                            # 旧数据没有保存显示文本时现场生成
+                            "dropdown_label": video_data.get("dropdown_label")
+                                              or f"{video_data['video_id']}: {video_data['filename']}"
                         })
                 except Exception as e:
                     print(f"加载视频数据失败 {data_file}: {e}")
                     continue
         
         # 然后从上传目录查找未处理的视频文件
-        upload_dir = user_paths.get_upload_path()
         if upload_dir.exists():
             for video_file in upload_dir.iterdir():
                 if video_file.is_file() and video_file.suffix.lower() in ['.mp4', '.avi', '.mov', '.mkv', '.webm']:
@@ -269,20 +445,28 @@ class IsolatedVideoProcessor:
                             "upload_time": video_file.stat().st_mtime,
                             "user_id": user_id,
                             "status": "uploaded",
-                            "has_transcript": False
+                            "has_transcript": False,
+                            "dropdown_label": f"{video_id}: {video_file.name}"
                         })
         
         # 按上传时间排序（最新的在前）
         videos.sort(key=lambda x: x['upload_time'], reverse=True)
         
-        return videos
+        # 下拉框选项随列表一起缓存，刷新时只需复制
+        choices = tuple((v["dropdown_label"], v["video_id"]) for v in videos)
+        entry = (cache_key, videos, choices)
+        with _video_list_lock:
+            _video_list_cache[user_id] = entry
+        
+        return entry
     
     @require_user_login
     def get_processing_progress(self, video_id):
         """
         获取视频处理进度
         """
-        if video_id not in self.processing_status:
+        record = self.processing_status.get(video_id)
+        if record is None:
             return {
                 "progress": 0.0,
                 "current_step": "未找到处理任务",
@@ -290,15 +474,16 @@ class IsolatedVideoProcessor:
                 "status": "error"
             }
         
-        # 如果还在处理中，继续处理
-        if self.processing_status[video_id]["status"] == "processing":
-            self._continue_processing(video_id)
+        # 如果还在处理中且没有后台任务（如任务被中断），重新提交继续处理
+        if record["status"] == "processing":
+            self._submit_processing(video_id)
         
-        return self.processing_status[video_id]
+        # 返回加锁复制的快照，避免读到后台线程写了一半的状态
+        return record.snapshot()
     
-    def _save_video_data(self, video_id, video_data):
-        """保存视频数据到用户隔离的存储中"""
-        user_paths = get_current_user_paths()
+    def _save_video_data(self, video_id, video_data, user_paths=None):
+        """保存视频数据到用户隔离的存储中（未指定用户路径时使用当前用户）"""
+        user_paths = user_paths or get_current_user_paths()
         if not user_paths:
             return
         
@@ -309,101 +494,155 @@ class IsolatedVideoProcessor:
         import json
         with open(data_file, 'w', encoding='utf-8') as f:
             json.dump(video_data, f, ensure_ascii=False, indent=2)
+        
+        # 文件已变化，丢弃旧的解析结果，视频列表缓存随之过期
+        global _video_data_generation
+        _read_video_data.cache_clear()
+        with _video_list_lock:
+            _video_data_generation += 1
     
-    def _load_video_data(self, video_id):
-        """从用户隔离的存储中加载视频数据"""
-        user_paths = get_current_user_paths()
+    def _load_video_data(self, video_id, user_paths=None):
+        """从用户隔离的存储中加载视频数据（未指定用户路径时使用当前用户）"""
+        user_paths = user_paths or get_current_user_paths()
         if not user_paths:
             return None
         
         data_file = user_paths.get_user_data_path() / f"{video_id}_data.json"
-        if not data_file.exists():
+        try:
+            stat = data_file.stat()
+        except FileNotFoundError:
             return None
         
-        import json
-        with open(data_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        # 轮询回调每秒都会读取视频数据，按 (路径, 修改时间, 大小) 复用解析结果；
+        # 返回浅拷贝，调用方修改顶层字段不会污染缓存
+        return dict(_read_video_data(str(data_file), stat.st_mtime_ns, stat.st_size))
     
-    def _continue_processing(self, video_id, cuda_enabled=True, whisper_model="base"):
-        """
-        继续处理视频
+    def _has_live_job(self, user_id, video_id) -> bool:
+        """该用户的视频是否有尚未结束的后台处理任务"""
+        with _jobs_lock:
+            future = _processing_jobs.get((user_id, video_id))
+            return future is not None and not future.done()
+    
+    def _submit_processing(self, video_id, cuda_enabled=True, whisper_model="base") -> Future:
         """
-        video_data = self._load_video_data(video_id)
-        if not video_data:
-            return
+        把视频处理提交到后台线程池，同一视频已有任务在进行时直接返回该任务
         
-        status = self.processing_status[video_id]
+        Returns:
+            Future: 处理任务
+        """
+        # 用户上下文是全局的，任务排队期间可能已有其他用户登录；提交时就确定用户、路径和状态记录，
+        # 任务执行时只使用这些值，不再读取当前用户上下文
+        user_id = get_current_user_id()
+        user_paths = get_current_user_paths()
+        status = get_user_processing_status(user_id).get(video_id)
+        if not user_id or not user_paths or status is None:
+            future = Future()
+            future.set_result(None)
+            return future
+        
+        key = (user_id, video_id)
+        with _jobs_lock:
+            future = _processing_jobs.get(key)
+            if future is not None and not future.done():
+                return future
+            future = _processing_pool.submit(self._continue_processing, video_id, user_id, user_paths, status,
+                                             cuda_enabled, whisper_model)
+            _processing_jobs[key] = future
+        
+        def remove_job(done_future):
+            with _jobs_lock:
+                if _processing_jobs.get(key) is done_future:
+                    del _processing_jobs[key]
+        
+        future.add_done_callback(remove_job)
+        return future
+    
+    def _continue_processing(self, video_id, user_id, user_paths, status, cuda_enabled=True, whisper_model="base"):
+        """
+        继续处理视频
         
+        Args:
+            video_id: 视频ID
+            user_id: 提交任务时的用户ID
+            user_paths: 提交任务时的用户路径管理器
+            status: 提交任务时的处理状态记录
+        """
+        video_data = None
         try:
+            video_data = self._load_video_data(video_id, user_paths)
+            if not video_data:
+                raise ValueError("视频数据不存在")
+            
             progress = status["progress"]
             
             if progress < 0.2:
                 # 提取音频
-                status["current_step"] = "提取音频中..."
-                status["log_messages"].append(f"[{time.strftime('%H:%M:%S')}] 开始提取音频")
-                status["progress"] = 0.2
+                status.update(current_step="提取音频中...", progress=0.2)
+                status.log("开始提取音频")
                 
                 video_path = Path(video_data["file_path"])
-                audio_path = self.extract_audio(video_id, str(video_path))
+                audio_path = self._extract_audio(video_id, str(video_path), user_paths)
                 video_data["audio_path"] = str(audio_path)
-                self._save_video_data(video_id, video_data)
+                self._save_video_data(video_id, video_data, user_paths)
             
             if progress < 0.4:
                 # 语音识别
-                status["current_step"] = "语音识别中..."
-                status["log_messages"].append(f"[{time.strftime('%H:%M:%S')}] 开始语音识别")
-                status["progress"] = 0.4
+                status.update(current_step="语音识别中...", progress=0.4)
+                status.log("开始语音识别")
                 
                 if "audio_path" in video_data:
+                    # 逐段识别时记录已识别的文本和识别进行到的位置，界面在识别过程中显示部分转录
+                    def on_segment(segment):
+                        status.add_transcript_part(segment["text"].strip())
+                        status.update(current_step=f"语音识别中... 已识别至 {segment['end']:.0f} 秒")
+                    
                     transcript_result = self.whisper_asr.transcribe(
-                        Path(video_data["audio_path"])
+                        Path(video_data["audio_path"]),
+                        on_segment=on_segment
                     )
                     video_data["transcript"] = transcript_result
-                    self._save_video_data(video_id, video_data)
+                    self._save_video_data(video_id, video_data, user_paths)
             
             if progress < 0.6:
                 # 保存转录文件
-                status["current_step"] = "保存转录文件..."
-                status["log_messages"].append(f"[{time.strftime('%H:%M:%S')}] 保存转录文件")
-                status["progress"] = 0.6
+                status.update(current_step="保存转录文件...", progress=0.6)
+                status.log("保存转录文件")
                 
                 if "transcript" in video_data:
-                    transcript_path = self.save_transcript(video_id, video_data["transcript"])
+                    transcript_path = self._save_transcript(video_id, video_data["transcript"], user_paths)
                     video_data["transcript_path"] = str(transcript_path)
-                    self._save_video_data(video_id, video_data)
+                    self._save_video_data(video_id, video_data, user_paths)
             
             if progress < 0.8:
                 # 构建索引
-                status["current_step"] = "构建检索索引..."
-                status["log_messages"].append(f"[{time.strftime('%H:%M:%S')}] 构建检索索引")
-                status["progress"] = 0.8
+                status.update(current_step="构建检索索引...", progress=0.8)
+                status.log("构建检索索引")
                 
                 if "transcript" in video_data:
-                    self._build_index(video_id, video_data)
+                    self._build_index(video_id, video_data, user_id, user_paths)
             
             # 处理完成
-            status["current_step"] = "处理完成"
-            status["log_messages"].append(f"[{time.strftime('%H:%M:%S')}] 视频处理完成")
-            status["progress"] = 1.0
-            status["status"] = "completed"
+            status.log("视频处理完成")
+            status.update(current_step="处理完成", progress=1.0, status="completed")
             video_data["status"] = "completed"
-            self._save_video_data(video_id, video_data)
+            self._save_video_data(video_id, video_data, user_paths)
             
         except Exception as e:
             status["status"] = "error"
-            status["log_messages"].append(f"[{time.strftime('%H:%M:%S')}] 处理失败: {str(e)}")
-            video_data["status"] = "error"
-            video_data["error"] = str(e)
-            self._save_video_data(video_id, video_data)
+            status.log(f"处理失败: {str(e)}")
+            if video_data:
+                video_data["status"] = "error"
+                video_data["error"] = str(e)
+                self._save_video_data(video_id, video_data, user_paths)
     
-    def _build_index(self, video_id, video_data):
-        """构建检索索引"""
+    def _build_index(self, video_id, video_data, user_id, user_paths):
+        """在指定用户的目录中构建检索索引"""
         try:
             from deploy.core.index_builder_isolated import get_index_builder
             index_builder = get_index_builder()
             
             if "transcript" in video_data and video_data["transcript"]:
-                index_builder.build_user_index(video_id, video_data["transcript"])
+                index_builder.build_index(video_id, video_data["transcript"], user_id, user_paths)
         except Exception as e:
             print(f"构建索引失败: {e}")
             # 索引构建失败不影响整体处理流程
@@ -450,11 +689,22 @@ class IsolatedVideoProcessor:
 
 # 全局处理器实例字典（支持不同配置）
 processors = {}
+_processors_lock = threading.RLock()
 
 
-def get_isolated_processor(cuda_enabled=True, whisper_model="base"):
+def get_isolated_processor(cuda_enabled=True, whisper_model="base", whisper_precision="auto"):
     """获取用户隔离的处理器实例"""
     key = f"{cuda_enabled}_{whisper_model}"
-    if key not in processors:
-        processors[key] = IsolatedVideoProcessor(cuda_enabled=cuda_enabled, whisper_model=whisper_model)
-    return processors[key]
\ No newline at end of file
+    if whisper_precision != "auto":
+        key = f"{key}_{whisper_precision}"
+    processor = processors.get(key)
+    if processor is not None:
+        return processor
+    
+    # 处理器初始化会加载模型，加锁避免多个回调线程重复创建
+    with _processors_lock:
+        if key not in processors:
+            processors[key] = IsolatedVideoProcessor(
+                cuda_enabled=cuda_enabled, whisper_model=whisper_model, whisper_precision=whisper_precision
+            )
+        return processors[key]
\ No newline at end of file
@@ -4,8 +4,57 @@
 UI组件
 """
 
+import json
+
 import gradio as gr
 
+# 快捷问题
+QUICK_QUESTIONS = (
+    "这个视频的主要内容是什么？",
+    "视频中提到了哪些关键点？",
+    "能总结一下视频的核心观点吗？",
+    "视频中的结论是什么？"
+)
+
+# 下拉框和单选框的选项，模块加载时创建一次，所有会话和每次构建界面共用
+WHISPER_MODEL_CHOICES = (
+    ("tiny (75MB, 最快)", "tiny"),
+    ("base (142MB, 平衡)", "base"),
+    ("small (466MB, 较准确)", "small"),
+    ("medium (1.5GB, 很准确)", "medium"),
+    ("large (2.9GB, 最准确)", "large")
+)
+
+WHISPER_PRECISION_CHOICES = (
+    ("自动", "auto"),
+    ("int8 (CPU默认)", "int8"),
+    ("int8_float16 (GPU大模型默认)", "int8_float16"),
+    ("float16 (GPU默认)", "float16"),
+    ("float32 (最精确，最慢)", "float32")
+)
+
+# 第一个选项是提示
+TARGET_LANG_CHOICES = ("请选择语言", "English", "中文")
+
+SEARCH_TYPE_CHOICES = (
+    ("混合检索 (推荐)", "hybrid"),
+    ("向量检索", "vector"),
+    ("关键词检索 (BM25)", "bm25")
+)
+
+# 点击快捷问题时在浏览器端按序号取出问题文本填入输入框
+QUICK_QUESTION_JS = f"(i) => {json.dumps(QUICK_QUESTIONS, ensure_ascii=False)}[i]"
+
+
+def create_quick_questions():
+    """创建快捷问题列表（单个 Dataset 组件，所有问题共用一个点击事件）"""
+    return gr.Dataset(
+        components=["textbox"],
+        samples=[[q] for q in QUICK_QUESTIONS],
+        type="index",
+        label="快捷问题"
+    )
+
 
 def create_video_upload_section():
     """创建视频上传区域"""
@@ -18,17 +67,20 @@ def create_video_upload_section():
         )
         
         whisper_model = gr.Dropdown(
-            choices=[
-                ("tiny (75MB, 最快)", "tiny"),
-                ("base (142MB, 平衡)", "base"),
-                ("small (466MB, 较准确)", "small"),
-                ("medium (1.5GB, 很准确)", "medium"),
-                ("large (2.9GB, 最准确)", "large")
-            ],
+            choices=WHISPER_MODEL_CHOICES,
             value="base",
             label="Whisper模型选择",
             info="更大的模型更准确但需要更多时间和资源"
         )
+        
+        # 高级选项：强制指定识别精度，默认按设备和模型大小自动选择
+        with gr.Accordion("高级选项", open=False):
+            whisper_precision = gr.Dropdown(
+                choices=WHISPER_PRECISION_CHOICES,
+                value="auto",
+                label="Whisper计算精度",
+                info="量化精度越低越快、占用越少，准确率略有下降"
+            )
     
     video_input = gr.File(
         label="上传视频文件",
@@ -51,7 +103,7 @@ def create_video_upload_section():
         visible=False
     )
     
-    return video_input, cuda_enabled, whisper_model, upload_btn, progress_html, processing_log
+    return video_input, cuda_enabled, whisper_model, whisper_precision, upload_btn, progress_html, processing_log
 
 
 def create_video_display_section():
@@ -79,7 +131,7 @@ def create_transcript_section():
         with gr.Row():
             translate_btn = gr.Button("翻译文本", variant="secondary", visible=False)
             target_lang = gr.Dropdown(
-                choices=["请选择语言", "English", "中文"],  # 第一个选项是提示
+                choices=TARGET_LANG_CHOICES,
                 value="请选择语言",  # 默认显示提示
                 label="",  # 去掉标签
                 show_label=False,
@@ -128,20 +180,9 @@ def create_qa_section():
         send_btn = gr.Button("发送", variant="primary", scale=1)
     
     # 快捷问题建议
-    with gr.Accordion("快捷问题", open=False):
-        quick_questions = [
-            "这个视频的主要内容是什么？",
-            "视频中提到了哪些关键点？",
-            "能总结一下视频的核心观点吗？",
-            "视频中的结论是什么？"
-        ]
-        
-        quick_question_btns = []
-        for i, question in enumerate(quick_questions):
-            btn = gr.Button(question, size="sm")
-            quick_question_btns.append(btn)
+    quick_questions = create_quick_questions()
     
-    return chatbot, question_input, send_btn, quick_question_btns
+    return chatbot, question_input, send_btn, quick_questions
 
 
 def create_sidebar_section():
@@ -183,11 +224,7 @@ def create_sidebar_section():
         
         # 搜索类型选择
         search_type = gr.Radio(
-            choices=[
-                ("混合检索 (推荐)", "hybrid"),
-                ("向量检索", "vector"),
-                ("关键词检索 (BM25)", "bm25")
-            ],
+            choices=SEARCH_TYPE_CHOICES,
             value="hybrid",
             label="搜索类型",
             info="混合检索结合了语义相似度和关键词匹配"
@@ -6,13 +6,16 @@
 
 import gradio as gr
 
+from .components import QUICK_QUESTION_JS
+
 # 导入处理函数
 from .ui_handlers import (
-    handle_upload, update_progress, handle_question, handle_search, handle_translate,
-    update_translation_progress, handle_build_index, get_conversation_list,
-    load_conversation_history, start_new_chat, refresh_conversation_history,
+    handle_upload, handle_question, handle_search, handle_translate,
+    handle_build_index, get_conversation_list,
+    start_new_chat, refresh_conversation_history,
     load_selected_conversation, delete_selected_conversation_from_df,
-    auto_build_index, refresh_video_list, check_background_tasks
+    refresh_video_list, stream_progress, on_video_change,
+    stream_index_status
 )
 
 # 导入认证处理函数
@@ -22,60 +25,82 @@ from ..auth.auth_handlers import (
 )
 
 
+async def _show_component():
+    """显示组件"""
+    return gr.update(visible=True)
+
+
+async def _hide_component():
+    """隐藏组件"""
+    return gr.update(visible=False)
+
+
+def _load_user_data():
+    """页面加载时读取视频选项和历史对话（历史对话只读取一次）"""
+    history_df, history_message = refresh_conversation_history()
+    return update_video_selector_for_user(), history_df, history_message
+
+
 def bind_events(demo, main_interface, auth_interface, user_info_group, 
                upload_status, video_upload_components, video_display_components,
                transcript_components, sidebar_components, qa_components):
     """绑定所有事件"""
     
     # 解包组件
-    (video_input, cuda_enabled, whisper_model, upload_btn, progress_html, processing_log) = video_upload_components
+    (video_input, cuda_enabled, whisper_model, whisper_precision, upload_btn, progress_html,
+     processing_log) = video_upload_components
     (video_player, video_info, processing_status) = video_display_components
     (transcript_display, translate_btn, target_lang, translated_display, 
      translate_progress_html, translate_progress_bar) = transcript_components
     (video_selector, refresh_btn, conversation_history_df, load_history_btn,
      refresh_history_btn, delete_history_btn, history_status, index_status,
      index_progress_html, search_type, search_query, search_btn, search_results, new_chat_btn) = sidebar_components
-    (chatbot, question_input, send_btn, quick_question_btns) = qa_components
+    (chatbot, question_input, send_btn, quick_questions) = qa_components
     
     # 解包认证组件
     (auth_interface_group, login_username, login_password, login_btn, login_message,
-     reg_username, reg_email, reg_password, reg_confirm_password, reg_btn, reg_message) = auth_interface
+     reg_username, reg_email, reg_password, reg_confirm_password, reg_btn, reg_message,
+     login_tabs) = auth_interface
     (user_info_group_inner, user_display, logout_btn_inner) = user_info_group
     
     # 事件绑定
+    # 处理和索引构建进度由后台任务主动推送，进度变化时才更新界面（翻译进度由翻译回调自身推送）
+    progress_outputs = [processing_log, transcript_display, translate_btn, target_lang, translated_display,
+                        progress_html, index_status, index_progress_html]
+    
+    # 上传返回后开始推送（随后的索引构建也在同一推送中更新）；每次上传都重新开始推送，
+    # 重复上传同一视频时视频信息不变、不会触发 change 事件，但进度记录已被重置
+    # 推送的输出都是字符串或 gr.update，输入是原始JSON，跳过Gradio的预处理和后处理
     upload_btn.click(
         handle_upload,
-        inputs=[video_input, cuda_enabled, whisper_model],
-        outputs=[upload_status, video_player, video_info, processing_status, processing_log, progress_html, transcript_display, translate_btn, target_lang, translated_display]
-    )
-    
-    # 定时更新处理进度 - 使用Timer组件替代
-    progress_timer = gr.Timer(2)  # 每2秒触发一次
-    progress_timer.tick(
-        update_progress,
-        inputs=[video_info],
-        outputs=[processing_log, transcript_display, translate_btn, target_lang, translated_display, progress_html, translate_progress_bar, index_status]
-    )
-    
-    # 定时检查翻译和索引构建进度
-    background_timer = gr.Timer(3)  # 每3秒检查一次
-    background_timer.tick(
-        check_background_tasks,
+        inputs=[video_input, cuda_enabled, whisper_model, whisper_precision],
+        outputs=[upload_status, video_player, video_info, processing_status, processing_log, progress_html, transcript_display, translate_btn, target_lang, translated_display],
+        concurrency_id="upload",
+        concurrency_limit=4
+    ).then(
+        stream_progress,
         inputs=[video_info],
-        outputs=[translate_progress_html, index_progress_html]
+        outputs=progress_outputs,
+        concurrency_limit=None,
+        preprocess=False,
+        postprocess=False
     )
     
     # 问答事件
     send_btn.click(
         handle_question,
         inputs=[question_input, chatbot, video_selector],
-        outputs=[question_input, chatbot]
+        outputs=[question_input, chatbot],
+        concurrency_id="llm",
+        concurrency_limit=4
     )
     
     question_input.submit(
         handle_question,
         inputs=[question_input, chatbot, video_selector],
-        outputs=[question_input, chatbot]
+        outputs=[question_input, chatbot],
+        concurrency_id="llm",
+        concurrency_limit=4
     )
     
     # 搜索事件
@@ -89,112 +114,130 @@ def bind_events(demo, main_interface, auth_interface, user_info_group,
     translate_btn.click(
         handle_translate,
         inputs=[video_info, target_lang],
-        outputs=[processing_status, translated_display, translate_progress_html, translate_progress_bar]
+        outputs=[processing_status, translated_display, translate_progress_html, translate_progress_bar],
+        concurrency_id="translate",
+        concurrency_limit=2,
+        preprocess=False,
+        postprocess=False
     )
     
-    # 添加翻译进度更新定时器
-    translation_progress_timer = gr.Timer(1)  # 每1秒更新一次
-    translation_progress_timer.tick(
-        update_translation_progress,
-        inputs=[video_info],
-        outputs=[translate_progress_bar]
+    # 新对话事件
+    # 聊天框和输入框在浏览器端直接清空，服务端只清除对话记录且不进入队列
+    new_chat_btn.click(
+        None,
+        None,
+        [chatbot, question_input],
+        js="() => [[], '']"
     )
     
-    # 新对话事件
     new_chat_btn.click(
         start_new_chat,
         inputs=[video_selector],
-        outputs=[chatbot, question_input]
+        queue=False,
+        preprocess=False
     )
     
-    # 刷新视频列表
+    # 刷新视频列表（只读缓存的视频列表并提交后台索引构建，不进入队列直接执行）
     refresh_btn.click(
         refresh_video_list,
-        outputs=[video_selector, index_status]
+        outputs=[video_selector, index_status],
+        queue=False,
+        postprocess=False
     )
     
     # 视频选择时自动构建索引并加载对话历史
     video_selector.change(
-        fn=lambda x: (
-            auto_build_index(x)[0],  # 索引状态
-            load_conversation_history(x)  # 加载对话历史
-        ),
+        fn=on_video_change,
         inputs=[video_selector],
-        outputs=[index_status, chatbot]
+        outputs=[index_status, chatbot],
+        concurrency_id="ui",
+        concurrency_limit=32,
+        preprocess=False
+    ).then(
+        # 提交了索引构建时推送构建状态，构建结束即停止；没有构建任务时不推送
+        stream_index_status,
+        inputs=[video_selector],
+        outputs=[index_status, index_progress_html],
+        concurrency_limit=None,
+        preprocess=False,
+        postprocess=False
     )
     
-    # 历史对话事件绑定
+    # 历史对话事件绑定（读写本地对话文件，耗时很短，均不进入队列）
     refresh_history_btn.click(
         refresh_conversation_history,
-        outputs=[conversation_history_df, history_status]
+        outputs=[conversation_history_df, history_status],
+        queue=False
     )
     
     # 加载选中的历史对话 - 直接使用DataFrame的select事件
     conversation_history_df.select(
         fn=load_selected_conversation,
         inputs=[conversation_history_df],
-        outputs=[chatbot]
+        outputs=[chatbot],
+        queue=False
     )
     
     # 删除选中的历史对话 - 使用单独的按钮
     delete_history_btn.click(
         fn=lambda df: delete_selected_conversation_from_df(df),
         inputs=[conversation_history_df],
-        outputs=[history_status]
+        outputs=[history_status],
+        queue=False
     ).then(
         refresh_conversation_history,
-        outputs=[conversation_history_df, history_status]
+        outputs=[conversation_history_df, history_status],
+        queue=False
     )
     
     # 绑定认证事件
     login_btn.click(
         fn=handle_login,
         inputs=[login_username, login_password],
-        outputs=[login_message, auth_interface_group]
+        outputs=[login_message, auth_interface_group],
+        queue=False
     ).then(
         fn=update_user_info,
-        outputs=[user_display, user_info_group_inner]
+        outputs=[user_display, user_info_group_inner],
+        queue=False
     ).then(
-        fn=lambda: gr.update(visible=True),
-        outputs=[main_interface]
+        fn=_show_component,
+        outputs=[main_interface],
+        queue=False
     )
     
     reg_btn.click(
         fn=handle_register,
         inputs=[reg_username, reg_email, reg_password, reg_confirm_password],
-        outputs=[reg_message]
+        outputs=[reg_message],
+        queue=False
     )
     
     logout_btn_inner.click(
         fn=handle_logout,
-        outputs=[auth_interface_group, user_info_group_inner]
+        outputs=[auth_interface_group, user_info_group_inner],
+        queue=False
     ).then(
-        fn=lambda: gr.update(visible=False),
-        outputs=[main_interface]
+        fn=_hide_component,
+        outputs=[main_interface],
+        queue=False
     )
     
     # 页面加载时检查认证状态
     demo.load(
         fn=check_auth_status,
-        outputs=[auth_interface_group, user_info_group_inner, main_interface, user_display]
+        outputs=[auth_interface_group, user_info_group_inner, main_interface, user_display],
+        queue=False
     ).then(
-        fn=lambda: (
-            update_video_selector_for_user(),
-            refresh_conversation_history()[0],  # 取DataFrame
-            refresh_conversation_history()[1]   # 取状态消息
-        ),
-        outputs=[video_selector, conversation_history_df, history_status]
-    )
-    
-    # 绑定快捷问题按钮
-    for i, btn in enumerate(quick_question_btns):
-        quick_questions = [
-            "这个视频的主要内容是什么？",
-            "视频中提到了哪些关键点？",
-            "能总结一下视频的核心观点吗？",
-            "视频中的结论是什么？"
-        ]
-        btn.click(
-            lambda q=quick_questions[i]: q,
-            outputs=question_input
-        )
\ No newline at end of file
+        fn=_load_user_data,
+        outputs=[video_selector, conversation_history_df, history_status],
+        queue=False
+    )
+    
+    # 绑定快捷问题（在浏览器端直接填入问题文本，不经过服务端队列）
+    quick_questions.click(
+        None,
+        quick_questions,
+        question_input,
+        js=QUICK_QUESTION_JS
+    )
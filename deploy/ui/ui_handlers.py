@@ -5,9 +5,12 @@
 """
 
 import gradio as gr
+import asyncio
 import time
 import json
 import os
+import string
+import threading
 from datetime import datetime
 
 # 导入各个模块
@@ -15,19 +18,88 @@ from ..core.video_processor_isolated import get_isolated_processor
 from ..core.conversation_manager_isolated import get_conversation_manager
 from ..core.index_builder_isolated import get_index_builder
 from ..core.translator_isolated import get_translator_manager
+from ..core.progress_events import get_progress_notifier
 from ..auth.auth_handlers import get_current_user, get_auth_bridge
 
+# 状态横幅与翻译进度条的HTML模板，模块加载时解析一次，轮询时只替换字段
+STATUS_BANNER_TMPL = string.Template(
+    "<div style='width:100%; background-color:$bg; border-radius:5px; padding:5px; text-align:center;'>$msg</div>"
+)
 
-def handle_upload(video_file, cuda_enabled, whisper_model):
-    """处理视频上传"""
+TRANSLATION_PROGRESS_TMPL = string.Template("""
+    <div style='width:100%; background-color:#f8f9fa; border-radius:5px; padding:10px; margin:10px 0;'>
+        <div style='display: flex; justify-content: space-between; margin-bottom: 5px;'>
+            <span>翻译进度</span>
+            <span>$pct%</span>
+        </div>
+        <div style='width:100%; background-color:#e9ecef; border-radius:3px; overflow: hidden;'>
+            <div style='width:$pct%; background-color:#007bff; height:20px; transition: width 0.3s;'></div>
+        </div>
+        <div style='margin-top: 5px; font-size: 12px; color:#6c757d;'>
+            $msg
+        </div>
+    </div>
+    """)
+
+# 内容固定的横幅直接预先渲染
+PROCESSING_STARTED_HTML = STATUS_BANNER_TMPL.substitute(bg="#e6f3ff", msg="处理进度: 0%")
+PROCESSING_DONE_HTML = STATUS_BANNER_TMPL.substitute(bg="#d4edda", msg="✅ 处理完成！")
+TRANSLATION_DONE_HTML = STATUS_BANNER_TMPL.substitute(bg="#d4edda", msg="✅ 翻译完成")
+TRANSLATING_HTML = STATUS_BANNER_TMPL.substitute(bg="#fff3cd", msg="⏳ 正在翻译...")
+INDEX_BUILDING_HTML = STATUS_BANNER_TMPL.substitute(bg="#fff3cd", msg="⏳ 正在构建索引...")
+
+# 进度轮询的上一次状态，键为 (轮询类型, 会话)
+# 状态未变化时返回 gr.skip()，避免重复序列化HTML和重新渲染转录文本框
+_progress_ticks = {}
+
+# update_progress 的输出组件数量
+PROGRESS_OUTPUTS = 8
+
+# 推送回调在没有任何进度通知时的最长等待秒数，防止漏掉通知后一直挂起
+PROGRESS_STREAM_TIMEOUT = 30
+
+# 两次推送之间的最短间隔（秒），间隔内的多次进度变化合并为一次推送
+PROGRESS_MIN_INTERVAL = 0.05
+
+
+# 历史对话列表缓存的有效秒数：页面加载和刷新时不必每次重新读取全部对话文件，
+# 对话文件增删会改变目录修改时间而立即失效，对话轮数的变化最多延迟该时长
+CONVERSATION_LIST_TTL = 10
+
+# 用户ID -> (过期时间, 对话目录修改时间, 对话列表)
+_conversation_list_cache = {}
+_conversation_list_lock = threading.Lock()
+
+
+def _take_progress_tick(kind, request):
+    """取出该会话上一次的轮询状态；提前返回的分支不会写回，下一次必然重新渲染"""
+    key = (kind, getattr(request, "session_hash", None))
+    return key, _progress_ticks.pop(key, None)
+
+
+def _drop_progress_ticks(request):
+    """推送结束后清除该会话的轮询状态，状态表只保留仍在推送进度的会话"""
+    session = getattr(request, "session_hash", None)
+    for kind in ("stream", "processing", "background"):
+        _progress_ticks.pop((kind, session), None)
+
+
+def _upload_video(video_file, cuda_enabled, whisper_model, whisper_precision):
+    """计算视频摘要、复制到用户目录并提交后台处理（阻塞的文件I/O，在线程中执行）"""
+    # 获取用户隔离的处理器
+    current_processor = get_isolated_processor(cuda_enabled, whisper_model, whisper_precision)
+    return current_processor.upload_and_process_video(video_file)
+
+
+async def handle_upload(video_file, cuda_enabled, whisper_model, whisper_precision="auto"):
+    """处理视频上传（大文件的摘要计算和复制在线程中执行，等待期间不占用事件循环）"""
     # 检查用户登录状态
     current_user = get_current_user()
     if not current_user:
         return gr.Warning("请先登录"), gr.Video(visible=False), gr.JSON(visible=False), gr.Textbox(visible=False), gr.Row(visible=False), gr.Textbox(visible=False), gr.Textbox(visible=False), gr.Button(visible=False), gr.Dropdown(visible=False), gr.Textbox(visible=False)
     
-    # 获取用户隔离的处理器
-    current_processor = get_isolated_processor(cuda_enabled, whisper_model)
-    result = current_processor.upload_and_process_video(video_file)
+    # 转录等耗时处理已由处理器提交到后台线程，这里只等待上传阶段完成，拿到视频ID后立即返回
+    result = await asyncio.to_thread(_upload_video, video_file, cuda_enabled, whisper_model, whisper_precision)
     
     if result["status"] == "error":
         return (
@@ -51,7 +123,7 @@ def handle_upload(video_file, cuda_enabled, whisper_model):
         gr.Textbox(value="正在处理视频...", visible=True),
         gr.Row(visible=True),  # 显示处理日志区域
         gr.Textbox(value=f"[{time.strftime('%H:%M:%S')}] 开始处理: {result['filename']}", visible=True),
-        gr.HTML(value=f"<div style='width:100%; background-color:#e6f3ff; border-radius:5px; padding:5px; text-align:center;'>处理进度: 0%</div>", visible=True),
+        gr.HTML(value=PROCESSING_STARTED_HTML, visible=True),
         gr.Textbox(visible=False),  # 隐藏转录文本
         gr.Button(visible=False),  # 隐藏翻译按钮
         gr.Dropdown(visible=False),  # 隐藏语言选择
@@ -60,8 +132,14 @@ def handle_upload(video_file, cuda_enabled, whisper_model):
     )
 
 
-def update_progress(video_info):
-    """更新处理进度"""
+def update_progress(video_info, request: gr.Request = None, progress_info=None):
+    """
+    更新处理进度
+
+    Args:
+        progress_info: 调用方已读取的处理状态快照，为None时在此读取
+    """
+    tick_key, last_tick = _take_progress_tick("processing", request)
     # 检查用户是否登录
     try:
         from deploy.utils.user_context import get_current_user_id
@@ -69,45 +147,62 @@ def update_progress(video_info):
         if not current_user_id:
             return (
                 "",  # processing_log内容
-                gr.Textbox(visible=False), 
-                gr.Button(visible=False), 
-                gr.Dropdown(visible=False), 
-                gr.Textbox(visible=False),  # 翻译结果区域
-                gr.HTML(value="<div style='width:100%; background-color:#f0f0f0; border-radius:5px; padding:5px; text-align:center;'>等待处理...</div>", visible=False),
-                gr.HTML(visible=False),  # 翻译进度条
-                gr.Textbox(visible=False)  # 索引状态
+                gr.update(visible=False), 
+                gr.update(visible=False), 
+                gr.update(visible=False), 
+                gr.update(visible=False),  # 翻译结果区域
+                gr.update(visible=False),
+                gr.update(visible=False),  # 翻译进度条
+                gr.update(visible=False)  # 索引状态
             )
     except:
         return (
             "",  # processing_log内容
-            gr.Textbox(visible=False), 
-            gr.Button(visible=False), 
-            gr.Dropdown(visible=False), 
-            gr.Textbox(visible=False),  # 翻译结果区域
-            gr.HTML(value="<div style='width:100%; background-color:#f0f0f0; border-radius:5px; padding:5px; text-align:center;'>等待处理...</div>", visible=False),
-            gr.HTML(visible=False),  # 翻译进度条
-            gr.Textbox(visible=False)  # 索引状态
+            gr.update(visible=False), 
+            gr.update(visible=False), 
+            gr.update(visible=False), 
+            gr.update(visible=False),  # 翻译结果区域
+            gr.update(visible=False),
+            gr.update(visible=False),  # 翻译进度条
+            gr.update(visible=False)  # 索引状态
         )
     
     if not video_info or "video_id" not in video_info:
         return (
             "",  # processing_log内容
-            gr.Textbox(visible=False), 
-            gr.Button(visible=False), 
-            gr.Dropdown(visible=False), 
-            gr.Textbox(visible=False),  # 翻译结果区域
-            gr.HTML(value="<div style='width:100%; background-color:#f0f0f0; border-radius:5px; padding:5px; text-align:center;'>等待处理...</div>", visible=False),
-            gr.HTML(visible=False),  # 翻译进度条
-            gr.Textbox(visible=False)  # 索引状态
+            gr.update(visible=False), 
+            gr.update(visible=False), 
+            gr.update(visible=False), 
+            gr.update(visible=False),  # 翻译结果区域
+            gr.update(visible=False),
+            gr.update(visible=False),  # 翻译进度条
+            gr.update(visible=False)  # 索引状态
         )
     
     video_id = video_info["video_id"]
-    # 获取用户隔离的处理器
+    # 处理状态记录由所有处理器共享，默认处理器也能读到以其他模型配置上传的视频的进度
     current_processor = get_isolated_processor()
     
-    progress_info = current_processor.get_processing_progress(video_id)
+    if progress_info is None:
+        progress_info = current_processor.get_processing_progress(video_id)
+    
+    # 日志队列有长度上限，用条数加最后一条日志判断是否有新日志
+    log_messages = progress_info["log_messages"]
+    transcript_parts = progress_info.get("transcript_parts", [])
+    tick = (
+        video_id,
+        progress_info["status"],
+        progress_info["progress"],
+        progress_info.get("current_step"),
+        len(log_messages),
+        log_messages[-1] if log_messages else None,
+        len(transcript_parts)
+    )
+    _progress_ticks[tick_key] = tick
+    if tick == last_tick:
+        return tuple(gr.skip() for _ in range(PROGRESS_OUTPUTS))
     
-    log_text = "\n".join(progress_info["log_messages"])
+    log_text = "\n".join(log_messages)
     progress_percent = int(progress_info["progress"] * 100)
     
     if progress_info["status"] == "completed":
@@ -116,63 +211,87 @@ def update_progress(video_info):
         transcript = video_info_data.get("transcript", {}).get("text", "")
         
         # 自动构建索引
-        index_status, _ = auto_build_index(f"{video_id}: {video_info_data.get('filename', 'Unknown')}")
+        index_status, _ = auto_build_index(video_id)
         
         return (
             log_text,
-            gr.Textbox(value=transcript, visible=True),
-            gr.Button(visible=True),  # 显示翻译按钮
-            gr.Dropdown(visible=True),  # 显示语言选择
-            gr.Textbox(visible=True),  # 显示翻译结果区域
-            gr.HTML(value=f"<div style='width:100%; background-color:#d4edda; border-radius:5px; padding:5px; text-align:center;'>✅ 处理完成！</div>", visible=True),
-            gr.HTML(visible=False),  # 隐藏翻译进度条
-            gr.Textbox(value=index_status, visible=True)  # 显示索引状态
+            gr.update(value=transcript, visible=True),
+            gr.update(visible=True),  # 显示翻译按钮
+            gr.update(visible=True),  # 显示语言选择
+            gr.update(visible=True),  # 显示翻译结果区域
+            gr.update(value=PROCESSING_DONE_HTML, visible=True),
+            gr.update(visible=False),  # 隐藏翻译进度条
+            gr.update(value=index_status, visible=True)  # 显示索引状态
         )
     
+    # 识别过程中逐段显示已识别的部分转录
+    if transcript_parts:
+        partial_transcript = gr.update(value="\n".join(transcript_parts), visible=True)
+    else:
+        partial_transcript = gr.update(visible=False)
+    
     return (
         log_text,
-        gr.Textbox(visible=False),
-        gr.Button(visible=False),
-        gr.Dropdown(visible=False),
-        gr.Textbox(visible=False),  # 翻译结果区域
-        gr.HTML(value=f"<div style='width:100%; background-color:#e6f3ff; border-radius:5px; padding:5px; text-align:center;'>⏳ {progress_info['current_step']} ({progress_percent}%)</div>", visible=True),
-        gr.HTML(visible=False),  # 隐藏翻译进度条
-        gr.Textbox(visible=False)  # 索引状态
+        partial_transcript,
+        gr.update(visible=False),
+        gr.update(visible=False),
+        gr.update(visible=False),  # 翻译结果区域
+        gr.update(value=STATUS_BANNER_TMPL.substitute(bg="#e6f3ff", msg=f"⏳ {progress_info['current_step']} ({progress_percent}%)"), visible=True),
+        gr.update(visible=False),  # 隐藏翻译进度条
+        gr.update(visible=False)  # 索引状态
     )
 
 
-def handle_question(question, history, video_selector):
-    """处理问答"""
+async def handle_question(question, history, video_selector):
+    """
+    处理问答（流式输出）
+    
+    回答在一个工作线程中持续生成并原地延长历史列表，本协程在回答增长时推送聊天框，
+    不再为每一段回答切换一次线程；推送间隔不小于 PROGRESS_MIN_INTERVAL，间隔内的增长合并为一次推送
+    """
     if not question.strip():
-        return "", history
+        yield "", history
+        return
     
     if not video_selector:
         # 添加错误消息到历史记录
         history.append({"role": "user", "content": question})
         history.append({"role": "assistant", "content": "请先选择一个视频"})
-        return "", history
+        yield "", history
+        return
     
-    video_id = video_selector.split(":")[0].strip()  # 假设格式为 "video_id: filename"
+    video_id = video_selector  # 下拉框的值即为视频ID
     
     # 获取用户隔离的对话管理器
     conversation_manager = get_conversation_manager()
     
-    # 调用对话功能
-    answer, updated_history = conversation_manager.chat_with_video(video_id, question, history)
+    loop = asyncio.get_running_loop()
+    changed = asyncio.Event()
+    latest = [history]
+    
+    def generate():
+        """在工作线程中逐段生成回答，每段都唤醒推送协程"""
+        for updated_history in conversation_manager.chat_with_video_stream(video_id, question, history):
+            latest[0] = updated_history
+            loop.call_soon_threadsafe(changed.set)
     
-    # 确保历史记录格式正确
-    if not isinstance(updated_history, list):
-        updated_history = []
+    task = asyncio.ensure_future(asyncio.to_thread(generate))
+    while not task.done():
+        waiter = asyncio.ensure_future(changed.wait())
+        await asyncio.wait({task, waiter}, return_when=asyncio.FIRST_COMPLETED)
+        waiter.cancel()
+        if changed.is_set():
+            changed.clear()
+            yield "", latest[0]
+            await asyncio.sleep(PROGRESS_MIN_INTERVAL)
     
-    # 如果历史记录是元组格式，转换为字典格式
-    if updated_history and isinstance(updated_history[0], tuple):
-        formatted_history = []
-        for user_msg, assistant_msg in updated_history:
-            formatted_history.append({"role": "user", "content": user_msg})
-            formatted_history.append({"role": "assistant", "content": assistant_msg})
-        updated_history = formatted_history
+    # 生成线程中的异常在此抛出
+    await task
+    if changed.is_set():
+        yield "", latest[0]
     
-    return "", updated_history
+    # 本轮对话已保存，历史对话列表中的轮数需要重新读取
+    _invalidate_conversation_list()
 
 
 def handle_search(query, video_selector, search_type="hybrid"):
@@ -180,7 +299,7 @@ def handle_search(query, video_selector, search_type="hybrid"):
     if not query.strip() or not video_selector:
         return []
     
-    video_id = video_selector.split(":")[0].strip()
+    video_id = video_selector
     
     # 获取索引构建器
     index_builder = get_index_builder()
@@ -211,10 +330,16 @@ def handle_search(query, video_selector, search_type="hybrid"):
     return formatted_results
 
 
-def handle_translate(video_info, target_lang):
-    """处理翻译"""
+async def handle_translate(video_info, target_lang):
+    """
+    处理翻译
+    
+    翻译在后台线程中执行，翻译器每完成一段就通过进度通知器唤醒本回调，
+    随即推送新的进度条，翻译结束后推送结果
+    """
     if not video_info or "video_id" not in video_info:
-        return "请先上传并处理视频", gr.Textbox(visible=False), gr.HTML(visible=False)
+        yield "请先上传并处理视频", gr.update(visible=False), gr.update(visible=False), gr.update(visible=False)
+        return
     
     video_id = video_info["video_id"]
     
@@ -224,91 +349,81 @@ def handle_translate(video_info, target_lang):
     # 检查视频是否存在
     video_info = current_processor.get_video_info(video_id)
     if not video_info:
-        return "视频不存在", gr.Textbox(visible=False), gr.HTML(visible=False)
+        yield "视频不存在", gr.update(visible=False), gr.update(visible=False), gr.update(visible=False)
+        return
     
     # 检查转录是否完成
     if not video_info.get("transcript"):
-        return "视频尚未转录完成，无法翻译", gr.Textbox(visible=False), gr.HTML(visible=False)
+        yield "视频尚未转录完成，无法翻译", gr.update(visible=False), gr.update(visible=False), gr.update(visible=False)
+        return
     
     # 获取翻译管理器
     translator_manager = get_translator_manager()
+    notifier = get_progress_notifier()
+    loop = asyncio.get_running_loop()
     
     # 实际执行翻译
     try:
-        result = translator_manager.translate_transcript(video_id, target_lang)
+        task = asyncio.ensure_future(
+            asyncio.to_thread(translator_manager.translate_transcript, video_id, target_lang)
+        )
+        yield "正在翻译...", gr.skip(), gr.update(value=TRANSLATING_HTML, visible=True), gr.skip()
+        
+        last_progress = None
+        last_emit = loop.time()
+        while not task.done():
+            seen_version = notifier.version(video_id)
+            
+            progress_info = translator_manager.get_translation_progress(video_id)
+            progress_percent = int(progress_info["progress"] * 100)
+            message = progress_info["message"]
+            if (progress_percent, message) != last_progress:
+                last_progress = (progress_percent, message)
+                last_emit = loop.time()
+                yield (
+                    gr.skip(),
+                    gr.skip(),
+                    gr.skip(),
+                    gr.update(value=TRANSLATION_PROGRESS_TMPL.substitute(pct=progress_percent, msg=message), visible=True)
+                )
+            
+            # 等待下一次进度变化或翻译结束
+            waiter = asyncio.ensure_future(
+                notifier.wait_for_change(video_id, seen_version, timeout=PROGRESS_STREAM_TIMEOUT)
+            )
+            await asyncio.wait({task, waiter}, return_when=asyncio.FIRST_COMPLETED)
+            waiter.cancel()
+            
+            # 限制推送频率，连续的分段进度合并为一次推送
+            delay = last_emit + PROGRESS_MIN_INTERVAL - loop.time()
+            if delay > 0 and not task.done():
+                await asyncio.sleep(delay)
+        
+        result = task.result()
         
         if "error" in result:
-            return result["error"], gr.Textbox(visible=False), gr.HTML(visible=False)
+            yield result["error"], gr.update(visible=False), gr.update(visible=False), gr.update(visible=False)
+            return
         
         # 翻译成功
         translated_text = result.get("translated_text", "")
-        return (
+        yield (
             "✅ 翻译完成", 
-            gr.Textbox(value=translated_text, visible=True),
-            gr.HTML(value="<div style='width:100%; background-color:#d4edda; border-radius:5px; padding:5px; text-align:center;'>✅ 翻译完成</div>", visible=True)
+            gr.update(value=translated_text, visible=True),
+            gr.update(value=TRANSLATION_DONE_HTML, visible=True),
+            gr.update(visible=False)
         )
         
     except Exception as e:
-        return f"翻译失败: {str(e)}", gr.Textbox(visible=False), gr.HTML(visible=False)
-
-
-def update_translation_progress(video_info):
-    """更新翻译进度"""
-    # 检查用户是否登录
-    try:
-        from deploy.utils.user_context import get_current_user_id
-        current_user_id = get_current_user_id()
-        if not current_user_id:
-            return gr.HTML(visible=False)
-    except:
-        return gr.HTML(visible=False)
-    
-    if not video_info or "video_id" not in video_info:
-        return gr.HTML(visible=False)
-    
-    video_id = video_info["video_id"]
-    
-    # 获取用户隔离的处理器
-    current_processor = get_isolated_processor()
-    
-    # 检查视频是否存在和是否正在翻译
-    video_info_data = current_processor.get_video_info(video_id)
-    if not video_info_data or not video_info_data.get("translating", False):
-        return gr.HTML(visible=False)
-    
-    # 获取翻译管理器
-    translator_manager = get_translator_manager()
-    
-    # 获取翻译进度
-    progress_info = translator_manager.get_translation_progress(video_id)
-    progress_percent = int(progress_info["progress"] * 100)
-    message = progress_info["message"]
-    
-    # 构建进度条HTML
-    progress_html = f"""
-    <div style='width:100%; background-color:#f8f9fa; border-radius:5px; padding:10px; margin:10px 0;'>
-        <div style='display: flex; justify-content: space-between; margin-bottom: 5px;'>
-            <span>翻译进度</span>
-            <span>{progress_percent}%</span>
-        </div>
-        <div style='width:100%; background-color:#e9ecef; border-radius:3px; overflow: hidden;'>
-            <div style='width:{progress_percent}%; background-color:#007bff; height:20px; transition: width 0.3s;'></div>
-        </div>
-        <div style='margin-top: 5px; font-size: 12px; color:#6c757d;'>
-            {message}
-        </div>
-    </div>
-    """
-    
-    return gr.HTML(value=progress_html, visible=True)
+        yield f"翻译失败: {str(e)}", gr.update(visible=False), gr.update(visible=False), gr.update(visible=False)
 
 
 def handle_build_index(video_selector):
     """构建向量索引"""
     if not video_selector:
-        return "请先选择视频", gr.Textbox(visible=False), gr.HTML(visible=False)
+        return "请先选择视频", gr.update(visible=False), gr.update(visible=False)
     
-    video_id = video_selector.split(":")[0].strip()
+    video_id = video_selector
     
     # 获取用户隔离的处理器
     current_processor = get_isolated_processor()
@@ -316,106 +431,126 @@ def handle_build_index(video_selector):
     # 检查视频是否存在
     video_info_data = current_processor.get_video_info(video_id)
     if not video_info_data:
-        return "视频不存在", gr.Textbox(visible=False), gr.HTML(visible=False)
+        return "视频不存在", gr.update(visible=False), gr.update(visible=False)
     
     # 检查转录是否完成
     if not video_info_data.get("transcript"):
-        return "视频尚未转录完成，无法构建索引", gr.Textbox(visible=False), gr.HTML(visible=False)
+        return "视频尚未转录完成，无法构建索引", gr.update(visible=False), gr.update(visible=False)
     
     # 获取索引构建器
     index_builder = get_index_builder()
     
-    # 实际执行构建索引
+    # 提交到后台线程池构建索引，构建状态由 stream_index_status / stream_progress 推送
     try:
-        # 使用正确的方法名
-        index_builder.build_user_index(video_id, video_info_data.get("transcript"))
-        return "索引构建完成", gr.Textbox(visible=False), gr.HTML(value=f"<div style='width:100%; background-color:#d4edda; border-radius:5px; padding:5px; text-align:center;'>✅ 索引构建完成</div>", visible=True)
+        index_builder.submit_user_index(video_id, video_info_data.get("transcript"))
+        return "索引正在后台构建", gr.update(visible=False), gr.update(value=INDEX_BUILDING_HTML, visible=True)
     except Exception as e:
-        return f"构建失败: {str(e)}", gr.Textbox(visible=False), gr.HTML(visible=False)
+        return f"构建失败: {str(e)}", gr.update(visible=False), gr.update(visible=False)
+
+def _invalidate_conversation_list():
+    """清除当前用户的历史对话列表缓存"""
+    from ..utils.user_context import get_current_user_id
+    user_id = get_current_user_id()
+    with _conversation_list_lock:
+        _conversation_list_cache.pop(user_id, None)
+
 
 def get_conversation_list():
-    """获取当前用户的历史对话列表"""
+    """获取当前用户的历史对话列表（按用户缓存 CONVERSATION_LIST_TTL 秒）"""
     try:
         # 获取用户专属的对话目录
-        from ..utils.user_context import get_current_user_paths
+        from ..utils.user_context import get_current_user_id, get_current_user_paths
         user_paths = get_current_user_paths()
         if not user_paths:
             return []
         
         conversations_dir = user_paths.get_conversations_dir()
-        if not conversations_dir.exists():
+        try:
+            dir_mtime = conversations_dir.stat().st_mtime_ns
+        except FileNotFoundError:
             return []
         
-        conversations = []
-        for filename in os.listdir(conversations_dir):
-            if filename.endswith("_conversation_history.json"):
-                video_id = filename.replace("_conversation_history.json", "")
-                file_path = os.path.join(conversations_dir, filename)
-                
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        conversation_data = json.load(f)
-                    
-                    # 获取基本信息
-                    history = conversation_data.get('history', [])
-                    created_at = conversation_data.get('created_at', '')
-                    
-                    # 计算对话轮数（用户消息数量）
-                    user_message_count = sum(1 for turn in history if 'user_query' in turn)
-                    
-                    # 格式化时间
-                    if created_at:
-                        try:
-                            dt = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-                            created_at = dt.strftime('%Y-%m-%d %H:%M')
-                        except:
-                            created_at = created_at[:10]  # 只取日期部分
-                    
-                    # 检查索引文件是否存在
-                    user_paths = get_current_user_paths()
-                    if user_paths:
-                        vector_index_path = user_paths.get_vector_index_path(video_id)
-                        bm25_index_path = user_paths.get_bm25_index_path(video_id)
-                        has_index = vector_index_path.exists() and bm25_index_path.exists()
-                    else:
-                        has_index = False
-                    
-                    # 获取视频名称（如果有的话）
-                    video_name = f"视频 {video_id}"
-                    try:
-                        from ..core.video_processor_isolated import get_isolated_processor
-                        processor = get_isolated_processor()
-                        video_info = processor.get_video_info(video_id)
-                        if video_info:
-                            video_name = video_info.get('filename', video_name)
-                    except:
-                        pass  # 如果获取失败，使用默认名称
-                    
-                    conversations.append({
-                        'video_id': video_id,
-                        'video_name': video_name,
-                        'created_at': created_at,
-                        'message_count': user_message_count,  # 对话轮数
-                        'has_index': has_index
-                    })
-                except Exception as e:
-                    print(f"读取对话文件 {filename} 失败: {e}")
-                    continue
+        user_id = get_current_user_id()
+        now = time.monotonic()
+        with _conversation_list_lock:
+            cached = _conversation_list_cache.get(user_id)
+        if cached is not None and cached[0] > now and cached[1] == dir_mtime:
+            return list(cached[2])
         
-        # 按创建时间排序（最新的在前）
-        conversations.sort(key=lambda x: x['created_at'], reverse=True)
-        return conversations
+        conversations = _scan_conversation_list(user_paths, conversations_dir)
+        with _conversation_list_lock:
+            _conversation_list_cache[user_id] = (now + CONVERSATION_LIST_TTL, dir_mtime, conversations)
+        return list(conversations)
     except Exception as e:
         print(f"获取对话列表失败: {e}")
         return []
 
 
+def _scan_conversation_list(user_paths, conversations_dir):
+    """读取对话目录中的全部对话文件，生成按创建时间倒序的对话列表"""
+    conversations = []
+    for filename in os.listdir(conversations_dir):
+        if filename.endswith("_conversation_history.json"):
+            video_id = filename.replace("_conversation_history.json", "")
+            file_path = os.path.join(conversations_dir, filename)
+            
+            try:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    conversation_data = json.load(f)
+                
+                # 获取基本信息
+                history = conversation_data.get('history', [])
+                created_at = conversation_data.get('created_at', '')
+                
+                # 计算对话轮数（用户消息数量）
+                user_message_count = sum(1 for turn in history if 'user_query' in turn)
+                
+                # 格式化时间
+                if created_at:
+                    try:
+                        dt = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
+                        created_at = dt.strftime('%Y-%m-%d %H:%M')
+                    except:
+                        created_at = created_at[:10]  # 只取日期部分
+                
+                # 检查索引文件是否存在
+                vector_index_path = user_paths.get_vector_index_path(video_id)
+                bm25_index_path = user_paths.get_bm25_index_path(video_id)
+                has_index = vector_index_path.exists() and bm25_index_path.exists()
+                
+                # 获取视频名称（如果有的话）
+                video_name = f"视频 {video_id}"
+                try:
+                    from ..core.video_processor_isolated import get_isolated_processor
+                    processor = get_isolated_processor()
+                    video_info = processor.get_video_info(video_id)
+                    if video_info:
+                        video_name = video_info.get('filename', video_name)
+                except:
+                    pass  # 如果获取失败，使用默认名称
+                
+                conversations.append({
+                    'video_id': video_id,
+                    'video_name': video_name,
+                    'created_at': created_at,
+                    'message_count': user_message_count,  # 对话轮数
+                    'has_index': has_index
+                })
+            except Exception as e:
+                print(f"读取对话文件 {filename} 失败: {e}")
+                continue
+    
+    # 按创建时间排序（最新的在前）
+    conversations.sort(key=lambda x: x['created_at'], reverse=True)
+    return conversations
+
+
 def load_conversation_history(video_selector):
     """加载选中视频的对话历史"""
     if not video_selector:
         return []
     
-    video_id = video_selector.split(":")[0].strip()
+    video_id = video_selector
     
     try:
         # 获取用户专属的对话目录
@@ -457,15 +592,14 @@ def load_conversation_history(video_selector):
 
 
 def start_new_chat(video_selector):
-    """开始新对话"""
+    """开始新对话（只清空服务端对话记录，界面上的聊天框和输入框由前端直接清空）"""
     if video_selector:
-        video_id = video_selector.split(":")[0].strip()
+        video_id = video_selector
         
         # 获取对话管理器
         conversation_manager = get_conversation_manager()
         
         conversation_manager.clear_conversation(video_id)
-    return [], ""
 
 
 def refresh_conversation_history():
@@ -530,7 +664,7 @@ def load_selected_conversation(history_df, evt: gr.SelectData):
             return []  # 只返回空列表
         
         # 加载对话历史
-        history = load_conversation_history(f"{video_id}: {video_name}")
+        history = load_conversation_history(video_id)
         
         # 确保返回的是列表格式
         if not isinstance(history, list):
@@ -584,6 +718,7 @@ def delete_selected_conversation_from_df(history_df):
             if video_id in conversation_manager.conversation_chains:
                 conversation_manager.clear_conversation(video_id)
             
+            _invalidate_conversation_list()
             return f"已删除对话: {video_name}"
         else:
             return "没有可删除的对话"
@@ -594,9 +729,9 @@ def delete_selected_conversation_from_df(history_df):
 def auto_build_index(video_selector):
     """自动为选中的视频构建索引"""
     if not video_selector:
-        return "", gr.HTML(visible=False)
+        return "", gr.update(visible=False)
     
-    video_id = video_selector.split(":")[0].strip()
+    video_id = video_selector
     
     # 获取用户隔离的处理器
     current_processor = get_isolated_processor()
@@ -604,67 +739,229 @@ def auto_build_index(video_selector):
     # 检查视频是否存在
     video_info_data = current_processor.get_video_info(video_id)
     if not video_info_data:
-        return "视频不存在", gr.HTML(visible=False)
+        return "视频不存在", gr.update(visible=False)
     
     # 检查转录是否完成
     if not video_info_data.get("transcript"):
-        return "视频尚未转录完成，无法构建索引", gr.HTML(visible=False)
+        return "视频尚未转录完成，无法构建索引", gr.update(visible=False)
     
     # 获取索引构建器
     index_builder = get_index_builder()
     
-    # 实际执行构建索引
+    # 重复选择同一视频时，索引正在构建或已是最新的都无需重新构建
+    if index_builder.is_index_building(video_id):
+        return "索引正在后台构建", gr.update(visible=False)
+    if index_builder.has_current_index(video_id):
+        return "索引已就绪", gr.update(visible=False)
+    
+    # 提交到后台线程池构建索引，不阻塞界面回调
     try:
-        # 使用正确的方法名
-        index_builder.build_user_index(video_id, video_info_data.get("transcript"))
-        return "索引构建完成", gr.HTML(visible=False)
+        index_builder.submit_user_index(video_id, video_info_data.get("transcript"))
+        return "索引正在后台构建", gr.update(visible=False)
     except Exception as e:
-        return f"构建失败: {str(e)}", gr.HTML(visible=False)
+        return f"构建失败: {str(e)}", gr.update(visible=False)
+
+
+async def on_video_change(video_selector):
+    """视频选择变化时，并行执行自动构建索引和加载对话历史（两者互不依赖）"""
+    index_result, history = await asyncio.gather(
+        asyncio.to_thread(auto_build_index, video_selector),
+        asyncio.to_thread(load_conversation_history, video_selector)
+    )
+    return index_result[0], history
 
 
 def refresh_video_list():
     """刷新视频列表"""
     # 获取用户隔离的处理器
     current_processor = get_isolated_processor()
-    videos = current_processor.get_user_video_list()
-    choices = [f"{v['video_id']}: {v['filename']}" for v in videos]
+    # 选项为 (显示文本, 视频ID)，事件回调直接收到视频ID；显示文本在上传时生成并随视频列表缓存
+    choices = current_processor.get_user_video_choices()
     
     # 如果有视频，自动为第一个视频构建索引
     if choices:
-        first_video = choices[0]
-        index_status, _ = auto_build_index(first_video)
-        return gr.Dropdown(choices=choices, value=choices[0]), gr.Textbox(value=index_status, visible=True)
-    return gr.Dropdown(choices=choices, value=None), gr.Textbox(visible=False)
+        first_video_id = choices[0][1]
+        index_status, _ = auto_build_index(first_video_id)
+        return gr.update(choices=choices, value=first_video_id), gr.update(value=index_status, visible=True)
+    return gr.update(choices=choices, value=None), gr.update(visible=False)
 
 
-def check_background_tasks(video_info):
+def check_background_tasks(video_info, request: gr.Request = None):
     """检查后台任务"""
+    tick_key, last_tick = _take_progress_tick("background", request)
     # 检查用户是否登录
     try:
         from deploy.utils.user_context import get_current_user_id
         current_user_id = get_current_user_id()
         if not current_user_id:
-            return gr.HTML(visible=False), gr.HTML(visible=False)
+            return gr.update(visible=False), gr.update(visible=False)
     except:
-        return gr.HTML(visible=False), gr.HTML(visible=False)
+        return gr.update(visible=False), gr.update(visible=False)
     
     if not video_info or "video_id" not in video_info:
-        return gr.HTML(visible=False), gr.HTML(visible=False)
+        return gr.update(visible=False), gr.update(visible=False)
     
     video_id = video_info["video_id"]
+    translator_manager = get_translator_manager()
+    index_builder = get_index_builder()
     
-    # 获取用户隔离的处理器
-    current_processor = get_isolated_processor()
-    
-    # 检查翻译进度
-    video_info_data = current_processor.get_video_info(video_id)
-    if video_info_data and video_info_data.get("translating", False):
+    # 没有任何翻译或索引构建任务时不再读取视频数据和逐个查询任务
+    if not translator_manager.has_active_translations() and not index_builder.has_pending_builds():
+        translating = index_building = False
+    else:
+        # 检查翻译和索引构建进度
+        video_info_data = get_isolated_processor().get_video_info(video_id)
+        translating = translator_manager.is_translating(video_id)
+        index_building = video_info_data and video_info_data.get("index_building", False)
+        if not index_building:
+            index_building = index_builder.is_index_building(video_id)
+    
+    tick = (video_id, translating, bool(index_building) and not translating)
+    _progress_ticks[tick_key] = tick
+    if tick == last_tick:
+        return gr.skip(), gr.skip()
+    
+    if translating:
         # 模拟翻译进度
-        return gr.HTML(value="<div style='width:100%; background-color:#fff3cd; border-radius:5px; padding:5px; text-align:center;'>⏳ 正在翻译...</div>", visible=True), gr.HTML(visible=False)
+        return gr.update(value=TRANSLATING_HTML, visible=True), gr.update(visible=False)
     
-    # 检查索引构建进度
-    if video_info_data and video_info_data.get("index_building", False):
+    if index_building:
         # 模拟索引构建进度
-        return gr.HTML(visible=False), gr.HTML(value="<div style='width:100%; background-color:#fff3cd; border-radius:5px; padding:5px; text-align:center;'>⏳ 正在构建索引...</div>", visible=True)
+        return gr.update(visible=False), gr.update(value=INDEX_BUILDING_HTML, visible=True)
+    
+    return gr.update(visible=False), gr.update(visible=False)
+
+
+async def stream_index_status(video_selector):
+    """
+    推送选中视频的索引构建状态
+    
+    选择或刷新视频时由 auto_build_index 提交的索引构建没有处理进度推送跟随，
+    这里只在构建进行中时等待进度通知，构建结束后推送一次最终状态；没有构建任务时立即结束
+    """
+    if not video_selector:
+        return
+    
+    video_id = video_selector
+    index_builder = get_index_builder()
+    notifier = get_progress_notifier()
+    
+    seen_version = notifier.version(video_id)
+    if not await asyncio.to_thread(index_builder.is_index_building, video_id):
+        return
+    
+    yield gr.skip(), gr.update(value=INDEX_BUILDING_HTML, visible=True)
+    
+    while True:
+        await notifier.wait_for_change(video_id, seen_version, timeout=PROGRESS_STREAM_TIMEOUT)
+        seen_version = notifier.version(video_id)
+        if not await asyncio.to_thread(index_builder.is_index_building, video_id):
+            break
+    
+    ready = await asyncio.to_thread(index_builder.has_current_index, video_id)
+    yield gr.update(value="索引已就绪" if ready else "索引构建失败", visible=True), gr.update(visible=False)
+
+
+def _is_skip(value):
+    """输出是否为 gr.skip()（不更新组件）"""
+    return isinstance(value, dict) and value == gr.skip()
+
+
+def _progress_state(video_id):
+    """
+    一次读取视频的处理状态和索引构建状态
+
+    Returns:
+        tuple: (状态元组, 是否仍有处理或索引构建在进行, 处理状态快照)
+    """
+    # 处理状态记录由所有处理器共享，不论上传时使用哪个模型配置都从默认处理器读取
+    processor = get_isolated_processor()
+    record = processor.processing_status.get(video_id)
+    processing = None
+    if record is not None:
+        # 快照随后直接交给 update_progress 渲染，同一次推送只复制一次处理记录
+        try:
+            processing = processor.get_processing_progress(video_id)
+        except ValueError:
+            # 用户未登录时 update_progress 只返回隐藏组件的更新，直接复制记录即可
+            processing = record.snapshot()
+    index_building = get_index_builder().is_index_building(video_id)
+    
+    if processing is None:
+        return (video_id, None, index_building), index_building, None
+    
+    log_messages = processing["log_messages"]
+    state = (
+        video_id,
+        processing["status"],
+        processing["progress"],
+        processing["current_step"],
+        len(log_messages),
+        log_messages[-1] if log_messages else None,
+        len(processing["transcript_parts"]),
+        index_building
+    )
+    return state, processing["status"] == "processing" or index_building, processing
+
+
+def _progress_snapshot(video_info, request):
+    """
+    汇总处理进度和索引构建状态，对应 stream_progress 的8个输出
+
+    先比较整体状态，未变化时直接返回全部 gr.skip()，不再逐组读取和渲染；
+    状态变化时复用比较时读取的处理状态快照渲染处理进度
+
+    Returns:
+        tuple: (8个输出, 是否仍有进行中的任务)
+    """
+    video_id = video_info["video_id"]
+    tick_key, last_tick = _take_progress_tick("stream", request)
+    state, pending, progress_info = _progress_state(video_id)
+    _progress_ticks[tick_key] = state
+    if state == last_tick:
+        return tuple(gr.skip() for _ in range(PROGRESS_OUTPUTS)), pending
+    
+    processing = update_progress(video_info, request, progress_info=progress_info)
+    background = check_background_tasks(video_info, request)
+    # 处理完成时 update_progress 会提交索引构建，推送需要继续等待构建结束
+    pending = pending or get_index_builder().is_index_building(video_id)
+    # 翻译进度条和翻译状态由 handle_translate 推送，这里只取处理进度和索引构建状态
+    return processing[:6] + processing[7:] + (background[1],), pending
+
+
+async def stream_progress(video_info, request: gr.Request = None):
+    """
+    推送视频处理和索引构建进度
     
-    return gr.HTML(visible=False), gr.HTML(visible=False)
\ No newline at end of file
+    后台线程更新进度时通过进度通知器唤醒本回调，只在进度变化时推送；
+    没有进行中的任务时结束推送，推送结束或客户端断开后清除该会话的轮询状态
+    """
+    if not video_info or "video_id" not in video_info:
+        return
+    
+    video_id = video_info["video_id"]
+    notifier = get_progress_notifier()
+    loop = asyncio.get_running_loop()
+    last_emit = 0.0
+    
+    try:
+        while True:
+            # 先记下版本号再读取状态，读取期间发生的变化会在下一轮等待时立即返回
+            seen_version = notifier.version(video_id)
+            outputs, pending = await asyncio.to_thread(_progress_snapshot, video_info, request)
+            
+            # 所有输出都没有变化时不推送
+            if not all(_is_skip(value) for value in outputs):
+                last_emit = loop.time()
+                yield outputs
+            
+            if not pending:
+                return
+            await notifier.wait_for_change(video_id, seen_version, timeout=PROGRESS_STREAM_TIMEOUT)
+            
+            # 限制推送频率：连续的进度变化（如逐段翻译、逐条日志）在最短间隔内合并
+            delay = last_emit + PROGRESS_MIN_INTERVAL - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+    finally:
+        _drop_progress_ticks(request)
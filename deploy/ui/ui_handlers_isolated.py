@@ -25,7 +25,7 @@ from deploy.utils.user_context import get_current_user_id, get_current_user_path
 # 导入原有的处理函数（需要修改的）
 from deploy.ui.ui_handlers import (
     update_progress, handle_question, handle_search, handle_translate,
-    update_translation_progress, handle_build_index, get_conversation_list,
+    handle_build_index, get_conversation_list,
     load_conversation_history, start_new_chat, refresh_conversation_history,
     load_selected_conversation, delete_selected_conversation_from_df,
     auto_build_index, check_background_tasks
@@ -79,17 +79,16 @@ def refresh_video_list_isolated():
     """刷新视频列表（用户隔离版本）"""
     current_user_id = get_current_user_id()
     if not current_user_id:
-        return gr.Dropdown(choices=[], value=None)
+        return gr.update(choices=[], value=None)
     
     # 获取用户隔离的处理器
     processor = get_isolated_processor()
-    videos = processor.get_user_video_list()
+    choices = [label for label, _ in processor.get_user_video_choices()]
     
-    if videos:
-        choices = [f"{v['video_id']}: {v['filename']}" for v in videos]
-        return gr.Dropdown(choices=choices, value=choices[0] if choices else None)
+    if choices:
+        return gr.update(choices=choices, value=choices[0] if choices else None)
     else:
-        return gr.Dropdown(choices=[], value=None)
+        return gr.update(choices=[], value=None)
 
 
 def get_user_video_info_isolated(video_selector):
@@ -101,7 +100,7 @@ def get_user_video_info_isolated(video_selector):
     if not current_user_id:
         return None
     
-    video_id = video_selector.split(":")[0].strip()
+    video_id = video_selector
     
     # 获取用户隔离的处理器
     processor = get_isolated_processor()
@@ -119,7 +118,7 @@ def build_user_index_isolated(video_selector):
     if not current_user_id:
         return "用户未登录", gr.Textbox(visible=False), gr.HTML(visible=False)
     
-    video_id = video_selector.split(":")[0].strip()
+    video_id = video_selector
     
     # 获取用户路径
     user_paths = get_current_user_paths()
@@ -190,7 +189,7 @@ def search_user_content_isolated(query, video_selector, search_type="hybrid"):
     if not current_user_id:
         return [{"text": "用户未登录", "timestamp": 0.0, "score": 0.0, "type": "error"}]
     
-    video_id = video_selector.split(":")[0].strip()
+    video_id = video_selector
     
     # 获取用户路径
     user_paths = get_current_user_paths()
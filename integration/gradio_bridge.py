@@ -6,12 +6,24 @@ Gradio-Flask桥接器
 实现Gradio界面与Flask API的通信
 """
 
+import asyncio
 import requests
 import logging
+from requests.adapters import HTTPAdapter
 from typing import Dict, Optional, Any, Tuple
 
+try:
+    import httpx
+    HAS_HTTPX = True
+except ImportError:
+    HAS_HTTPX = False
+
 logger = logging.getLogger(__name__)
 
+# 与Flask服务之间保持的连接数上限，与界面事件的最大并发回调数一致，
+# 并发登录、刷新时连接可复用，不会因连接池已满而每次新建TCP连接
+POOL_MAXSIZE = 32
+
 
 class GradioBridge:
     """Gradio与Flask的桥接器"""
@@ -25,6 +37,11 @@ class GradioBridge:
         """
         self.flask_base_url = flask_base_url.rstrip('/')
         self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_MAXSIZE)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        # 异步接口复用的HTTP客户端（首次调用时创建）
+        self._async_client = None
         self.token = None
         self.current_user = None
         logger.info(f"Gradio桥接器初始化完成，Flask URL: {self.flask_base_url}")
@@ -71,20 +88,40 @@ class GradioBridge:
                 timeout=10
             )
             
-            result = response.json()
+            return self._handle_register_response(response.status_code, response.json())
             
-            # 处理速率限制
-            if response.status_code == 429:
-                retry_after = result.get('retry_after', 60)
-                logger.warning(f"遇到速率限制，{retry_after}秒后重试")
-                return {
-                    'success': False,
-                    'message': f'请求过于频繁，请等待 {retry_after} 秒后重试',
-                    'retry_after': retry_after
-                }
+        except Exception as e:
+            logger.error(f"用户注册异常: {e}")
+            return {
+                'success': False,
+                'message': f'注册失败: {str(e)}'
+            }
+    
+    async def register_user_async(self, username: str, email: str, password: str) -> Dict[str, Any]:
+        """
+        用户注册（异步版本，在事件循环中等待Flask响应，不占用工作线程）
+        
+        Args:
+            username: 用户名
+            email: 邮箱
+            password: 密码
             
-            logger.info(f"用户注册结果: {result.get('message', '')}")
-            return result
+        Returns:
+            Dict[str, Any]: 注册结果
+        """
+        if not HAS_HTTPX:
+            return await asyncio.to_thread(self.register_user, username, email, password)
+        
+        try:
+            response = await self._get_async_client().post(
+                "/api/auth/register",
+                json={
+                    'username': username,
+                    'email': email,
+                    'password': password
+                }
+            )
+            return self._handle_register_response(response.status_code, response.json())
             
         except Exception as e:
             logger.error(f"用户注册异常: {e}")
@@ -93,6 +130,37 @@ class GradioBridge:
                 'message': f'注册失败: {str(e)}'
             }
     
+    def _handle_register_response(self, status_code: int, result: Dict[str, Any]) -> Dict[str, Any]:
+        """处理注册接口的响应"""
+        # 处理速率限制
+        if status_code == 429:
+            return self._rate_limited(result)
+        
+        logger.info(f"用户注册结果: {result.get('message', '')}")
+        return result
+    
+    def _rate_limited(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """构建速率限制时的返回结果"""
+        retry_after = result.get('retry_after', 60)
+        logger.warning(f"遇到速率限制，{retry_after}秒后重试")
+        return {
+            'success': False,
+            'message': f'请求过于频繁，请等待 {retry_after} 秒后重试',
+            'retry_after': retry_after
+        }
+    
+    def _get_async_client(self):
+        """获取复用的异步HTTP客户端"""
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(
+                base_url=self.flask_base_url,
+                timeout=10,
+                limits=httpx.Limits(max_connections=POOL_MAXSIZE, max_keepalive_connections=POOL_MAXSIZE)
+            )
+            if self.token:
+                self._async_client.headers['Authorization'] = f'Bearer {self.token}'
+        return self._async_client
+    
     def login_user(self, username_or_email: str, password: str) -> Dict[str, Any]:
         """
         用户登录
@@ -114,33 +182,38 @@ class GradioBridge:
                 timeout=10
             )
             
-            result = response.json()
+            return self._handle_login_response(response.status_code, response.json())
             
-            # 处理速率限制
-            if response.status_code == 429:
-                retry_after = result.get('retry_after', 60)
-                logger.warning(f"遇到速率限制，{retry_after}秒后重试")
-                return {
-                    'success': False,
-                    'message': f'请求过于频繁，请等待 {retry_after} 秒后重试',
-                    'retry_after': retry_after
-                }
+        except Exception as e:
+            logger.error(f"用户登录异常: {e}")
+            return {
+                'success': False,
+                'message': f'登录失败: {str(e)}'
+            }
+    
+    async def login_user_async(self, username_or_email: str, password: str) -> Dict[str, Any]:
+        """
+        用户登录（异步版本，在事件循环中等待Flask响应，不占用工作线程）
+        
+        Args:
+            username_or_email: 用户名或邮箱
+            password: 密码
             
-            # 如果登录成功，保存令牌
-            if result.get('success') and 'token' in result:
-                self.token = result['token']
-                self.current_user = {
-                    'user_id': result.get('user_id'),
-                    'username': result.get('username')
+        Returns:
+            Dict[str, Any]: 登录结果
+        """
+        if not HAS_HTTPX:
+            return await asyncio.to_thread(self.login_user, username_or_email, password)
+        
+        try:
+            response = await self._get_async_client().post(
+                "/api/auth/login",
+                json={
+                    'username_or_email': username_or_email,
+                    'password': password
                 }
-                # 设置会话头部
-                self.session.headers.update({
-                    'Authorization': f'Bearer {self.token}'
-                })
-                logger.info(f"用户登录成功: {result.get('username')}")
-            
-            logger.info(f"用户登录结果: {result.get('message', '')}")
-            return result
+            )
+            return self._handle_login_response(response.status_code, response.json())
             
         except Exception as e:
             logger.error(f"用户登录异常: {e}")
@@ -149,6 +222,30 @@ class GradioBridge:
                 'message': f'登录失败: {str(e)}'
             }
     
+    def _handle_login_response(self, status_code: int, result: Dict[str, Any]) -> Dict[str, Any]:
+        """处理登录接口的响应，登录成功时保存令牌"""
+        # 处理速率限制
+        if status_code == 429:
+            return self._rate_limited(result)
+        
+        # 如果登录成功，保存令牌
+        if result.get('success') and 'token' in result:
+            self.token = result['token']
+            self.current_user = {
+                'user_id': result.get('user_id'),
+                'username': result.get('username')
+            }
+            # 设置会话头部（同步会话和异步客户端共用同一令牌）
+            self.session.headers.update({
+                'Authorization': f'Bearer {self.token}'
+            })
+            if self._async_client is not None:
+                self._async_client.headers['Authorization'] = f'Bearer {self.token}'
+            logger.info(f"用户登录成功: {result.get('username')}")
+        
+        logger.info(f"用户登录结果: {result.get('message', '')}")
+        return result
+    
     def logout_user(self) -> Dict[str, Any]:
         """
         用户登出
@@ -174,6 +271,8 @@ class GradioBridge:
             self.token = None
             self.current_user = None
             self.session.headers.pop('Authorization', None)
+            if self._async_client is not None:
+                self._async_client.headers.pop('Authorization', None)
             
             logger.info(f"用户登出结果: {result.get('message', '')}")
             return result
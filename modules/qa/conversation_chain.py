@@ -12,7 +12,7 @@ import logging
 import threading
 import pickle
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, Iterator, List, Any, Optional, Union
 from datetime import datetime
 
 # 导入配置
@@ -292,6 +292,117 @@ class ConversationChain:
             self.logger.error(f"生成回答失败: {e}")
             return f"生成回答时出现错误: {str(e)}"
     
+    def _stream_response(self, query: str, context: str) -> Iterator[str]:
+        """
+        流式生成回答
+        
+        OpenAI兼容接口（讯飞星火、本地LLM）和Anthropic按增量返回文本，
+        其他提供商不支持流式时一次性返回完整回答
+        
+        Args:
+            query: 用户查询
+            context: 上下文
+            
+        Yields:
+            回答的增量文本
+        """
+        provider = self.llm_config.get('provider', 'local')
+        
+        if provider == 'openai':
+            yield from self._stream_openai_compatible(query, context, 'xop3qwen1b7')
+        elif provider == 'local':
+            yield from self._stream_openai_compatible(query, context, None)
+        elif provider == 'anthropic':
+            yield from self._stream_anthropic(query, context)
+        else:
+            yield self._generate_response(query, context)
+    
+    def _stream_openai_compatible(self, query: str, context: str,
+                                  default_model: Optional[str]) -> Iterator[str]:
+        """通过OpenAI兼容接口流式调用大模型"""
+        try:
+            from openai import OpenAI
+        except ImportError:
+            self.logger.error("OpenAI库未安装")
+            yield "OpenAI库未安装，请安装: pip install openai"
+            return
+        
+        try:
+            api_key = self.openai_config.get('api_key')
+            base_url = self.openai_config.get('base_url')
+            
+            if not api_key:
+                raise ValueError("未配置API密钥")
+            if not base_url:
+                raise ValueError("未配置API地址")
+            
+            client = OpenAI(api_key=api_key, base_url=base_url)
+            messages = self._build_messages(query, context)
+            
+            self.logger.info(f"流式发送消息到大模型API，消息数量: {len(messages)}")
+            
+            stream = client.chat.completions.create(
+                model=self.openai_config.get('model_name', default_model),
+                messages=messages,
+                max_tokens=self.openai_config.get('max_tokens', 2048),
+                temperature=self.openai_config.get('temperature', 0.7),
+                stream=True
+            )
+            
+            answer_length = 0
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    answer_length += len(delta)
+                    yield delta
+            
+            if answer_length == 0:
+                self.logger.error("大模型API响应为空")
+                yield "抱歉，无法获取回答，请稍后重试。"
+            else:
+                self.logger.info(f"大模型API流式调用成功，回答长度: {answer_length}")
+            
+        except Exception as e:
+            self.logger.error(f"大模型API流式调用失败: {e}")
+            yield f"调用大模型API时出现错误: {str(e)}"
+    
+    def _stream_anthropic(self, query: str, context: str) -> Iterator[str]:
+        """通过Anthropic消息接口流式调用大模型"""
+        try:
+            import anthropic
+        except ImportError:
+            yield "Anthropic库未安装，请安装: pip install anthropic"
+            return
+        
+        try:
+            api_key = settings.ANTHROPIC_API_KEY
+            if not api_key:
+                raise ValueError("未配置Anthropic API密钥")
+            
+            client = anthropic.Anthropic(api_key=api_key)
+            anthropic_config = self.llm_config.get('anthropic', {})
+            
+            answer_length = 0
+            with client.messages.stream(
+                model=anthropic_config.get('model_name', 'claude-3-sonnet-20240229'),
+                max_tokens=anthropic_config.get('max_tokens', 2048),
+                messages=self._build_anthropic_messages(query, context)
+            ) as stream:
+                for delta in stream.text_stream:
+                    if delta:
+                        answer_length += len(delta)
+                        yield delta
+            
+            if answer_length == 0:
+                self.logger.error("Anthropic API响应为空")
+                yield "抱歉，无法获取回答，请稍后重试。"
+            
+        except Exception as e:
+            self.logger.error(f"Anthropic API流式调用失败: {e}")
+            yield f"Anthropic API调用失败: {str(e)}"
+    
     def _build_messages(self, query: str, context: str) -> List[Dict[str, str]]:
         """
         构建完整的消息列表，每次都发送完整视频内容，不包含历史对话
@@ -534,28 +645,11 @@ class ConversationChain:
             
             client = anthropic.Anthropic(api_key=api_key)
             
-            # 构建消息列表（Anthropic格式稍有不同）
-            messages = self._build_messages(query, context)
-            
-            # 转换为Anthropic格式（移除system消息，将其合并到第一个user消息）
-            anthropic_messages = []
-            system_message = ""
-            
-            for msg in messages:
-                if msg['role'] == 'system':
-                    system_message += msg['content'] + "\n\n"
-                else:
-                    anthropic_messages.append(msg)
-            
-            # 将系统消息添加到第一个user消息
-            if system_message and anthropic_messages:
-                anthropic_messages[0]['content'] = system_message + anthropic_messages[0]['content']
-            
             # 调用API
             response = client.messages.create(
                 model=self.llm_config.get('anthropic', {}).get('model_name', 'claude-3-sonnet-20240229'),
                 max_tokens=self.llm_config.get('anthropic', {}).get('max_tokens', 2048),
-                messages=anthropic_messages
+                messages=self._build_anthropic_messages(query, context)
             )
             
             return response.content[0].text
@@ -566,6 +660,25 @@ class ConversationChain:
             self.logger.error(f"Anthropic API调用失败: {e}")
             return f"Anthropic API调用失败: {str(e)}"
     
+    def _build_anthropic_messages(self, query: str, context: str) -> List[Dict[str, str]]:
+        """构建Anthropic格式的消息列表（移除system消息，将其合并到第一个user消息）"""
+        anthropic_messages = []
+        system_message = ""
+        
+        for msg in self._build_messages(query, context):
+            if msg['role'] == 'system':
+                system_message += msg['content'] + "\n\n"
+            else:
+                anthropic_messages.append(msg)
+        
+        # 将系统消息添加到第一个user消息（复制该消息，不修改对话历史中的原对象）
+        if system_message and anthropic_messages:
+            first = dict(anthropic_messages[0])
+            first['content'] = system_message + first['content']
+            anthropic_messages[0] = first
+        
+        return anthropic_messages
+    
     def _call_local_llm(self, query: str, context: str) -> str:
         """调用本地LLM（使用OpenAI兼容接口）"""
         try:
@@ -688,6 +801,84 @@ class ConversationChain:
         # 更新记忆
         self.memory.add_turn(turn)
     
+    def _prepare_turn(self, query: str, top_k: int):
+        """创建对话轮次并完成检索和上下文构建"""
+        self.logger.info(f"处理用户查询: {query}")
+        
+        # 创建新的对话轮次
+        self.current_turn_id += 1
+        current_turn = ConversationTurn(
+            turn_id=self.current_turn_id,
+            user_query=query
+        )
+        
+        # 根据索引状态选择检索策略
+        if self.index_ready and self.retriever:
+            # 使用完整的混合检索
+            retrieved_docs = self._retrieve_documents(query, top_k)
+            retrieval_method = 'hybrid'
+        else:
+            # 使用降级检索策略
+            retrieved_docs = self._fallback_retrieve(query, top_k)
+            retrieval_method = 'fallback'
+        
+        current_turn.retrieved_docs = retrieved_docs
+        
+        # 构建上下文
+        context = self._build_context(retrieved_docs, query)
+        current_turn.context = context
+        
+        return current_turn, retrieval_method
+    
+    def _complete_turn(self, current_turn: ConversationTurn, response: str,
+                       retrieval_method: str) -> Dict[str, Any]:
+        """记录回答并构建对话结果"""
+        current_turn.response = response
+        
+        # 添加到对话历史
+        self.conversation_history.append(current_turn)
+        
+        # 如果有会话数据，同步更新
+        if self.session_data:
+            self.session_data.add_conversation_turn(current_turn)
+        
+        retrieved_docs = current_turn.retrieved_docs
+        context = current_turn.context
+        
+        # 构建返回结果
+        result = {
+            'session_id': self.session_id,
+            'turn_id': current_turn.turn_id,
+            'query': current_turn.user_query,
+            'response': response,
+            'retrieved_docs': retrieved_docs,
+            'context': context,
+            'timestamp': current_turn.timestamp.isoformat(),
+            'metadata': {
+                'total_turns': len(self.conversation_history),
+                'retrieved_count': len(retrieved_docs),
+                'context_length': len(context),
+                'retrieval_method': retrieval_method,
+                'index_ready': self.index_ready
+            }
+        }
+        
+        self.logger.info(f"对话处理完成，返回 {len(retrieved_docs)} 个检索结果，方法: {retrieval_method}")
+        return result
+    
+    def _error_result(self, query: str, error: Exception) -> Dict[str, Any]:
+        """构建对话失败时的结果"""
+        return {
+            'session_id': self.session_id,
+            'turn_id': self.current_turn_id,
+            'query': query,
+            'response': f"处理查询时出现错误: {str(error)}",
+            'retrieved_docs': [],
+            'context': "",
+            'timestamp': datetime.now().isoformat(),
+            'metadata': {'error': str(error)}
+        }
+    
     def chat(self, query: str, top_k: int = 5) -> Dict[str, Any]:
         """
         处理对话
@@ -700,75 +891,46 @@ class ConversationChain:
             对话结果字典
         """
         try:
-            self.logger.info(f"处理用户查询: {query}")
-            
-            # 创建新的对话轮次
-            self.current_turn_id += 1
-            current_turn = ConversationTurn(
-                turn_id=self.current_turn_id,
-                user_query=query
-            )
-            
-            # 根据索引状态选择检索策略
-            if self.index_ready and self.retriever:
-                # 使用完整的混合检索
-                retrieved_docs = self._retrieve_documents(query, top_k)
-                retrieval_method = 'hybrid'
-            else:
-                # 使用降级检索策略
-                retrieved_docs = self._fallback_retrieve(query, top_k)
-                retrieval_method = 'fallback'
-            
-            current_turn.retrieved_docs = retrieved_docs
-            
-            # 构建上下文
-            context = self._build_context(retrieved_docs, query)
-            current_turn.context = context
+            current_turn, retrieval_method = self._prepare_turn(query, top_k)
             
             # 生成回答
-            response = self._generate_response(query, context)
-            current_turn.response = response
+            response = self._generate_response(query, current_turn.context)
             
-            # 添加到对话历史
-            self.conversation_history.append(current_turn)
+            return self._complete_turn(current_turn, response, retrieval_method)
+            
+        except Exception as e:
+            self.logger.error(f"对话处理失败: {e}")
+            return self._error_result(query, e)
+    
+    def chat_stream(self, query: str, top_k: int = 5) -> Iterator[str]:
+        """
+        流式处理对话，逐段产出回答文本
+        
+        回答生成完毕后与 chat 一样记录到对话历史；
+        完整结果字典作为生成器的返回值（StopIteration.value）
+        
+        Args:
+            query: 用户查询
+            top_k: 检索文档数量
             
-            # 如果有会话数据，同步更新
-            if self.session_data:
-                self.session_data.add_conversation_turn(current_turn)
+        Yields:
+            回答的增量文本
+        """
+        try:
+            current_turn, retrieval_method = self._prepare_turn(query, top_k)
             
-            # 构建返回结果
-            result = {
-                'session_id': self.session_id,
-                'turn_id': current_turn.turn_id,
-                'query': query,
-                'response': response,
-                'retrieved_docs': retrieved_docs,
-                'context': context,
-                'timestamp': current_turn.timestamp.isoformat(),
-                'metadata': {
-                    'total_turns': len(self.conversation_history),
-                    'retrieved_count': len(retrieved_docs),
-                    'context_length': len(context),
-                    'retrieval_method': retrieval_method,
-                    'index_ready': self.index_ready
-                }
-            }
+            parts = []
+            for delta in self._stream_response(query, current_turn.context):
+                parts.append(delta)
+                yield delta
             
-            self.logger.info(f"对话处理完成，返回 {len(retrieved_docs)} 个检索结果，方法: {retrieval_method}")
-            return result
+            return self._complete_turn(current_turn, "".join(parts), retrieval_method)
             
         except Exception as e:
             self.logger.error(f"对话处理失败: {e}")
-            return {
-                'session_id': self.session_id,
-                'turn_id': self.current_turn_id,
-                'query': query,
-                'response': f"处理查询时出现错误: {str(e)}",
-                'retrieved_docs': [],
-                'context': "",
-                'timestamp': datetime.now().isoformat(),
-                'metadata': {'error': str(e)}
-            }
+            result = self._error_result(query, e)
+            yield result['response']
+            return result
     
     def get_conversation_history(self) -> List[Dict[str, Any]]:
         """获取对话历史"""
@@ -12,17 +12,38 @@ BM25检索器模块
 
 import os
 import re
+import json
 import pickle
 import math
+import hashlib
 import logging
 from pathlib import Path
 from typing import List, Dict, Optional, Union, Tuple
 from collections import Counter, defaultdict
 
+import numpy as np
+
+# orjson为可选依赖，用于加速索引文件的读写，未安装时使用标准库json
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# numba为可选依赖，用于JIT编译BM25打分循环
+try:
+    import numba
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
 # 设置日志
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# pickle协议2及以上的首字节，用于识别旧版索引文件
+PICKLE_MAGIC = b'\x80'
+
 # 不使用外部分词库，使用内置分词
 HAS_JIEBA = False
 HAS_NLTK = False
@@ -30,11 +51,41 @@ NLTK_AVAILABLE = False
 logger.info("BM25检索器使用内置分词功能")
 
 
+def _accumulate_scores(indptr, doc_ids, weights, term_ids, scores):
+    """
+    按倒排表累加查询词对各文档的BM25分数
+
+    weights 为建索引时预先算好的每个(词, 文档)的BM25贡献，查询时只需按倒排表累加
+    """
+    for i in range(term_ids.shape[0]):
+        term_id = term_ids[i]
+        for j in range(indptr[term_id], indptr[term_id + 1]):
+            scores[doc_ids[j]] += weights[j]
+    return scores
+
+
+def _accumulate_scores_numpy(indptr, doc_ids, weights, term_ids, scores):
+    """_accumulate_scores 的NumPy实现：每个查询词一次向量化的 gather + add"""
+    for term_id in term_ids:
+        start, end = indptr[term_id], indptr[term_id + 1]
+        # 同一个词的倒排表中文档ID不重复，可直接用花式索引累加
+        scores[doc_ids[start:end]] += weights[start:end]
+    return scores
+
+
+if HAS_NUMBA:
+    _accumulate_scores_jit = numba.njit(cache=True, fastmath=True)(_accumulate_scores)
+    logger.info("检测到numba，BM25打分将使用JIT编译")
+else:
+    _accumulate_scores_jit = None
+
+
 class BM25Retriever:
     """BM25检索器实现"""
     
     def __init__(self, k1: float = 1.2, b: float = 0.75, epsilon: float = 0.25, 
-                 language: str = 'auto', stop_words: Optional[List[str]] = None):
+                 language: str = 'auto', stop_words: Optional[List[str]] = None,
+                 use_numba: bool = True):
         """
         初始化BM25检索器
         
@@ -44,6 +95,7 @@ class BM25Retriever:
             epsilon: IDF下限，防止IDF过小
             language: 分词语言 ('zh', 'en', 'auto')
             stop_words: 自定义停用词列表
+            use_numba: numba可用时是否使用JIT编译的打分循环
         """
         self.k1 = k1
         self.b = b
@@ -63,6 +115,18 @@ class BM25Retriever:
         self.avg_doc_length = 0.0  # 平均文档长度
         self.idf = {}  # 逆文档频率
         
+        # 倒排表（CSR格式）：词表、每个词的倒排区间、文档ID和词频
+        self._vocab = {}
+        self._postings_indptr = np.zeros(1, dtype=np.int32)
+        self._postings_doc_ids = np.zeros(0, dtype=np.int32)
+        self._postings_tf = np.zeros(0, dtype=np.int16)
+        self._postings_weight = np.zeros(0, dtype=np.float32)
+        self.doc_len_norm = np.zeros(0, dtype=np.float32)
+        
+        self.use_numba = use_numba
+        self._score_kernel = _accumulate_scores_numpy
+        self.activate_numba_scorer()
+        
         logger.info(f"初始化BM25检索器，参数: k1={k1}, b={b}, language={language}")
     
     def _init_stop_words(self):
@@ -175,9 +239,91 @@ class BM25Retriever:
         
         logger.info(f"计算IDF完成，词汇表大小: {len(self.idf)}")
     
+    @staticmethod
+    def get_tokens_cache_path(index_path: Union[str, Path]) -> Path:
+        """获取与BM25索引文件配套的分词缓存文件路径"""
+        return Path(index_path).with_suffix(".tokens.npz")
+    
+    def _tokens_digest(self, texts: List[str]) -> bytes:
+        """分词结果的校验摘要，文本、语言或停用词变化时缓存失效"""
+        h = hashlib.blake2b(digest_size=16)
+        h.update(self.language.encode("utf-8"))
+        h.update("\x1f".join(sorted(self.stop_words)).encode("utf-8"))
+        for text in texts:
+            h.update(b"\x1e")
+            h.update(text.encode("utf-8"))
+        return h.digest()
+    
+    def _load_tokens_cache(self, cache_path: Path, digest: bytes) -> Optional[List[List[str]]]:
+        """读取分词缓存，文件不存在、损坏或摘要不一致时返回None"""
+        if not cache_path.exists():
+            return None
+        
+        try:
+            with np.load(cache_path, allow_pickle=False) as data:
+                if data["digest"].tobytes() != digest:
+                    return None
+                vocab = data["vocab"].tolist()
+                ids = data["ids"].tolist()
+                offsets = data["offsets"].tolist()
+        except Exception as e:
+            logger.warning(f"读取分词缓存失败，重新分词: {str(e)}")
+            return None
+        
+        return [[vocab[i] for i in ids[start:end]] for start, end in zip(offsets[:-1], offsets[1:])]
+    
+    def _save_tokens_cache(self, cache_path: Path, digest: bytes, corpus: List[List[str]]) -> None:
+        """把分词结果保存为 词表 + 扁平词ID + 偏移量 的npz文件"""
+        vocab = {}
+        ids = [vocab.setdefault(token, len(vocab)) for tokens in corpus for token in tokens]
+        offsets = np.zeros(len(corpus) + 1, dtype=np.int32)
+        np.cumsum([len(tokens) for tokens in corpus], out=offsets[1:])
+        
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            np.savez_compressed(
+                cache_path,
+                digest=np.frombuffer(digest, dtype=np.uint8),
+                vocab=np.array(list(vocab), dtype=str),
+                ids=np.asarray(ids, dtype=np.int32),
+                offsets=offsets
+            )
+        except Exception as e:
+            logger.warning(f"保存分词缓存失败: {str(e)}")
+    
+    def tokenize_texts(self, texts: List[str],
+                       cache_path: Optional[Union[str, Path]] = None) -> List[List[str]]:
+        """
+        批量分词
+        
+        给定 cache_path 时先尝试复用已保存的分词结果，未命中则分词后写入缓存，
+        同一视频重建索引时可跳过分词
+        
+        Args:
+            texts: 文本列表
+            cache_path: 分词缓存文件路径
+            
+        Returns:
+            List[List[str]]: 与texts一一对应的分词结果
+        """
+        if cache_path is None:
+            return [self._tokenize(text) for text in texts]
+        
+        cache_path = Path(cache_path)
+        digest = self._tokens_digest(texts)
+        corpus = self._load_tokens_cache(cache_path, digest)
+        if corpus is not None:
+            logger.info(f"复用分词缓存: {cache_path}")
+            return corpus
+        
+        corpus = [self._tokenize(text) for text in texts]
+        self._save_tokens_cache(cache_path, digest, corpus)
+        return corpus
+    
     def add_documents(self, documents: List[Dict], 
                      text_field: str = "text",
-                     metadata_fields: Optional[List[str]] = None) -> None:
+                     metadata_fields: Optional[List[str]] = None,
+                     tokens_cache_path: Optional[Union[str, Path]] = None) -> None:
         """
         添加文档并构建索引
         
@@ -185,6 +331,7 @@ class BM25Retriever:
             documents: 文档列表，每个文档是字典格式
             text_field: 文本字段名
             metadata_fields: 要保留的元数据字段列表
+            tokens_cache_path: 分词缓存文件路径，为None时不使用缓存
         """
         try:
             if not documents:
@@ -193,15 +340,16 @@ class BM25Retriever:
             
             logger.info(f"开始添加 {len(documents)} 个文档到BM25索引")
             
-            # 处理每个文档
+            # 提取文本并分词
+            texts = []
             for doc in documents:
                 if text_field not in doc:
                     raise ValueError(f"文档中缺少文本字段: {text_field}")
-                
-                # 提取文本并分词
-                text = doc[text_field]
-                tokens = self._tokenize(text)
-                
+                texts.append(doc[text_field])
+            corpus = self.tokenize_texts(texts, tokens_cache_path)
+            
+            # 处理每个文档
+            for doc, tokens in zip(documents, corpus):
                 # 存储文档和元数据
                 self.documents.append(doc)
                 self.corpus.append(tokens)
@@ -226,6 +374,9 @@ class BM25Retriever:
             # 计算IDF
             self._calculate_idf()
             
+            # 构建倒排表
+            self._build_postings()
+            
             logger.info(f"BM25索引构建完成，文档数: {len(self.documents)}, "
                        f"平均文档长度: {self.avg_doc_length:.2f}")
             
@@ -233,41 +384,96 @@ class BM25Retriever:
             logger.error(f"添加文档失败: {str(e)}")
             raise RuntimeError(f"添加文档失败: {str(e)}")
     
-    def _calculate_bm25_score(self, query_tokens: List[str], doc_idx: int) -> float:
+    def activate_numba_scorer(self) -> bool:
         """
-        计算文档对查询的BM25分数
+        启用numba JIT打分，numba不可用或被禁用时使用NumPy实现
         
-        Args:
-            query_tokens: 查询分词结果
-            doc_idx: 文档索引
-            
         Returns:
-            float: BM25分数
+            bool: 是否启用了JIT打分
         """
-        doc_tokens = self.corpus[doc_idx]
-        doc_length = self.doc_lengths[doc_idx]
+        if self.use_numba and HAS_NUMBA:
+            self._score_kernel = _accumulate_scores_jit
+            return True
         
-        # 计算归一化因子
-        normalization_factor = self.k1 * (1 - self.b + self.b * doc_length / self.avg_doc_length)
+        self._score_kernel = _accumulate_scores_numpy
+        return False
+    
+    def _build_postings(self) -> None:
+        """
+        根据分词后的语料构建CSR格式的倒排表，并预计算每个(词, 文档)的BM25贡献
         
-        score = 0.0
+        idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * doc_len / avgdl)) 只依赖索引本身，
+        在建索引时算好后，查询时的打分退化为按倒排表的稀疏累加
+        """
+        # 按文档顺序收集 (词ID, 文档ID, 词频) 三元组
+        self._vocab = {}
+        term_ids = []
+        doc_ids = []
+        tfs = []
+        for doc_idx, tokens in enumerate(self.corpus):
+            for token, tf in Counter(tokens).items():
+                term_ids.append(self._vocab.setdefault(token, len(self._vocab)))
+                doc_ids.append(doc_idx)
+                tfs.append(tf)
         
-        # 计算每个查询词的BM25贡献
-        for token in query_tokens:
-            if token not in self.idf:
-                continue
-            
-            # 词频
-            tf = doc_tokens.count(token)
-            if tf == 0:
-                continue
+        term_ids = np.asarray(term_ids, dtype=np.int32)
+        
+        # 按词ID稳定排序后一次性写入CSR数组：文档ID本就递增，
+        # 排序后每个词的倒排表连续存放且按文档ID递增，打分时顺序访问内存
+        order = np.argsort(term_ids, kind='stable')
+        counts = np.bincount(term_ids, minlength=len(self._vocab))
+        indptr = np.zeros(len(self._vocab) + 1, dtype=np.int32)
+        np.cumsum(counts, out=indptr[1:])
+        
+        self._postings_indptr = indptr
+        self._postings_doc_ids = np.asarray(doc_ids, dtype=np.int32)[order]
+        # 片段级文档的词频远小于int16上限，超出时截断（BM25在高词频处已饱和）
+        self._postings_tf = np.minimum(np.asarray(tfs, dtype=np.int64)[order], np.iinfo(np.int16).max).astype(np.int16)
+        
+        # 文档长度归一化项 k1 * (1 - b + b * doc_len / avgdl)
+        doc_lengths = np.asarray(self.doc_lengths, dtype=np.float32)
+        avg_doc_length = self.avg_doc_length if self.avg_doc_length > 0 else 1.0
+        self.doc_len_norm = (self.k1 * (1 - self.b + self.b * doc_lengths / avg_doc_length)).astype(np.float32)
+        
+        # 每个词的IDF按倒排区间展开到每条倒排记录上
+        idf = np.asarray([self.idf.get(token, 0.0) for token in self._vocab], dtype=np.float32)
+        posting_idf = np.repeat(idf, np.diff(self._postings_indptr))
+        
+        tf = self._postings_tf.astype(np.float32)
+        self._postings_weight = (
+            posting_idf * tf * (self.k1 + 1) / (tf + self.doc_len_norm[self._postings_doc_ids])
+        ).astype(np.float32)
+    
+    def _score_all(self, query_tokens: List[str]) -> np.ndarray:
+        """
+        计算所有文档对查询的BM25分数
+        
+        Args:
+            query_tokens: 查询分词结果
             
-            # BM25公式
-            idf = self.idf[token]
-            tf_component = (tf * (self.k1 + 1)) / (tf + normalization_factor)
-            score += idf * tf_component
+        Returns:
+            np.ndarray: 每个文档的BM25分数
+        """
+        scores = np.zeros(len(self.documents), dtype=np.float64)
         
-        return score
+        # 重复出现的查询词按出现次数分别计分
+        term_ids = [self._vocab[token] for token in query_tokens if token in self._vocab]
+        if not term_ids:
+            return scores
+        
+        # 查询词按词ID排序，依次访问的倒排区间在内存中单调递增
+        args = (self._postings_indptr, self._postings_doc_ids, self._postings_weight,
+                np.sort(np.asarray(term_ids, dtype=np.int32)), scores)
+        try:
+            return self._score_kernel(*args)
+        except Exception as e:
+            if self._score_kernel is _accumulate_scores_numpy:
+                raise
+            # JIT编译或缓存加载失败时回退到NumPy实现
+            logger.warning(f"numba打分失败，回退到NumPy实现: {str(e)}")
+            self._score_kernel = _accumulate_scores_numpy
+            scores[:] = 0.0
+            return self._score_kernel(*args)
     
     def search(self, query: str,
              top_k: int = 5,
@@ -308,18 +514,21 @@ class BM25Retriever:
             logger.info(f"执行BM25检索，查询: '{query}', 分词: {query_tokens}")
             
             # 计算所有文档的分数
-            scores = []
-            for doc_idx in range(len(self.documents)):
-                score = self._calculate_bm25_score(query_tokens, doc_idx)
-                if score > threshold:
-                    scores.append((doc_idx, score))
+            all_scores = self._score_all(query_tokens)
+            candidates = np.flatnonzero(all_scores > threshold)
             
-            # 按分数排序
-            scores.sort(key=lambda x: x[1], reverse=True)
+            # 候选多于top_k时先用argpartition选出前k个，按文档顺序排列后再稳定排序，同分时保持文档顺序
+            candidate_scores = all_scores[candidates]
+            if 0 < top_k < len(candidates):
+                top = np.sort(np.argpartition(-candidate_scores, top_k - 1)[:top_k])
+                order = top[np.argsort(-candidate_scores[top], kind='stable')]
+            else:
+                order = np.argsort(-candidate_scores, kind='stable')[:max(top_k, 0)]
+            scores = [(int(candidates[i]), float(candidate_scores[i])) for i in order]
             
             # 构建结果
             results = []
-            for doc_idx, score in scores[:top_k]:
+            for doc_idx, score in scores:
                 result = {
                     "document": self.documents[doc_idx],
                     "metadata": self.metadata[doc_idx] if doc_idx < len(self.metadata) else {},
@@ -363,9 +572,13 @@ class BM25Retriever:
                 "stop_words": list(self.stop_words)
             }
             
-            # 保存到文件
-            with open(save_path, 'wb') as f:
-                pickle.dump(index_data, f)
+            # 索引内容都是字符串、数字和列表，用JSON保存（安装了orjson时读写更快），
+            # 不再依赖pickle，其他语言也能直接读取
+            if HAS_ORJSON:
+                save_path.write_bytes(orjson.dumps(index_data))
+            else:
+                with open(save_path, 'w', encoding='utf-8') as f:
+                    json.dump(index_data, f, ensure_ascii=False, separators=(',', ':'))
             
             logger.info(f"BM25索引已保存到: {save_path}")
             
@@ -386,9 +599,14 @@ class BM25Retriever:
             if not load_path.exists():
                 raise FileNotFoundError(f"BM25索引文件不存在: {load_path}")
             
-            # 加载数据
-            with open(load_path, 'rb') as f:
-                index_data = pickle.load(f)
+            # 加载数据，兼容旧版pickle格式的索引文件
+            raw = load_path.read_bytes()
+            if raw[:1] == PICKLE_MAGIC:
+                index_data = pickle.loads(raw)
+            elif HAS_ORJSON:
+                index_data = orjson.loads(raw)
+            else:
+                index_data = json.loads(raw.decode('utf-8'))
             
             # 恢复状态
             self.documents = index_data["documents"]
@@ -403,6 +621,7 @@ class BM25Retriever:
             self.epsilon = index_data["epsilon"]
             self.language = index_data["language"]
             self.stop_words = set(index_data["stop_words"])
+            self._build_postings()
             
             logger.info(f"BM25索引已从 {load_path} 加载，包含 {len(self.documents)} 个文档")
             
@@ -430,7 +649,8 @@ class BM25Retriever:
             },
             "stop_words_count": len(self.stop_words),
             "has_jieba": HAS_JIEBA,
-            "has_nltk": HAS_NLTK
+            "has_nltk": HAS_NLTK,
+            "numba_enabled": self._score_kernel is _accumulate_scores_jit
         }
         
         return stats
@@ -444,5 +664,6 @@ class BM25Retriever:
         self.doc_lengths = []
         self.avg_doc_length = 0.0
         self.idf = {}
+        self._build_postings()
         
         logger.info("BM25索引已清空")
\ No newline at end of file
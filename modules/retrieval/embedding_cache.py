@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文本向量缓存模块
+
+职责：
+- 以 (模型名, 规范化文本) 的哈希为键缓存句向量
+- 内存LRU + SQLite持久化，重启后仍可命中
+- 配置了Redis时作为多进程/多机共享的中间层（可选）
+- 向量以float16存储，减半磁盘与内存占用
+
+环境变量：
+- EMBED_CACHE_SIZE: 内存LRU中最多保留的向量数量
+- EMBED_CACHE_REDIS_URL: Redis地址，未设置时不使用Redis
+- EMBED_CACHE_TTL: Redis中缓存的过期秒数
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+
+try:
+    import redis
+    HAS_REDIS = True
+except ImportError:
+    HAS_REDIS = False
+
+logger = logging.getLogger(__name__)
+
+# 内存LRU默认容量
+DEFAULT_MEMORY_ITEMS = int(os.environ.get("EMBED_CACHE_SIZE", 50000))
+
+# Redis中缓存的默认过期时间（30天）
+DEFAULT_REDIS_TTL = int(os.environ.get("EMBED_CACHE_TTL", 30 * 24 * 3600))
+
+
+def _connect_redis(url: Optional[str]):
+    """连接Redis，未配置、未安装或连接失败时返回None"""
+    if not url:
+        return None
+    if not HAS_REDIS:
+        logger.warning("已配置EMBED_CACHE_REDIS_URL但未安装redis，跳过Redis缓存")
+        return None
+    try:
+        client = redis.Redis.from_url(url)
+        client.ping()
+        logger.info(f"向量缓存已连接Redis: {url}")
+        return client
+    except Exception as e:
+        logger.warning(f"连接Redis失败，跳过Redis缓存: {str(e)}")
+        return None
+
+
+class EmbeddingCache:
+    """句向量缓存"""
+
+    def __init__(self, db_path: Union[str, Path], max_memory_items: int = DEFAULT_MEMORY_ITEMS,
+                 redis_url: Optional[str] = None, redis_ttl: int = DEFAULT_REDIS_TTL):
+        """
+        初始化向量缓存
+
+        Args:
+            db_path: SQLite缓存文件路径
+            max_memory_items: 内存LRU中最多保留的向量数量
+            redis_url: Redis地址，默认读取 EMBED_CACHE_REDIS_URL，为空时不使用Redis
+            redis_ttl: Redis中缓存的过期秒数
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_memory_items = max_memory_items
+
+        self._memory: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, dim INTEGER, vec BLOB)"
+        )
+        self._conn.commit()
+
+        if redis_url is None:
+            redis_url = os.environ.get("EMBED_CACHE_REDIS_URL")
+        self._redis = _connect_redis(redis_url)
+        self.redis_ttl = redis_ttl
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(model_name: str, text: str) -> bytes:
+        """根据模型名和规范化后的文本生成缓存键"""
+        normalized = " ".join(text.split())
+        return hashlib.blake2b(f"{model_name}|{normalized}".encode("utf-8"), digest_size=16).digest()
+
+    def get_many(self, keys: List[bytes]) -> Dict[bytes, np.ndarray]:
+        """
+        批量查询缓存
+
+        Args:
+            keys: 缓存键列表
+
+        Returns:
+            Dict[bytes, np.ndarray]: 命中的键到float32向量的映射
+        """
+        found = {}
+        with self._lock:
+            missing = []
+            for key in keys:
+                vec = self._memory.get(key)
+                if vec is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = vec
+                else:
+                    missing.append(key)
+
+            if missing and self._redis is not None:
+                missing = self._get_from_redis(missing, found)
+
+            # SQLite单条语句的参数个数有限，分批查询
+            for start in range(0, len(missing), 500):
+                chunk = missing[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, dim, vec FROM embeddings WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                for key, dim, blob in rows:
+                    vec = np.frombuffer(blob, dtype=np.float16).reshape(dim).astype(np.float32)
+                    found[key] = vec
+                    self._remember(key, vec)
+
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def set_many(self, keys: List[bytes], vectors: np.ndarray) -> None:
+        """
+        批量写入缓存
+
+        Args:
+            keys: 缓存键列表
+            vectors: 与keys一一对应的向量矩阵
+        """
+        if not keys:
+            return
+
+        rows = []
+        with self._lock:
+            for key, vec in zip(keys, vectors):
+                vec16 = np.asarray(vec, dtype=np.float16)
+                rows.append((key, int(vec16.shape[0]), vec16.tobytes()))
+                self._remember(key, vec16.astype(np.float32))
+
+            if self._redis is not None:
+                self._set_to_redis(rows)
+
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, dim, vec) VALUES (?, ?, ?)", rows
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"写入向量缓存失败: {str(e)}")
+
+    @staticmethod
+    def _redis_key(key: bytes) -> str:
+        """Redis中的键名"""
+        return f"emb:{key.hex()}"
+
+    def _get_from_redis(self, keys: List[bytes], found: Dict[bytes, np.ndarray]) -> List[bytes]:
+        """
+        从Redis批量查询（调用方需持有锁），命中的向量写入found和内存LRU
+
+        Returns:
+            List[bytes]: Redis中仍未命中的键
+        """
+        try:
+            blobs = self._redis.mget([self._redis_key(key) for key in keys])
+        except Exception as e:
+            logger.warning(f"读取Redis向量缓存失败: {str(e)}")
+            return keys
+
+        missing = []
+        for key, blob in zip(keys, blobs):
+            if blob is None:
+                missing.append(key)
+                continue
+            vec = np.frombuffer(blob, dtype=np.float16).astype(np.float32)
+            found[key] = vec
+            self._remember(key, vec)
+        return missing
+
+    def _set_to_redis(self, rows: List[tuple]) -> None:
+        """把 (键, 维度, float16字节) 批量写入Redis并设置过期时间（调用方需持有锁）"""
+        try:
+            pipe = self._redis.pipeline(transaction=False)
+            for key, _, blob in rows:
+                pipe.set(self._redis_key(key), blob, ex=self.redis_ttl)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"写入Redis向量缓存失败: {str(e)}")
+
+    def _remember(self, key: bytes, vec: np.ndarray) -> None:
+        """放入内存LRU（调用方需持有锁）"""
+        self._memory[key] = vec
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def get_stats(self) -> Dict:
+        """获取缓存统计信息"""
+        return {
+            "db_path": str(self.db_path),
+            "memory_items": len(self._memory),
+            "max_memory_items": self.max_memory_items,
+            "redis_enabled": self._redis is not None,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
+_shared_caches: Dict[str, EmbeddingCache] = {}
+_shared_lock = threading.Lock()
+
+
+def get_embedding_cache(db_path: Optional[Union[str, Path]] = None) -> EmbeddingCache:
+    """
+    获取共享的向量缓存实例（同一路径只打开一次）
+
+    Args:
+        db_path: 缓存文件路径，默认为 data/vectors/embed_cache.sqlite
+
+    Returns:
+        EmbeddingCache: 向量缓存实例
+    """
+    if db_path is None:
+        project_root = Path(__file__).parent.parent.parent
+        db_path = project_root / "data" / "vectors" / "embed_cache.sqlite"
+
+    key = str(Path(db_path).resolve())
+    with _shared_lock:
+        if key not in _shared_caches:
+            _shared_caches[key] = EmbeddingCache(db_path)
+        return _shared_caches[key]
@@ -9,7 +9,9 @@
 - 提供统一的检索接口
 """
 
+import pickle
 import logging
+from pathlib import Path
 from typing import List, Dict, Optional, Union, Tuple
 import numpy as np
 
@@ -78,11 +80,25 @@ class HybridRetriever:
             logger.error(f"添加文档失败: {str(e)}")
             raise RuntimeError(f"添加文档失败: {str(e)}")
     
+    def attach(self, vector_store: VectorStore, bm25_retriever: BM25Retriever) -> None:
+        """
+        直接接管已经构建好的向量存储和BM25检索器，避免重复添加文档
+        
+        Args:
+            vector_store: 已添加文档的向量存储实例
+            bm25_retriever: 已添加文档的BM25检索器实例
+        """
+        self.vector_store = vector_store
+        self.bm25_retriever = bm25_retriever
+        logger.info(f"混合检索器已接管现有索引，向量文档数: {len(vector_store.documents)}, "
+                   f"BM25文档数: {len(bm25_retriever.documents)}")
+    
     def search(self, query: str,
              top_k: int = 5,
              threshold: float = 0.0,
              vector_top_k: Optional[int] = None,
-             bm25_top_k: Optional[int] = None) -> List[Dict]:
+             bm25_top_k: Optional[int] = None,
+             query_embedding: Optional[np.ndarray] = None) -> List[Dict]:
         """
         混合检索（结合向量检索和BM25检索）
         
@@ -92,6 +108,7 @@ class HybridRetriever:
             threshold: 相关性阈值 (0.0-1.0)，低于此值的文档将被过滤
             vector_top_k: 向量检索返回的文档数量(默认为top_k*2)
             bm25_top_k: BM25检索返回的文档数量(默认为top_k*2)
+            query_embedding: 预先编码好的查询向量，传给向量检索
             
         Returns:
             List[Dict]: 融合后的相关文档列表，每个字典包含：
@@ -125,7 +142,8 @@ class HybridRetriever:
             logger.info(f"执行混合检索，查询: '{query}', top_k: {top_k}")
             
             # 执行向量检索
-            vector_results = self.vector_store.search(query, top_k=vector_top_k, threshold=0.0)
+            vector_results = self.vector_store.search(query, top_k=vector_top_k, threshold=0.0,
+                                                      query_embedding=query_embedding)
             
             # 执行BM25检索
             bm25_results = self.bm25_retriever.search(query, top_k=bm25_top_k, threshold=0.0)
@@ -134,9 +152,9 @@ class HybridRetriever:
             
             # 融合结果
             if self.fusion_method == "weighted_average":
-                fused_results = self._weighted_average_fusion(vector_results, bm25_results)
+                fused_results = self._weighted_average_fusion(vector_results, bm25_results, top_k=top_k)
             elif self.fusion_method == "rrf":
-                fused_results = self._rrf_fusion(vector_results, bm25_results)
+                fused_results = self._rrf_fusion(vector_results, bm25_results, top_k=top_k)
             elif self.fusion_method == "condorcet":
                 fused_results = self._condorcet_fusion(vector_results, bm25_results)
             else:
@@ -158,74 +176,109 @@ class HybridRetriever:
             logger.error(f"混合检索失败: {str(e)}")
             raise RuntimeError(f"混合检索失败: {str(e)}")
     
+    @staticmethod
+    def _align_candidates(vector_results: List[Dict],
+                          bm25_results: List[Dict]) -> Tuple[List[int], np.ndarray, np.ndarray]:
+        """
+        将两路检索结果对齐到同一候选集合
+        
+        Args:
+            vector_results: 向量检索结果
+            bm25_results: BM25检索结果
+            
+        Returns:
+            Tuple[List[int], np.ndarray, np.ndarray]: (候选文档索引, 向量结果在候选中的位置, BM25结果在候选中的位置)
+        """
+        candidates = list(dict.fromkeys(
+            [result["index"] for result in vector_results] + [result["index"] for result in bm25_results]
+        ))
+        position = {idx: pos for pos, idx in enumerate(candidates)}
+        vector_pos = np.fromiter((position[result["index"]] for result in vector_results),
+                                 dtype=np.intp, count=len(vector_results))
+        bm25_pos = np.fromiter((position[result["index"]] for result in bm25_results),
+                               dtype=np.intp, count=len(bm25_results))
+        return candidates, vector_pos, bm25_pos
+    
+    @staticmethod
+    def _top_positions(scores: np.ndarray, top_k: Optional[int] = None) -> np.ndarray:
+        """
+        按分数降序返回位置，指定top_k时先用argpartition选出前k个再排序
+        
+        Args:
+            scores: 分数数组
+            top_k: 返回数量，None表示全部
+            
+        Returns:
+            np.ndarray: 排序后的位置
+        """
+        if top_k is not None and 0 < top_k < len(scores):
+            top = np.argpartition(-scores, top_k - 1)[:top_k]
+            return top[np.argsort(-scores[top], kind='stable')]
+        return np.argsort(-scores, kind='stable')
+    
+    @staticmethod
+    def _base_result(idx: int, vector_map: Dict[int, Dict], bm25_map: Dict[int, Dict]) -> Dict:
+        """以向量检索结果为基础(包含更多元数据)复制一份结果，并把常用字段提取到顶层"""
+        result = (vector_map[idx] if idx in vector_map else bm25_map[idx]).copy()
+        
+        # 提取常用字段到顶层，方便直接访问
+        if "document" in result:
+            for key in ["text", "id", "start", "end", "confidence"]:
+                if key in result["document"]:
+                    result[key] = result["document"][key]
+        
+        return result
+    
     def _weighted_average_fusion(self, vector_results: List[Dict], 
-                                bm25_results: List[Dict]) -> List[Dict]:
+                                bm25_results: List[Dict],
+                                top_k: Optional[int] = None) -> List[Dict]:
         """
         加权平均融合
         
+        两路分数按候选集合对齐为float32数组后一次性加权求和
+        
         Args:
             vector_results: 向量检索结果
             bm25_results: BM25检索结果
+            top_k: 只返回分数最高的top_k个结果，None表示全部
             
         Returns:
             List[Dict]: 融合后的结果
         """
-        # 创建文档ID到结果的映射
+        candidates, vector_pos, bm25_pos = self._align_candidates(vector_results, bm25_results)
+        
+        vector_scores = np.zeros(len(candidates), dtype=np.float32)
+        np.put(vector_scores, vector_pos, [result["similarity"] for result in vector_results])
+        
+        # BM25分数可能很大，按最大值归一化
+        bm25_scores = np.zeros(len(candidates), dtype=np.float32)
+        raw_bm25 = np.asarray([result["score"] for result in bm25_results], dtype=np.float32)
+        if raw_bm25.size and raw_bm25.max() > 0:
+            raw_bm25 = raw_bm25 / raw_bm25.max()
+        np.put(bm25_scores, bm25_pos, raw_bm25)
+        
+        # 计算加权平均分数
+        fused_scores = self.vector_weight * vector_scores + self.bm25_weight * bm25_scores
+        
         vector_map = {result["index"]: result for result in vector_results}
         bm25_map = {result["index"]: result for result in bm25_results}
         
-        # 获取所有文档索引
-        all_indices = set(vector_map.keys()).union(set(bm25_map.keys()))
-        
         fused_results = []
-        
-        for idx in all_indices:
-            vector_score = 0.0
-            bm25_score = 0.0
-            
-            # 获取向量分数并进行归一化
-            if idx in vector_map:
-                vector_score = vector_map[idx]["similarity"]
-            
-            # 获取BM25分数并进行归一化
-            if idx in bm25_map:
-                bm25_score = bm25_map[idx]["score"]
-                # BM25分数可能很大，需要进行归一化
-                max_bm25_score = max(result["score"] for result in bm25_results) if bm25_results else 1.0
-                if max_bm25_score > 0:
-                    bm25_score = bm25_score / max_bm25_score
-            
-            # 计算加权平均分数
-            fused_score = (self.vector_weight * vector_score + 
-                          self.bm25_weight * bm25_score)
-            
-            # 使用向量检索的结果作为基础(包含更多元数据)
-            if idx in vector_map:
-                result = vector_map[idx].copy()
-            else:
-                result = bm25_map[idx].copy()
+        for pos in self._top_positions(fused_scores, top_k):
+            result = self._base_result(candidates[pos], vector_map, bm25_map)
             
             # 更新分数，保持原有的similarity字段不变
-            result["score"] = fused_score
-            result["vector_score"] = vector_score
-            result["bm25_score"] = bm25_score
-            
-            # 提取常用字段到顶层，方便直接访问
-            if "document" in result:
-                for key in ["text", "id", "start", "end", "confidence"]:
-                    if key in result["document"]:
-                        result[key] = result["document"][key]
-            
+            result["score"] = float(fused_scores[pos])
+            result["vector_score"] = float(vector_scores[pos])
+            result["bm25_score"] = float(bm25_scores[pos])
             fused_results.append(result)
         
-        # 按分数排序
-        fused_results.sort(key=lambda x: x["score"], reverse=True)
-        
         return fused_results
     
     def _rrf_fusion(self, vector_results: List[Dict], 
                    bm25_results: List[Dict], 
-                   k: int = 60) -> List[Dict]:
+                   k: int = 60,
+                   top_k: Optional[int] = None) -> List[Dict]:
         """
         倒排序融合(Reciprocal Rank Fusion)
         
@@ -233,56 +286,40 @@ class HybridRetriever:
             vector_results: 向量检索结果
             bm25_results: BM25检索结果
             k: RRF参数，通常设置为60
+            top_k: 只返回分数最高的top_k个结果，None表示全部
             
         Returns:
             List[Dict]: 融合后的结果
         """
-        # 创建文档ID到排名的映射
-        vector_ranks = {result["index"]: rank + 1 for rank, result in enumerate(vector_results)}
-        bm25_ranks = {result["index"]: rank + 1 for rank, result in enumerate(bm25_results)}
+        candidates, vector_pos, bm25_pos = self._align_candidates(vector_results, bm25_results)
         
-        # 获取所有文档索引
-        all_indices = set(vector_ranks.keys()).union(set(bm25_ranks.keys()))
+        # 排名从1开始，未出现在某一路结果中的文档排名记为该路结果数+1，RRF分数为0
+        vector_ranks = np.full(len(candidates), len(vector_results) + 1, dtype=np.int32)
+        np.put(vector_ranks, vector_pos, np.arange(1, len(vector_results) + 1))
+        bm25_ranks = np.full(len(candidates), len(bm25_results) + 1, dtype=np.int32)
+        np.put(bm25_ranks, bm25_pos, np.arange(1, len(bm25_results) + 1))
         
-        fused_results = []
+        vector_rrf = np.zeros(len(candidates), dtype=np.float32)
+        np.put(vector_rrf, vector_pos, 1.0 / (k + np.arange(1, len(vector_results) + 1)))
+        bm25_rrf = np.zeros(len(candidates), dtype=np.float32)
+        np.put(bm25_rrf, bm25_pos, 1.0 / (k + np.arange(1, len(bm25_results) + 1)))
         
-        for idx in all_indices:
-            # 计算RRF分数
-            vector_rrf = 0.0
-            bm25_rrf = 0.0
-            
-            if idx in vector_ranks:
-                vector_rrf = 1.0 / (k + vector_ranks[idx])
-            
-            if idx in bm25_ranks:
-                bm25_rrf = 1.0 / (k + bm25_ranks[idx])
-            
-            # 加权融合
-            fused_score = self.vector_weight * vector_rrf + self.bm25_weight * bm25_rrf
-            
-            # 使用向量检索的结果作为基础
-            if idx in {result["index"] for result in vector_results}:
-                result = next(r for r in vector_results if r["index"] == idx)
-            else:
-                result = next(r for r in bm25_results if r["index"] == idx)
+        # 加权融合
+        fused_scores = self.vector_weight * vector_rrf + self.bm25_weight * bm25_rrf
+        
+        vector_map = {result["index"]: result for result in vector_results}
+        bm25_map = {result["index"]: result for result in bm25_results}
+        
+        fused_results = []
+        for pos in self._top_positions(fused_scores, top_k):
+            result = self._base_result(candidates[pos], vector_map, bm25_map)
             
             # 更新分数
-            result = result.copy()
-            result["score"] = fused_score
-            result["vector_rank"] = vector_ranks.get(idx, len(vector_results) + 1)
-            result["bm25_rank"] = bm25_ranks.get(idx, len(bm25_results) + 1)
-            
-            # 提取常用字段到顶层，方便直接访问
-            if "document" in result:
-                for key in ["text", "id", "start", "end", "confidence"]:
-                    if key in result["document"]:
-                        result[key] = result["document"][key]
-            
+            result["score"] = float(fused_scores[pos])
+            result["vector_rank"] = int(vector_ranks[pos])
+            result["bm25_rank"] = int(bm25_ranks[pos])
             fused_results.append(result)
         
-        # 按分数排序
-        fused_results.sort(key=lambda x: x["score"], reverse=True)
-        
         return fused_results
     
     def _condorcet_fusion(self, vector_results: List[Dict], 
@@ -321,24 +358,13 @@ class HybridRetriever:
             win_counts[idx] = win_count
         
         # 构建结果
+        vector_map = {result["index"]: result for result in vector_results}
+        bm25_map = {result["index"]: result for result in bm25_results}
         fused_results = []
         for idx in sorted(all_indices, key=lambda x: win_counts[x], reverse=True):
-            # 使用向量检索的结果作为基础
-            if idx in {result["index"] for result in vector_results}:
-                result = next(r for r in vector_results if r["index"] == idx)
-            else:
-                result = next(r for r in bm25_results if r["index"] == idx)
-            
-            result = result.copy()
+            result = self._base_result(idx, vector_map, bm25_map)
             result["score"] = win_counts[idx] / len(all_indices)  # 归一化分数
             result["condorcet_wins"] = win_counts[idx]
-            
-            # 提取常用字段到顶层，方便直接访问
-            if "document" in result:
-                for key in ["text", "id", "start", "end", "confidence"]:
-                    if key in result["document"]:
-                        result[key] = result["document"][key]
-            
             fused_results.append(result)
         
         return fused_results
@@ -399,4 +425,79 @@ class HybridRetriever:
             logger.info("混合检索器索引已加载")
         except Exception as e:
             logger.error(f"加载索引失败: {str(e)}")
-            raise RuntimeError(f"加载索引失败: {str(e)}")
\ No newline at end of file
+            raise RuntimeError(f"加载索引失败: {str(e)}")
+    
+    def get_index_metadata(self, vector_index_path: Union[str, Path],
+                           bm25_index_path: Union[str, Path]) -> Dict:
+        """
+        生成混合索引元数据
+        
+        混合检索器本身不持有文档，元数据只引用两个子索引文件并记录融合参数
+        
+        Args:
+            vector_index_path: 向量索引文件路径
+            bm25_index_path: BM25索引文件路径
+            
+        Returns:
+            Dict: 混合索引元数据
+        """
+        return {
+            "vector_index_file": Path(vector_index_path).name,
+            "bm25_index_file": Path(bm25_index_path).name,
+            "vector_weight": self.vector_weight,
+            "bm25_weight": self.bm25_weight,
+            "fusion_method": self.fusion_method
+        }
+    
+    def save_index_metadata(self, save_path: Union[str, Path],
+                            vector_index_path: Union[str, Path],
+                            bm25_index_path: Union[str, Path],
+                            **extra) -> None:
+        """
+        保存混合索引元数据（子索引需与元数据文件位于同一目录）
+        
+        Args:
+            save_path: 元数据保存路径
+            vector_index_path: 向量索引文件路径
+            bm25_index_path: BM25索引文件路径
+            **extra: 额外记录的字段（如video_id、user_id）
+        """
+        try:
+            index_data = self.get_index_metadata(vector_index_path, bm25_index_path)
+            index_data.update(extra)
+            with open(save_path, 'wb') as f:
+                pickle.dump(index_data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            logger.info(f"混合索引元数据已保存到: {save_path}")
+        except Exception as e:
+            logger.error(f"保存混合索引元数据失败: {str(e)}")
+            raise RuntimeError(f"保存混合索引元数据失败: {str(e)}")
+    
+    def load_from_metadata(self, load_path: Union[str, Path]) -> Dict:
+        """
+        根据混合索引元数据恢复融合参数并加载引用的两个子索引
+        
+        Args:
+            load_path: 元数据文件路径
+            
+        Returns:
+            Dict: 元数据内容
+        """
+        try:
+            load_path = Path(load_path)
+            with open(load_path, 'rb') as f:
+                index_data = pickle.load(f)
+            
+            self.vector_weight = index_data.get("vector_weight", self.vector_weight)
+            self.bm25_weight = index_data.get("bm25_weight", self.bm25_weight)
+            self.fusion_method = index_data.get("fusion_method", self.fusion_method)
+            
+            if "vector_index_file" in index_data and "bm25_index_file" in index_data:
+                self.load_indexes(
+                    str(load_path.parent / index_data["vector_index_file"]),
+                    str(load_path.parent / index_data["bm25_index_file"])
+                )
+            
+            return index_data
+        except Exception as e:
+            logger.error(f"加载混合索引元数据失败: {str(e)}")
+            raise RuntimeError(f"加载混合索引元数据失败: {str(e)}")
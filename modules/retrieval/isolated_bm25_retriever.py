@@ -140,6 +140,10 @@ class IsolatedBM25Retriever(BM25Retriever):
         try:
             index_path = self.get_user_bm25_index_path(video_id)
             
+            tokens_cache_path = self.get_tokens_cache_path(index_path)
+            if tokens_cache_path.exists():
+                tokens_cache_path.unlink()
+            
             if index_path.exists():
                 index_path.unlink()
                 logger.info(f"用户 {self.user_id} 的BM25索引已删除: {index_path}")
@@ -105,20 +105,15 @@ class IsolatedHybridRetriever(HybridRetriever):
             # 保存BM25索引
             self.bm25_retriever.save_user_index(video_id)
             
-            # 保存混合索引元数据
+            # 保存混合索引元数据（只引用上面两个索引文件，不重复保存文档）
             hybrid_index_path = self.get_user_hybrid_index_path(video_id)
-            hybrid_index_data = {
-                "video_id": video_id,
-                "user_id": self.user_id,
-                "vector_weight": self.vector_weight,
-                "bm25_weight": self.bm25_weight,
-                "fusion_method": self.fusion_method,
-                "created_at": str(Path().cwd())
-            }
-            
-            import pickle
-            with open(hybrid_index_path, 'wb') as f:
-                pickle.dump(hybrid_index_data, f)
+            self.save_index_metadata(
+                hybrid_index_path,
+                self.vector_store.get_user_vector_index_path(video_id),
+                self.bm25_retriever.get_user_bm25_index_path(video_id),
+                video_id=video_id,
+                user_id=self.user_id
+            )
             
             logger.info(f"用户 {self.user_id} 的混合索引已保存到: {hybrid_index_path}")
             
@@ -141,6 +141,11 @@ class IsolatedVectorStore(VectorStore):
         try:
             index_path = self.get_user_vector_index_path(video_id)
             
+            for sidecar_path in (VectorStore.get_embeddings_path(index_path),
+                                 VectorStore.get_ann_index_path(index_path)):
+                if sidecar_path.exists():
+                    sidecar_path.unlink()
+            
             if index_path.exists():
                 index_path.unlink()
                 logger.info(f"用户 {self.user_id} 的向量索引已删除: {index_path}")
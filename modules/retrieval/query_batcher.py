@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+查询向量微批处理
+
+多个会话同时检索时，每个查询单独调用一次模型编码开销较大；
+这里把短时间窗口内到达的查询合并为一批，只调用一次编码函数，再把结果分发给各调用方
+"""
+
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Callable, List
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 每批最多合并的查询数
+MAX_BATCH = 16
+
+# 第一个查询到达后等待同批其他查询的最长秒数
+MAX_WAIT = 0.02
+
+
+class QueryBatcher:
+    """把并发到达的查询合并后批量编码"""
+
+    def __init__(self, encode_fn: Callable[[List[str]], np.ndarray],
+                 max_batch: int = MAX_BATCH, max_wait: float = MAX_WAIT):
+        """
+        初始化批处理器
+
+        Args:
+            encode_fn: 批量编码函数，输入文本列表，返回与之对应的向量矩阵
+            max_batch: 每批最多合并的查询数
+            max_wait: 第一个查询到达后等待同批其他查询的最长秒数
+        """
+        self.encode_fn = encode_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._worker = None
+        self._worker_lock = threading.Lock()
+
+    def encode(self, text: str) -> np.ndarray:
+        """
+        编码单个查询（阻塞直到所在批次编码完成）
+
+        Args:
+            text: 查询文本
+
+        Returns:
+            np.ndarray: 查询向量
+        """
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((text, future))
+        return future.result()
+
+    def _ensure_worker(self) -> None:
+        """首次使用时启动后台编码线程"""
+        if self._worker is not None:
+            return
+        with self._worker_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="query-batcher", daemon=True)
+                self._worker.start()
+
+    def _run(self) -> None:
+        """后台线程：取出一批查询，编码后逐个设置结果"""
+        while True:
+            batch = [self._queue.get()]
+            try:
+                while len(batch) < self.max_batch:
+                    batch.append(self._queue.get(timeout=self.max_wait))
+            except queue.Empty:
+                pass
+
+            texts = [text for text, _ in batch]
+            try:
+                embeddings = self.encode_fn(texts)
+            except Exception as e:
+                logger.error(f"批量编码查询失败: {str(e)}")
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            if len(batch) > 1:
+                logger.info(f"合并编码 {len(batch)} 个查询")
+            for (_, future), embedding in zip(batch, embeddings):
+                future.set_result(embedding)
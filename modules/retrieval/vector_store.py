@@ -14,12 +14,24 @@ import os
 import json
 import pickle
 import logging
+import threading
+from itertools import islice
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple, Union
+from typing import Iterable, List, Dict, Optional, Tuple, Union
 import numpy as np
 from sentence_transformers import SentenceTransformer
 import torch
 
+from .embedding_cache import EmbeddingCache, get_embedding_cache
+from .query_batcher import QueryBatcher
+
+# hnswlib为可选依赖，向量较多时用HNSW图索引做近似检索
+try:
+    import hnswlib
+    HAS_HNSWLIB = True
+except ImportError:
+    HAS_HNSWLIB = False
+
 # 设置日志
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -36,10 +48,33 @@ class VectorStore:
         "aliyun": "https://mirrors.aliyun.com/hugging-face-models"
     }
     
+    # 在GPU上常驻检索矩阵的上限（fp16字节数），超过则回退到CPU检索
+    GPU_SEARCH_MAX_BYTES = 150 * 1024 * 1024
+    
+    # 支持的向量量化方式
+    QUANTIZATION_TYPES = ("float16", "int8")
+    
+    # 低精度存储时CPU检索每次转换为float32的行数，避免一次性生成完整的float32矩阵
+    SEARCH_BLOCK_ROWS = 8192
+    
+    # add_documents 每次从输入中取出并编码的文档数，长视频不必一次性持有全部文本
+    ADD_CHUNK_SIZE = 1024
+    
+    # 向量数不少于该值时在CPU上使用HNSW近似检索，较小的索引直接暴力检索更快且结果精确
+    ANN_MIN_SIZE = 5000
+    
+    # HNSW参数
+    HNSW_M = 32
+    HNSW_EF_CONSTRUCTION = 200
+    HNSW_EF_SEARCH = 64
+    
     def __init__(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2", 
                  device: Optional[str] = None,
                  cache_dir: Optional[str] = None,
-                 mirror_site: str = "official"):
+                 mirror_site: str = "official",
+                 embedding_cache: Optional[EmbeddingCache] = None,
+                 use_embedding_cache: bool = True,
+                 quantization: Optional[str] = "float16"):
         """
         初始化向量存储
         
@@ -48,6 +83,10 @@ class VectorStore:
             device: 计算设备 (cuda/cpu)，自动检测如果未指定
             cache_dir: 模型缓存目录，默认使用项目下的models目录
             mirror_site: 使用的镜像站点 (official/tuna/bfsu/aliyun)
+            embedding_cache: 句向量缓存实例，默认使用 data/vectors/embed_cache.sqlite
+            use_embedding_cache: 添加文档时是否复用已缓存的句向量
+            quantization: 向量量化方式，默认"float16"以半精度保存、检索时再转回float32计算；
+                "int8"表示归一化后按8位标量量化；None表示保存float32向量
         """
         self.model_name = model_name
         self.model = None
@@ -55,6 +94,19 @@ class VectorStore:
         self.documents = []  # 存储原始文档
         self.embeddings = None  # 存储向量
         self.metadata = []  # 存储元数据
+        self._device_matrix = None  # GPU上归一化后的fp16向量矩阵（按需构建）
+        self._ann_index = None  # HNSW近似检索索引（按需构建）
+        self._ann_lock = threading.Lock()
+        self._embedding_cache = embedding_cache
+        self.use_embedding_cache = use_embedding_cache
+        # 并发检索的查询合并为一批编码
+        self._query_batcher = QueryBatcher(
+            lambda texts: self.encode_texts(texts, batch_size=len(texts), show_progress=False)
+        )
+        
+        if quantization is not None and quantization not in self.QUANTIZATION_TYPES:
+            raise ValueError(f"不支持的量化方式: {quantization}，可用: {list(self.QUANTIZATION_TYPES)}")
+        self.quantization = quantization
         
         # 设置镜像站点
         if mirror_site not in self.MIRROR_SITES:
@@ -246,51 +298,199 @@ class VectorStore:
             logger.error(f"文本编码失败: {str(e)}")
             raise RuntimeError(f"文本编码失败: {str(e)}")
     
-    def add_documents(self, documents: List[Dict], 
+    def encode_query(self, query: str) -> np.ndarray:
+        """
+        编码检索查询，与同一时间窗口内其他线程的查询合并为一批调用模型
+        
+        Args:
+            query: 查询文本
+            
+        Returns:
+            np.ndarray: 查询向量
+        """
+        return self._query_batcher.encode(query)
+    
+    def _get_embedding_cache(self) -> Optional[EmbeddingCache]:
+        """获取句向量缓存，打开失败时禁用缓存"""
+        if not self.use_embedding_cache:
+            return None
+        
+        if self._embedding_cache is None:
+            try:
+                self._embedding_cache = get_embedding_cache()
+            except Exception as e:
+                logger.warning(f"句向量缓存不可用: {str(e)}")
+                self.use_embedding_cache = False
+                return None
+        
+        return self._embedding_cache
+    
+    def encode_texts_cached(self, texts: List[str],
+                            batch_size: int = 32,
+                            show_progress: bool = True) -> np.ndarray:
+        """
+        带缓存的文本编码，只对未命中的文本调用模型
+        
+        Args:
+            texts: 文本列表
+            batch_size: 批处理大小
+            show_progress: 是否显示进度
+            
+        Returns:
+            np.ndarray: 文本向量矩阵
+        """
+        cache = self._get_embedding_cache()
+        if cache is None:
+            return self.encode_texts(texts, batch_size, show_progress)
+        
+        keys = [EmbeddingCache.make_key(self.model_name, text) for text in texts]
+        cached = cache.get_many(keys)
+        
+        # 去重后只编码未命中的文本
+        miss_keys = []
+        miss_texts = []
+        seen = set(cached.keys())
+        for key, text in zip(keys, texts):
+            if key not in seen:
+                seen.add(key)
+                miss_keys.append(key)
+                miss_texts.append(text)
+        
+        logger.info(f"句向量缓存命中 {len(texts) - len(miss_texts)}/{len(texts)}")
+        
+        if miss_texts:
+            miss_embeddings = self.encode_texts(miss_texts, batch_size, show_progress)
+            cache.set_many(miss_keys, miss_embeddings)
+            cached.update(zip(miss_keys, miss_embeddings.astype(np.float32)))
+        
+        return np.vstack([cached[key] for key in keys]).astype(np.float32)
+    
+    def embed_batch(self, texts: List[str], batch_size: int = 64) -> np.ndarray:
+        """
+        一次性批量编码全部文本
+        
+        先按文本长度排序再分批，使同一批内长度接近、减少padding，最后恢复原始顺序
+        
+        Args:
+            texts: 文本列表
+            batch_size: 批处理大小
+            
+        Returns:
+            np.ndarray: 与texts顺序一致的向量矩阵
+        """
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        sorted_embeddings = self.encode_texts_cached([texts[i] for i in order], batch_size=batch_size)
+        
+        embeddings = np.empty_like(sorted_embeddings)
+        embeddings[order] = sorted_embeddings
+        return embeddings
+    
+    def add_precomputed(self, embeddings: np.ndarray,
+                        documents: List[Dict],
+                        text_field: str = "text",
+                        metadata_fields: Optional[List[str]] = None) -> None:
+        """
+        批量添加已编码好的向量及其文档
+        
+        Args:
+            embeddings: 向量矩阵，行与documents一一对应
+            documents: 文档列表
+            text_field: 文本字段名
+            metadata_fields: 要保留的元数据字段列表
+        """
+        if len(embeddings) != len(documents):
+            raise ValueError(f"向量数量({len(embeddings)})与文档数量({len(documents)})不一致")
+        
+        self._append_encoded(self._to_storage_dtype(embeddings), documents, text_field, metadata_fields)
+    
+    def _append_encoded(self, embeddings: np.ndarray,
+                        documents: List[Dict],
+                        text_field: str,
+                        metadata_fields: Optional[List[str]]) -> None:
+        """写入已转换为存储格式（float32/float16/int8）的向量及其文档"""
+        # 存储文档和向量
+        self.documents.extend(documents)
+        
+        # 合并向量
+        if self.embeddings is None:
+            self.embeddings = embeddings
+        else:
+            self.embeddings = np.vstack([self.embeddings, embeddings])
+        self._device_matrix = None
+        self._ann_index = None
+        
+        # 处理元数据
+        for doc in documents:
+            if metadata_fields:
+                meta = {field: doc.get(field) for field in metadata_fields if field in doc}
+            else:
+                # 保留除文本字段外的所有字段
+                meta = {k: v for k, v in doc.items() if k != text_field}
+            self.metadata.append(meta)
+    
+    def _to_storage_dtype(self, embeddings: np.ndarray) -> np.ndarray:
+        """按量化方式把编码得到的float32向量转换为存储格式"""
+        if self.quantization == "int8":
+            return self._quantize_int8(embeddings)
+        if self.quantization == "float16":
+            return np.asarray(embeddings, dtype=np.float16)
+        return np.asarray(embeddings, dtype=np.float32)
+    
+    @staticmethod
+    def _quantize_int8(embeddings: np.ndarray) -> np.ndarray:
+        """
+        将向量归一化后量化为int8
+        
+        归一化后各分量落在[-1, 1]内，乘以127取整即可；余弦相似度对整体缩放不敏感，
+        检索时直接在量化后的向量上计算
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        normalized = embeddings / np.maximum(norms, 1e-8)
+        return np.clip(np.rint(normalized * 127), -127, 127).astype(np.int8)
+    
+    def add_documents(self, documents: Iterable[Dict], 
                      text_field: str = "text",
                      metadata_fields: Optional[List[str]] = None) -> None:
         """
         添加文档到向量存储
         
+        documents 可以是列表或生成器，按 ADD_CHUNK_SIZE 分块取出并编码，
+        不需要一次性持有全部文本；低精度存储时也按块转换，不生成完整的float32矩阵
+        
         Args:
-            documents: 文档列表，每个文档是字典格式
+            documents: 文档列表或可迭代对象，每个文档是字典格式
             text_field: 文本字段名
             metadata_fields: 要保留的元数据字段列表
         """
         try:
-            if not documents:
+            doc_iter = iter(documents)
+            encoded_chunks = []
+            added_documents = []
+            
+            while True:
+                chunk = list(islice(doc_iter, self.ADD_CHUNK_SIZE))
+                if not chunk:
+                    break
+                
+                # 提取文本内容
+                texts = []
+                for doc in chunk:
+                    if text_field not in doc:
+                        raise ValueError(f"文档中缺少文本字段: {text_field}")
+                    texts.append(doc[text_field])
+                
+                encoded_chunks.append(self._to_storage_dtype(self.embed_batch(texts)))
+                added_documents.extend(chunk)
+            
+            if not added_documents:
                 logger.warning("文档列表为空")
                 return
             
-            # 提取文本内容
-            texts = []
-            for doc in documents:
-                if text_field not in doc:
-                    raise ValueError(f"文档中缺少文本字段: {text_field}")
-                texts.append(doc[text_field])
-            
-            # 编码文本
-            embeddings = self.encode_texts(texts)
+            # 各块编码完成后整体写入一次，避免逐块vstack
+            self._append_encoded(np.concatenate(encoded_chunks), added_documents, text_field, metadata_fields)
             
-            # 存储文档和向量
-            self.documents.extend(documents)
-            
-            # 合并向量
-            if self.embeddings is None:
-                self.embeddings = embeddings
-            else:
-                self.embeddings = np.vstack([self.embeddings, embeddings])
-            
-            # 处理元数据
-            for doc in documents:
-                if metadata_fields:
-                    meta = {field: doc.get(field) for field in metadata_fields if field in doc}
-                else:
-                    # 保留除文本字段外的所有字段
-                    meta = {k: v for k, v in doc.items() if k != text_field}
-                self.metadata.append(meta)
-            
-            logger.info(f"成功添加 {len(documents)} 个文档到向量存储")
+            logger.info(f"成功添加 {len(added_documents)} 个文档到向量存储")
             
         except Exception as e:
             logger.error(f"添加文档失败: {str(e)}")
@@ -298,7 +498,8 @@ class VectorStore:
     
     def search(self, query: str, 
                top_k: int = 5,
-               threshold: float = 0.0) -> List[Dict]:
+               threshold: float = 0.0,
+               query_embedding: Optional[np.ndarray] = None) -> List[Dict]:
         """
         在向量存储中搜索相似文档
         
@@ -306,6 +507,7 @@ class VectorStore:
             query: 查询文本
             top_k: 返回的最相似文档数量
             threshold: 相似度阈值 (0.0-1.0)
+            query_embedding: 预先编码好的查询向量（见 encode_query），为None时在此编码
             
         Returns:
             List[Dict]: 相似文档列表，每个字典包含：
@@ -327,19 +529,29 @@ class VectorStore:
                 return []
             
             # 编码查询
-            query_embedding = self.encode_texts([query])[0]
-            
-            # 计算相似度
-            similarities = self._compute_similarity(query_embedding, self.embeddings)
-            
-            # 获取最相似的文档索引
-            top_indices = np.argsort(similarities)[::-1][:top_k]
+            if query_embedding is None:
+                query_embedding = self.encode_texts([query])[0]
+            
+            # 计算相似度并获取最相似的文档索引
+            device_matrix = self._get_device_matrix()
+            ann_index = self._get_ann_index() if device_matrix is None else None
+            if device_matrix is not None:
+                top_hits = self._search_on_device(device_matrix, query_embedding, top_k)
+            elif ann_index is not None:
+                top_hits = self._search_ann(ann_index, query_embedding, top_k)
+            else:
+                similarities = self._compute_similarity(query_embedding, self.embeddings)
+                # argpartition在O(N)内选出前k个，只对这k个排序
+                if 0 < top_k < len(similarities):
+                    top_indices = np.sort(np.argpartition(-similarities, top_k - 1)[:top_k])
+                    top_indices = top_indices[np.argsort(-similarities[top_indices], kind='stable')]
+                else:
+                    top_indices = np.argsort(-similarities, kind='stable')[:max(top_k, 0)]
+                top_hits = [(int(idx), float(similarities[idx])) for idx in top_indices]
             
             # 构建结果
             results = []
-            for idx in top_indices:
-                similarity = float(similarities[idx])
-                
+            for idx, similarity in top_hits:
                 # 应用阈值过滤
                 if similarity < threshold:
                     continue
@@ -360,6 +572,100 @@ class VectorStore:
             logger.error(f"搜索失败: {str(e)}")
             raise RuntimeError(f"搜索失败: {str(e)}")
     
+    def _get_device_matrix(self) -> Optional[torch.Tensor]:
+        """
+        获取常驻GPU的归一化fp16向量矩阵
+        
+        仅在CUDA可用且矩阵大小不超过 GPU_SEARCH_MAX_BYTES 时构建，文档变化后重新构建
+        
+        Returns:
+            Optional[torch.Tensor]: 向量矩阵，不满足条件时返回None
+        """
+        if self._device_matrix is not None:
+            return self._device_matrix
+        
+        if self.device != "cuda" or not torch.cuda.is_available():
+            return None
+        
+        if self.embeddings.shape[0] * self.embeddings.shape[1] * 2 > self.GPU_SEARCH_MAX_BYTES:
+            return None
+        
+        matrix = torch.as_tensor(self.embeddings, dtype=torch.float32, device="cuda")
+        self._device_matrix = torch.nn.functional.normalize(matrix, dim=1).half()
+        return self._device_matrix
+    
+    def _search_on_device(self, device_matrix: torch.Tensor,
+                          query_embedding: np.ndarray,
+                          top_k: int) -> List[Tuple[int, float]]:
+        """
+        在GPU上计算余弦相似度并取top-k
+        
+        Args:
+            device_matrix: 归一化后的文档向量矩阵
+            query_embedding: 查询向量
+            top_k: 返回数量
+            
+        Returns:
+            List[Tuple[int, float]]: (文档索引, 相似度) 列表，按相似度降序
+        """
+        query = torch.as_tensor(query_embedding, dtype=torch.float32, device=device_matrix.device)
+        query = torch.nn.functional.normalize(query, dim=0).half()
+        
+        scores = device_matrix @ query
+        values, indices = torch.topk(scores, min(top_k, scores.shape[0]))
+        
+        return list(zip(indices.tolist(), values.float().tolist()))
+    
+    def _get_ann_index(self):
+        """
+        获取HNSW近似检索索引
+        
+        仅在安装了hnswlib且向量数不少于 ANN_MIN_SIZE 时构建，文档变化后重新构建
+        
+        Returns:
+            Optional[hnswlib.Index]: HNSW索引，不满足条件时返回None
+        """
+        if self._ann_index is not None:
+            return self._ann_index
+        
+        if not HAS_HNSWLIB or self.embeddings is None or len(self.embeddings) < self.ANN_MIN_SIZE:
+            return None
+        
+        with self._ann_lock:
+            if self._ann_index is None:
+                num_vectors, dim = self.embeddings.shape
+                ann_index = hnswlib.Index(space="cosine", dim=dim)
+                ann_index.init_index(max_elements=num_vectors,
+                                     ef_construction=self.HNSW_EF_CONSTRUCTION,
+                                     M=self.HNSW_M)
+                ann_index.add_items(np.asarray(self.embeddings, dtype=np.float32), np.arange(num_vectors))
+                ann_index.set_ef(self.HNSW_EF_SEARCH)
+                self._ann_index = ann_index
+                logger.info(f"HNSW索引构建完成，向量数: {num_vectors}")
+        
+        return self._ann_index
+    
+    def _search_ann(self, ann_index, query_embedding: np.ndarray,
+                    top_k: int) -> List[Tuple[int, float]]:
+        """
+        使用HNSW索引近似检索top-k
+        
+        Args:
+            ann_index: HNSW索引
+            query_embedding: 查询向量
+            top_k: 返回数量
+            
+        Returns:
+            List[Tuple[int, float]]: (文档索引, 相似度) 列表，按相似度降序
+        """
+        k = min(top_k, ann_index.get_current_count())
+        # 候选队列长度不能小于k
+        ann_index.set_ef(max(self.HNSW_EF_SEARCH, k))
+        labels, distances = ann_index.knn_query(np.asarray(query_embedding, dtype=np.float32), k=k)
+        
+        # cosine空间下 distance = 1 - 余弦相似度
+        return [(int(label), float(1.0 - distance)) for label, distance in zip(labels[0], distances[0])]
+    
     def _compute_similarity(self, query_embedding: np.ndarray, 
                           document_embeddings: np.ndarray) -> np.ndarray:
         """
@@ -372,6 +678,9 @@ class VectorStore:
         Returns:
             np.ndarray: 相似度分数数组
         """
+        if document_embeddings.dtype in (np.int8, np.float16):
+            return self._compute_similarity_blocked(query_embedding, document_embeddings)
+        
         # 使用余弦相似度
         query_norm = np.linalg.norm(query_embedding)
         doc_norms = np.linalg.norm(document_embeddings, axis=1)
@@ -381,29 +690,85 @@ class VectorStore:
         
         return similarities
     
+    def _compute_similarity_blocked(self, query_embedding: np.ndarray,
+                                    document_embeddings: np.ndarray) -> np.ndarray:
+        """
+        在低精度（float16/int8）向量上分块计算余弦相似度，每块转为float32后计算
+        
+        Args:
+            query_embedding: 查询向量
+            document_embeddings: float16或int8文档向量矩阵
+            
+        Returns:
+            np.ndarray: 相似度分数数组
+        """
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query = query / (np.linalg.norm(query) + 1e-8)
+        
+        similarities = np.empty(document_embeddings.shape[0], dtype=np.float32)
+        block_rows = self.SEARCH_BLOCK_ROWS
+        for start in range(0, document_embeddings.shape[0], block_rows):
+            block = document_embeddings[start:start + block_rows].astype(np.float32)
+            doc_norms = np.linalg.norm(block, axis=1)
+            similarities[start:start + block_rows] = (block @ query) / (doc_norms + 1e-8)
+        
+        return similarities
+    
+    @staticmethod
+    def get_embeddings_path(index_path: Union[str, Path]) -> Path:
+        """获取索引文件对应的向量矩阵文件路径（同目录下的 .npy 文件）"""
+        return Path(index_path).with_suffix(".npy")
+    
+    @staticmethod
+    def get_ann_index_path(index_path: Union[str, Path]) -> Path:
+        """获取索引文件对应的HNSW索引文件路径（同目录下的 .hnsw 文件）"""
+        return Path(index_path).with_suffix(".hnsw")
+    
     def save_index(self, save_path: Union[str, Path]) -> None:
         """
         保存向量索引到文件
         
+        向量矩阵单独保存为 .npy 文件，加载时以内存映射方式打开；
+        save_path 本身只保存文档和元数据
+        
         Args:
             save_path: 保存路径
         """
         try:
             save_path = Path(save_path)
             save_path.parent.mkdir(parents=True, exist_ok=True)
+            embeddings_path = self.get_embeddings_path(save_path)
+            
+            # 先写临时文件再替换，避免覆盖其他实例正在映射的向量文件
+            if self.embeddings is not None:
+                tmp_path = embeddings_path.with_name(embeddings_path.name + ".tmp")
+                with open(tmp_path, 'wb') as f:
+                    np.save(f, np.ascontiguousarray(self.embeddings))
+                os.replace(tmp_path, embeddings_path)
+            elif embeddings_path.exists():
+                embeddings_path.unlink()
+            
+            # 已构建的HNSW索引一并保存，加载时无需重新建图
+            ann_index_path = self.get_ann_index_path(save_path)
+            ann_index = self._get_ann_index()
+            if ann_index is not None:
+                ann_index.save_index(str(ann_index_path))
+            elif ann_index_path.exists():
+                ann_index_path.unlink()
             
             # 准备保存数据
             index_data = {
                 "model_name": self.model_name,
                 "documents": self.documents,
-                "embeddings": self.embeddings,
+                "embeddings_file": embeddings_path.name if self.embeddings is not None else None,
                 "metadata": self.metadata,
-                "device": self.device
+                "device": self.device,
+                "quantization": self.quantization
             }
             
             # 保存到文件
             with open(save_path, 'wb') as f:
-                pickle.dump(index_data, f)
+                pickle.dump(index_data, f, protocol=pickle.HIGHEST_PROTOCOL)
             
             logger.info(f"向量索引已保存到: {save_path}")
             
@@ -428,12 +793,23 @@ class VectorStore:
             with open(load_path, 'rb') as f:
                 index_data = pickle.load(f)
             
+            if "embeddings_file" in index_data:
+                # 向量矩阵以只读内存映射打开，按需从磁盘分页读入
+                embeddings_file = index_data["embeddings_file"]
+                embeddings = np.load(load_path.parent / embeddings_file, mmap_mode='r') if embeddings_file else None
+            else:
+                # 兼容旧格式：向量直接保存在pickle中
+                embeddings = index_data["embeddings"]
+            
             # 恢复状态
             self.model_name = index_data["model_name"]
             self.documents = index_data["documents"]
-            self.embeddings = index_data["embeddings"]
+            self.embeddings = embeddings
             self.metadata = index_data["metadata"]
             self.device = index_data.get("device", "cpu")
+            self.quantization = index_data.get("quantization")
+            self._device_matrix = None
+            self._ann_index = self._load_ann_index(load_path)
             
             # 重新加载模型
             self.model = None  # 重置模型，下次使用时会重新加载
@@ -444,6 +820,24 @@ class VectorStore:
             logger.error(f"加载索引失败: {str(e)}")
             raise RuntimeError(f"加载索引失败: {str(e)}")
     
+    def _load_ann_index(self, load_path: Path):
+        """加载与索引文件一同保存的HNSW索引，不存在或与向量不一致时返回None"""
+        ann_index_path = self.get_ann_index_path(load_path)
+        if not HAS_HNSWLIB or self.embeddings is None or not ann_index_path.exists():
+            return None
+        
+        try:
+            num_vectors, dim = self.embeddings.shape
+            ann_index = hnswlib.Index(space="cosine", dim=dim)
+            ann_index.load_index(str(ann_index_path), max_elements=num_vectors)
+            if ann_index.get_current_count() != num_vectors:
+                return None
+            ann_index.set_ef(self.HNSW_EF_SEARCH)
+            return ann_index
+        except Exception as e:
+            logger.warning(f"加载HNSW索引失败，将在检索时重新构建: {str(e)}")
+            return None
+    
     def get_available_mirrors(self) -> Dict[str, str]:
         """
         获取可用的镜像站点列表
@@ -487,6 +881,8 @@ class VectorStore:
             "model_loaded": self.model is not None,
             "document_count": len(self.documents),
             "vector_dimension": self.embeddings.shape[1] if self.embeddings is not None else 0,
+            "quantization": self.quantization,
+            "ann_index_built": self._ann_index is not None,
             "storage_size_mb": round(self.embeddings.nbytes / (1024 * 1024), 2) if self.embeddings is not None else 0,
             "cache_dir": str(self.cache_dir),
             "mirror_site": self.mirror_site,
@@ -508,6 +904,8 @@ class VectorStore:
         self.documents = []
         self.embeddings = None
         self.metadata = []
+        self._device_matrix = None
+        self._ann_index = None
         logger.info("向量存储已清空")
     
     def unload_model(self) -> None:
@@ -4,7 +4,7 @@
 Whisper语音识别模块
 
 职责：
-- 加载Whisper预训练模型
+- 加载Whisper预训练模型（优先使用faster-whisper/CTranslate2，未安装时使用openai-whisper）
 - 执行语音转文本
 - 输出结构化转写结果
 """
@@ -13,11 +13,25 @@ import os
 import json
 import logging
 from pathlib import Path
-from typing import Dict, List, Optional, Union
-import whisper
+from typing import Callable, Dict, List, Optional, Union
+import numpy as np
 import torch
 import ssl
 
+try:
+    import whisper
+    HAS_OPENAI_WHISPER = True
+except ImportError:
+    whisper = None
+    HAS_OPENAI_WHISPER = False
+
+try:
+    from faster_whisper import WhisperModel
+    HAS_FASTER_WHISPER = True
+except ImportError:
+    WhisperModel = None
+    HAS_FASTER_WHISPER = False
+
 # 设置日志
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -27,17 +41,40 @@ ssl._create_default_https_context = ssl._create_unverified_context
 class WhisperASR:
     """Whisper语音识别服务"""
     
-    def __init__(self, model_size: str = "base", device: Optional[str] = None):
+    # Whisper编码器的固定输入帧数（30秒音频）
+    N_FRAMES = 3000
+    
+    # 支持的计算精度（auto按设备和模型大小自动选择）
+    SUPPORTED_COMPUTE_TYPES = ("auto", "int8", "int8_float16", "float16", "float32")
+    
+    # GPU上改用int8权重的模型（权重较大，显存带宽是瓶颈）
+    INT8_GPU_MODELS = ("medium", "large")
+    
+    def __init__(self, model_size: str = "base", device: Optional[str] = None,
+                 compile_model: bool = True, backend: str = "auto", compute_type: str = "auto"):
         """
         初始化Whisper ASR服务
         
         Args:
             model_size: 模型大小 (tiny/base/small/medium/large)
             device: 计算设备 (cuda/cpu)，自动检测如果未指定
+            compile_model: CUDA下是否使用torch.compile按固定输入形状编译编码器（仅openai-whisper）
+            backend: 推理后端 (auto/faster-whisper/openai-whisper)，auto优先使用faster-whisper
+            compute_type: 计算精度 (auto/int8/int8_float16/float16/float32)，
+                auto时CPU使用int8，GPU上medium及以上使用int8_float16、其余使用float16
         """
         self.model_size = model_size
         self.model = None
         self.device = self._determine_device(device)
+        self.compile_model = compile_model
+        self.backend = self._determine_backend(backend)
+        self.compute_type = self._determine_compute_type(compute_type)
+        # openai-whisper只区分半精度和单精度
+        self.fp16 = self.device == "cuda" and self.compute_type != "float32"
+        
+        # CUDA下使用独立的流上传音频，避免阻塞默认流上的解码（仅openai-whisper需要）
+        use_mel_stream = self.device == "cuda" and self.backend == "openai-whisper"
+        self.mel_stream = torch.cuda.Stream() if use_mel_stream else None
         
         # 支持的模型大小
         self.supported_models = ["tiny", "base", "small", "medium", "large"]
@@ -45,7 +82,59 @@ class WhisperASR:
         if model_size not in self.supported_models:
             raise ValueError(f"不支持的模型大小: {model_size}. 支持的模型: {self.supported_models}")
         
-        logger.info(f"初始化Whisper ASR服务，模型: {model_size}, 设备: {self.device}")
+        logger.info(f"初始化Whisper ASR服务，模型: {model_size}, 设备: {self.device}, "
+                    f"后端: {self.backend}, 精度: {self.compute_type}")
+    
+    def _determine_backend(self, backend: str) -> str:
+        """
+        确定推理后端
+        
+        Args:
+            backend: 指定的后端
+            
+        Returns:
+            str: 使用的后端
+        """
+        if backend == "auto":
+            if HAS_FASTER_WHISPER:
+                return "faster-whisper"
+            if HAS_OPENAI_WHISPER:
+                return "openai-whisper"
+            raise ImportError("未安装Whisper推理库，请安装: pip install faster-whisper")
+        
+        if backend == "faster-whisper" and not HAS_FASTER_WHISPER:
+            raise ImportError("faster-whisper未安装，请安装: pip install faster-whisper")
+        if backend == "openai-whisper" and not HAS_OPENAI_WHISPER:
+            raise ImportError("openai-whisper未安装，请安装: pip install openai-whisper")
+        if backend not in ("faster-whisper", "openai-whisper"):
+            raise ValueError(f"不支持的推理后端: {backend}")
+        return backend
+    
+    def _determine_compute_type(self, compute_type: str) -> str:
+        """
+        确定计算精度
+        
+        Args:
+            compute_type: 指定的精度
+            
+        Returns:
+            str: 使用的精度
+        """
+        if compute_type not in self.SUPPORTED_COMPUTE_TYPES:
+            raise ValueError(f"不支持的计算精度: {compute_type}. 支持的精度: {self.SUPPORTED_COMPUTE_TYPES}")
+        
+        if compute_type != "auto":
+            # CPU不支持半精度计算
+            if self.device != "cuda" and compute_type in ("float16", "int8_float16"):
+                logger.warning(f"CPU不支持 {compute_type}，改用 int8")
+                return "int8"
+            return compute_type
+        
+        if self.device != "cuda":
+            return "int8"
+        if self.model_size in self.INT8_GPU_MODELS:
+            return "int8_float16"
+        return "float16"
     
     def _determine_device(self, device: Optional[str]) -> str:
         """
@@ -77,24 +166,91 @@ class WhisperASR:
             return
         
         try:
-            logger.info(f"正在加载Whisper模型: {self.model_size}")
-            
-            # 下载并加载模型
-            self.model = whisper.load_model(
-                self.model_size,
-                device=self.device
-            )
+            logger.info(f"正在加载Whisper模型: {self.model_size} ({self.backend})")
+            
+            if self.backend == "faster-whisper":
+                # CTranslate2推理：按 compute_type 量化权重，CPU上用两个worker并行解码
+                use_cuda = self.device == "cuda"
+                self.model = WhisperModel(
+                    self.model_size,
+                    device="cuda" if use_cuda else "cpu",
+                    compute_type=self.compute_type,
+                    num_workers=1 if use_cuda else 2
+                )
+            else:
+                # 下载并加载模型
+                self.model = whisper.load_model(
+                    self.model_size,
+                    device=self.device
+                )
             
             logger.info(f"Whisper模型加载成功")
             
         except Exception as e:
             logger.error(f"模型加载失败: {str(e)}")
             raise RuntimeError(f"Whisper模型加载失败: {str(e)}")
+        
+        if self.backend == "openai-whisper" and self.compile_model and self.device == "cuda":
+            self._compile_encoder()
+    
+    def warmup(self) -> None:
+        """
+        加载模型并用一秒静音做一次推理，提前完成CUDA内核初始化等一次性开销，
+        首个上传的视频不必等待模型加载
+        """
+        self.load_model()
+        
+        if self.backend != "faster-whisper":
+            # openai-whisper在CUDA下加载时已通过编译编码器完成预热
+            return
+        
+        try:
+            silence = np.zeros(16000, dtype=np.float32)
+            segments, _ = self.model.transcribe(silence, beam_size=1, vad_filter=False, language="en")
+            for _ in segments:
+                pass
+            logger.info("Whisper模型预热完成")
+        except Exception as e:
+            logger.warning(f"Whisper模型预热失败: {str(e)}")
+    
+    def _compile_encoder(self) -> None:
+        """
+        使用torch.compile按固定形状 (1, n_mels, 3000) 编译编码器，并用空白mel预热触发编译
+        
+        解码器依赖forward hook实现的KV缓存，形状随解码步数变化，保持eager执行。
+        编译或预热失败时回退到原始编码器。
+        """
+        if not hasattr(torch, "compile"):
+            return
+        
+        original_encoder = self.model.encoder
+        try:
+            logger.info("正在编译Whisper编码器...")
+            self.model.encoder = torch.compile(
+                original_encoder,
+                mode="reduce-overhead",
+                fullgraph=True,
+                dynamic=False
+            )
+            
+            # 使用与转写相同的dtype预热（CUDA下transcribe使用fp16）
+            dummy_mel = torch.zeros(
+                1, self.model.dims.n_mels, self.N_FRAMES,
+                dtype=torch.float16, device=self.device
+            )
+            with torch.no_grad():
+                self.model.encoder(dummy_mel)
+            
+            logger.info("Whisper编码器编译完成")
+        except Exception as e:
+            logger.warning(f"Whisper编码器编译失败，使用原始编码器: {str(e)}")
+            self.model.encoder = original_encoder
     
     def transcribe(self, audio_path: Path, 
                    language: Optional[str] = None,
                    task: str = "transcribe",
-                   verbose: bool = False) -> Dict:
+                   verbose: bool = False,
+                   on_segment: Optional[Callable[[Dict], None]] = None) -> Dict:
         """
         执行语音转文本
         
@@ -103,6 +259,7 @@ class WhisperASR:
             language: 指定语言代码（如'zh', 'en'），None为自动检测
             task: 任务类型 ('transcribe' 或 'translate')
             verbose: 是否显示详细输出
+            on_segment: 每识别出一个片段时的回调（仅faster-whisper逐段产出，参数为原始片段字典）
             
         Returns:
             Dict: 结构化转写结果
@@ -122,13 +279,17 @@ class WhisperASR:
             logger.info(f"开始语音转文本: {audio_path}")
             
             # 执行转写
-            result = self.model.transcribe(
-                str(audio_path),
-                language=language,
-                task=task,
-                verbose=verbose,
-                fp16=self.device == "cuda"  # GPU时使用半精度
-            )
+            if self.backend == "faster-whisper":
+                result = self._transcribe_faster(audio_path, language=language, task=task,
+                                                 on_segment=on_segment)
+            else:
+                result = self.model.transcribe(
+                    self._prepare_audio(audio_path),
+                    language=language,
+                    task=task,
+                    verbose=verbose,
+                    fp16=self.fp16  # GPU时使用半精度
+                )
             
             # 构建结构化结果
             structured_result = self._format_result(result, audio_path)
@@ -141,6 +302,87 @@ class WhisperASR:
             logger.error(f"语音转文本失败: {str(e)}")
             raise RuntimeError(f"语音转文本失败: {str(e)}")
     
+    def _transcribe_faster(self, audio_path: Path, language: Optional[str] = None,
+                           task: str = "transcribe", word_timestamps: bool = False,
+                           on_segment: Optional[Callable[[Dict], None]] = None) -> Dict:
+        """
+        使用faster-whisper转写，并整理为与openai-whisper相同结构的原始结果
+        
+        faster-whisper按片段惰性产出结果，每产出一个片段就调用 on_segment，
+        便于调用方在识别过程中更新进度
+        
+        Args:
+            audio_path: 音频文件路径
+            language: 指定语言代码
+            task: 任务类型
+            word_timestamps: 是否输出词级别时间戳
+            on_segment: 片段回调
+            
+        Returns:
+            Dict: 与openai-whisper transcribe返回值结构一致的结果
+        """
+        segments, info = self.model.transcribe(
+            str(audio_path),
+            language=language,
+            task=task,
+            beam_size=1,
+            vad_filter=True,
+            word_timestamps=word_timestamps
+        )
+        
+        raw_segments = []
+        for segment in segments:
+            raw_segment = {
+                "id": segment.id,
+                "start": segment.start,
+                "end": segment.end,
+                "text": segment.text,
+                "avg_logprob": segment.avg_logprob,
+                "no_speech_prob": segment.no_speech_prob
+            }
+            if segment.words:
+                raw_segment["words"] = [
+                    {"word": w.word, "start": w.start, "end": w.end, "probability": w.probability}
+                    for w in segment.words
+                ]
+            raw_segments.append(raw_segment)
+            
+            if on_segment is not None:
+                on_segment(raw_segment)
+        
+        return {
+            "text": "".join(seg["text"] for seg in raw_segments),
+            "language": info.language,
+            "language_probability": info.language_probability,
+            "segments": raw_segments
+        }
+    
+    def _prepare_audio(self, audio_path: Path) -> Union[str, torch.Tensor]:
+        """
+        准备转写输入
+        
+        CUDA下先解码音频，并在独立流上把波形异步拷贝到GPU，
+        这样Whisper会直接在GPU上计算整段log-mel频谱，而不是在CPU上计算后再逐段拷贝。
+        
+        Args:
+            audio_path: 音频文件路径
+            
+        Returns:
+            Union[str, torch.Tensor]: CPU下返回文件路径，CUDA下返回GPU上的波形张量
+        """
+        if self.mel_stream is None:
+            return str(audio_path)
+        
+        audio = torch.from_numpy(whisper.load_audio(str(audio_path))).pin_memory()
+        with torch.cuda.stream(self.mel_stream):
+            audio_gpu = audio.to(self.device, non_blocking=True)
+            copy_done = torch.cuda.Event()
+            copy_done.record(self.mel_stream)
+        
+        torch.cuda.current_stream().wait_event(copy_done)
+        audio_gpu.record_stream(torch.cuda.current_stream())
+        return audio_gpu
+    
     def _format_result(self, raw_result: Dict, audio_path: Path) -> Dict:
         """
         格式化转写结果为标准结构
@@ -240,12 +482,15 @@ class WhisperASR:
             logger.info(f"开始带时间戳的语音转文本: {audio_path}")
             
             # 使用word_timestamps选项
-            result = self.model.transcribe(
-                str(audio_path),
-                language=language,
-                word_timestamps=True,
-                fp16=self.device == "cuda"
-            )
+            if self.backend == "faster-whisper":
+                result = self._transcribe_faster(audio_path, language=language, word_timestamps=True)
+            else:
+                result = self.model.transcribe(
+                    self._prepare_audio(audio_path),
+                    language=language,
+                    word_timestamps=True,
+                    fp16=self.fp16
+                )
             
             # 格式化结果
             formatted_result = self._format_result(result, audio_path)
@@ -275,6 +520,21 @@ class WhisperASR:
             
             logger.info(f"检测音频语言: {audio_path}")
             
+            if self.backend == "faster-whisper":
+                # 语言检测在transcribe返回前完成，不迭代片段即不会执行解码
+                _, info = self.model.transcribe(str(audio_path), beam_size=1)
+                probs = dict(info.all_language_probs or [(info.language, info.language_probability)])
+                detected_lang = info.language
+                confidence = info.language_probability
+                
+                logger.info(f"检测到语言: {detected_lang} (置信度: {confidence:.3f})")
+                
+                return {
+                    "detected_language": detected_lang,
+                    "confidence": round(confidence, 3),
+                    "all_probabilities": {lang: round(prob, 3) for lang, prob in probs.items()}
+                }
+            
             # 加载音频
             audio = whisper.load_audio(str(audio_path))
             
@@ -312,6 +572,8 @@ class WhisperASR:
         return {
             "model_size": self.model_size,
             "device": self.device,
+            "backend": self.backend,
+            "compute_type": self.compute_type,
             "model_loaded": self.model is not None,
             "supported_languages": list(whisper.LANGUAGES.keys()) if hasattr(whisper, 'LANGUAGES') else [],
             "torch_version": torch.__version__,
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+翻译结果持久化缓存
+
+以 (源语言, 目标语言, 文本哈希) 为键，把翻译结果保存到SQLite，重启后仍可命中
+"""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+
+class TranslationCache:
+    """翻译结果的SQLite缓存"""
+
+    def __init__(self, db_path: Union[str, Path]):
+        """
+        初始化翻译缓存
+
+        Args:
+            db_path: SQLite缓存文件路径
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS translations "
+            "(key BLOB PRIMARY KEY, translated_text TEXT, confidence REAL, method TEXT)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(text: str, source_lang: str, target_lang: str) -> bytes:
+        """根据语言对和文本生成缓存键"""
+        return hashlib.blake2b(
+            f"{source_lang}|{target_lang}|{text}".encode("utf-8"), digest_size=16
+        ).digest()
+
+    def get(self, text: str, source_lang: str, target_lang: str) -> Optional[Tuple[str, Optional[float], str]]:
+        """
+        查询缓存
+
+        Returns:
+            Optional[Tuple[str, Optional[float], str]]: (译文, 置信度, 翻译方法)，未命中返回None
+        """
+        key = self.make_key(text, source_lang, target_lang)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT translated_text, confidence, method FROM translations WHERE key = ?", (key,)
+            ).fetchone()
+        return row
+
+    def set(self, text: str, source_lang: str, target_lang: str,
+            translated_text: str, confidence: Optional[float], method: str) -> None:
+        """写入缓存"""
+        key = self.make_key(text, source_lang, target_lang)
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO translations (key, translated_text, confidence, method) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, translated_text, confidence, method)
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"写入翻译缓存失败: {str(e)}")
+
+
+_shared_caches: Dict[str, TranslationCache] = {}
+_shared_lock = threading.Lock()
+
+
+def get_translation_cache(db_path: Optional[Union[str, Path]] = None) -> TranslationCache:
+    """
+    获取共享的翻译缓存实例（同一路径只打开一次）
+
+    Args:
+        db_path: 缓存文件路径，默认为 data/translate_cache.sqlite
+
+    Returns:
+        TranslationCache: 翻译缓存实例
+    """
+    if db_path is None:
+        project_root = Path(__file__).parent.parent.parent
+        db_path = project_root / "data" / "translate_cache.sqlite"
+
+    key = str(Path(db_path).resolve())
+    with _shared_lock:
+        if key not in _shared_caches:
+            _shared_caches[key] = TranslationCache(db_path)
+        return _shared_caches[key]
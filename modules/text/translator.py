@@ -6,8 +6,8 @@
 
 import os
 import re
-from typing import List, Dict, Any, Optional, Union
-from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Union, Tuple
+from dataclasses import dataclass, replace
 import time
 import json
 import asyncio
@@ -36,6 +36,11 @@ except ImportError:
     HAS_DEEP_TRANSLATOR = False
     print("提示: 安装 deep-translator 可获得更稳定的翻译: pip install deep-translator")
 
+try:
+    from modules.text.translation_cache import get_translation_cache
+except ImportError:
+    from translation_cache import get_translation_cache
+
 
 @dataclass
 class TranslationResult:
@@ -52,18 +57,27 @@ class TranslationResult:
 class TextTranslator:
     """文本翻译器，支持多种翻译策略"""
 
-    def __init__(self, default_method: str = "deep-translator", progress_callback=None):
+    def __init__(self, default_method: str = "deep-translator", progress_callback=None,
+                 persistent_cache: bool = False):
         """
         初始化翻译器
 
         Args:
             default_method: 翻译方法 ("auto", "deep-translator", "mock")
             progress_callback: 进度回调函数，接收(current, total, message)参数
+            persistent_cache: 是否把翻译结果持久化到 data/translate_cache.sqlite（默认关闭，由应用层的翻译管理器开启）
         """
         self.default_method = self._determine_best_method(default_method)
         self.translator = None
         self.translation_cache = {}
         self.progress_callback = progress_callback
+        self.persistent_cache = None
+        self.cache_hits = 0
+        if persistent_cache:
+            try:
+                self.persistent_cache = get_translation_cache()
+            except Exception as e:
+                print(f"⚠ 翻译缓存不可用: {e}")
         self._init_translator()
 
     def _determine_best_method(self, preferred_method: str) -> str:
@@ -166,10 +180,8 @@ class TextTranslator:
             )
 
         # 检查缓存
-        cache_key = f"{text}_{source_lang}_{target_lang}"
-        if cache_key in self.translation_cache:
-            cached_result = self.translation_cache[cache_key]
-            cached_result.translation_method = f"{cached_result.translation_method}_cached"
+        cached_result = self._lookup_cache(text, source_lang, target_lang)
+        if cached_result:
             return cached_result
 
         # 执行翻译
@@ -181,10 +193,47 @@ class TextTranslator:
             result = self._translate_with_mock(text, source_lang, target_lang)
 
         # 缓存结果
-        self.translation_cache[cache_key] = result
+        self._store_cache(result)
 
         return result
 
+    def _lookup_cache(self, text: str, source_lang: str,
+                      target_lang: str) -> Optional[TranslationResult]:
+        """依次查询内存缓存和持久化缓存，命中时返回带 _cached 标记的结果副本"""
+        cache_key = f"{text}_{source_lang}_{target_lang}"
+        cached_result = self.translation_cache.get(cache_key)
+
+        if cached_result is None and self.persistent_cache:
+            row = self.persistent_cache.get(text, source_lang, target_lang)
+            if row:
+                translated_text, confidence, method = row
+                cached_result = TranslationResult(
+                    original_text=text,
+                    translated_text=translated_text,
+                    source_lang=source_lang,
+                    target_lang=target_lang,
+                    confidence=confidence,
+                    translation_method=method
+                )
+                self.translation_cache[cache_key] = cached_result
+
+        if cached_result is None:
+            return None
+
+        self.cache_hits += 1
+        return replace(cached_result, translation_method=f"{cached_result.translation_method}_cached")
+
+    def _store_cache(self, result: TranslationResult) -> None:
+        """写入内存缓存；真实翻译结果同时写入持久化缓存"""
+        cache_key = f"{result.original_text}_{result.source_lang}_{result.target_lang}"
+        self.translation_cache[cache_key] = result
+
+        if self.persistent_cache and result.translation_method == "deep-translator":
+            self.persistent_cache.set(
+                result.original_text, result.source_lang, result.target_lang,
+                result.translated_text, result.confidence, result.translation_method
+            )
+
     # 不再使用googletrans翻译
 
     def _translate_with_deeptranslator(self, text: str, source_lang: str,
@@ -292,15 +341,18 @@ class TextTranslator:
         # 更新初始进度
         self._update_progress(0, total_segments, "开始翻译...")
 
-        for i, segment in enumerate(segments):
-            # 更新进度
-            if i % 5 == 0 or i == total_segments - 1:  # 更频繁地更新进度
-                self._update_progress(i + 1, total_segments, f"正在翻译第 {i + 1}/{total_segments} 段")
+        # 按长度分批翻译含文本的段落，结果顺序与原段落一致
+        text_indices = [i for i, segment in enumerate(segments) if "text" in segment]
+        translation_results = self.translate_batched(
+            [segments[i]["text"] for i in text_indices], target_lang
+        )
+        results_by_index = dict(zip(text_indices, translation_results))
 
+        for i, segment in enumerate(segments):
             translated_segment = segment.copy()
 
-            if "text" in segment:
-                translation_result = self.translate(segment["text"], target_lang)
+            if i in results_by_index:
+                translation_result = results_by_index[i]
                 translated_segment["text"] = translation_result.translated_text
                 translated_segment["translation_metadata"] = {
                     "original_text": translation_result.original_text,
@@ -316,6 +368,112 @@ class TextTranslator:
         self._update_progress(total_segments, total_segments, "翻译完成")
         return translated_segments
 
+    def translate_batched(self, texts: List[str], target_lang: str = "en",
+                          source_lang: Optional[str] = None,
+                          batch_size: int = 16,
+                          sort_by_length: bool = True) -> List[TranslationResult]:
+        """
+        按长度分批翻译多条文本
+
+        先按文本长度排序，使每批内长度接近；deep-translator 模式下同一批中
+        源语言相同的文本合并为一次请求，减少网络往返。返回结果与输入顺序一致。
+
+        Args:
+            texts: 待翻译文本列表
+            target_lang: 目标语言
+            source_lang: 源语言，None表示逐条自动检测
+            batch_size: 每批文本数量
+            sort_by_length: 是否按长度排序后分批
+
+        Returns:
+            List[TranslationResult]: 与texts一一对应的翻译结果
+        """
+        total = len(texts)
+        order = list(range(total))
+        if sort_by_length:
+            order.sort(key=lambda i: len(texts[i]))
+
+        results: List[Optional[TranslationResult]] = [None] * total
+        for start in range(0, total, batch_size):
+            batch_indices = order[start:start + batch_size]
+            batch_results = self._translate_batch([texts[i] for i in batch_indices], target_lang, source_lang)
+            for i, result in zip(batch_indices, batch_results):
+                results[i] = result
+
+            done = min(start + batch_size, total)
+            self._update_progress(done, total, f"正在翻译第 {done}/{total} 段")
+
+        return results
+
+    def _translate_batch(self, texts: List[str], target_lang: str,
+                         source_lang: Optional[str] = None) -> List[TranslationResult]:
+        """
+        翻译一批文本，可合并的文本通过一次 deep-translator 请求完成
+
+        Args:
+            texts: 同一批的文本
+            target_lang: 目标语言
+            source_lang: 源语言，None表示逐条自动检测
+
+        Returns:
+            List[TranslationResult]: 与texts一一对应的翻译结果
+        """
+        results: List[Optional[TranslationResult]] = [None] * len(texts)
+
+        # 按源语言分组需要远程翻译的文本，其余（空文本、同语言、已缓存）走单条路径
+        pending: Dict[str, List[int]] = {}
+        first_index: Dict[Tuple[str, str], int] = {}
+        duplicates: Dict[int, int] = {}
+        for i, text in enumerate(texts):
+            src = source_lang or self.detect_language(text)
+            needs_remote = (
+                self.default_method == "deep-translator"
+                and text and text.strip()
+                and src != target_lang
+            )
+            if needs_remote:
+                cached_result = self._lookup_cache(text, src, target_lang)
+                if cached_result:
+                    results[i] = cached_result
+                elif (src, text) in first_index:
+                    # 同一批内的重复文本只翻译一次
+                    duplicates[i] = first_index[(src, text)]
+                else:
+                    first_index[(src, text)] = i
+                    pending.setdefault(src, []).append(i)
+            else:
+                results[i] = self.translate(text, target_lang, src)
+
+        for src, indices in pending.items():
+            joined_texts = [" ".join(texts[i].split()) for i in indices]
+            merged = None
+            if len(indices) > 1 and sum(len(t) + 1 for t in joined_texts) < 4500:
+                merged = self._translate_with_deeptranslator("\n".join(joined_texts), src, target_lang)
+
+            lines = merged.translated_text.split("\n") if merged and merged.translated_text else []
+            if merged and merged.translation_method == "deep-translator" and len(lines) == len(indices):
+                for i, line in zip(indices, lines):
+                    result = TranslationResult(
+                        original_text=texts[i],
+                        translated_text=line.strip(),
+                        source_lang=src,
+                        target_lang=target_lang,
+                        confidence=merged.confidence,
+                        translation_method="deep-translator"
+                    )
+                    self._store_cache(result)
+                    results[i] = result
+            else:
+                # 无法合并或合并结果行数不一致时逐条翻译
+                for i in indices:
+                    results[i] = self.translate(texts[i], target_lang, src)
+
+        for i, first in duplicates.items():
+            self.cache_hits += 1
+            results[i] = replace(results[first], translation_method=f"{results[first].translation_method}_cached")
+
+        return results
+
     def translate_transcript(self, transcript: Dict[str, Any],
                              target_lang: str = "en") -> Dict[str, Any]:
         """
@@ -331,6 +489,7 @@ class TextTranslator:
                 target_lang = "zh"
 
         translated_transcript = transcript.copy()
+        self.cache_hits = 0
         
         # 更新进度
         self._update_progress(0, 0, "开始翻译转录结果...")
@@ -353,6 +512,9 @@ class TextTranslator:
                 transcript["segments"], target_lang
             )
 
+        # 记录本次翻译的缓存命中数
+        translated_transcript.setdefault("translation_metadata", {})["cache_hits"] = self.cache_hits
+
         return translated_transcript
 
     def batch_translate(self, texts: List[str], target_lang: str = "en",
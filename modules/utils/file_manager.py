@@ -9,7 +9,6 @@
 - 提供文件操作工具函数
 """
 
-import json
 import os
 from pathlib import Path
 from typing import Dict, List, Optional, Union
@@ -18,6 +17,7 @@ import logging
 
 # 导入配置
 from config.settings import settings
+from .file_utils import dump_json_file, load_json_file
 
 logger = logging.getLogger(__name__)
 
@@ -101,8 +101,7 @@ class FileManager:
             转录数据
         """
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return load_json_file(file_path)
         except Exception as e:
             logger.error(f"加载转录文件失败 {file_path}: {e}")
             return {}
@@ -140,8 +139,7 @@ class FileManager:
             }
             
             # 写入JSON文件
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(enriched_data, f, ensure_ascii=False, indent=2)
+            dump_json_file(enriched_data, output_path)
             
             logger.info(f"JSON转写结果已保存: {output_path}")
             
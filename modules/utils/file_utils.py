@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文件工具函数
+
+- 转录等大体积JSON文件的快速读写，优先使用 orjson，未安装时回退到标准库 json
+- 大文件（视频、音频）的快速复制，优先使用硬链接/reflink
+"""
+
+import os
+import sys
+import json
+import shutil
+from pathlib import Path
+from typing import Any, Union
+
+try:
+    import orjson
+
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# Linux ioctl FICLONE，用于在 Btrfs/XFS 等文件系统上创建 reflink
+FICLONE = 0x40049409
+
+
+def dump_json_file(data: Any, file_path: Union[str, Path]) -> None:
+    """
+    将数据写入JSON文件（UTF-8，缩进2空格）
+
+    Args:
+        data: 待序列化的数据
+        file_path: 输出文件路径
+    """
+    if HAS_ORJSON:
+        Path(file_path).write_bytes(
+            orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+        )
+        return
+
+    with open(file_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def load_json_file(file_path: Union[str, Path]) -> Any:
+    """
+    读取JSON文件
+
+    Args:
+        file_path: 文件路径
+
+    Returns:
+        反序列化后的数据
+    """
+    if HAS_ORJSON:
+        return orjson.loads(Path(file_path).read_bytes())
+
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _try_reflink(src: Path, dst: Path) -> bool:
+    """尝试通过 FICLONE 创建写时复制副本，不支持时返回False"""
+    if not sys.platform.startswith('linux'):
+        return False
+
+    try:
+        import fcntl
+    except ImportError:
+        return False
+
+    try:
+        with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+        return True
+    except OSError:
+        if dst.exists():
+            dst.unlink()
+        return False
+
+
+def fast_copy_file(src: Union[str, Path], dst: Union[str, Path]) -> str:
+    """
+    快速复制大文件
+
+    依次尝试硬链接、reflink，都不可用时回退到 shutil.copyfile
+    （Linux 下内部使用 sendfile，不经过用户态缓冲）
+
+    Args:
+        src: 源文件路径
+        dst: 目标文件路径
+
+    Returns:
+        实际使用的复制方式: "hardlink" / "reflink" / "copy"
+    """
+    src = Path(src)
+    dst = Path(dst)
+
+    if dst.exists():
+        dst.unlink()
+
+    try:
+        os.link(src, dst)
+        return "hardlink"
+    except OSError:
+        # 跨文件系统(EXDEV)或无权限(EPERM)等情况，继续尝试其他方式
+        pass
+
+    if _try_reflink(src, dst):
+        return "reflink"
+
+    shutil.copyfile(src, dst)
+    return "copy"
@@ -31,18 +31,21 @@ if __name__ == "__main__":
         print(f"⚠ 后端模块加载失败 ({e})，将在模拟模式下运行")
         print("  模拟模式下，视频处理和语音识别功能将返回模拟数据")
     
-# 启动应用
-    from deploy.app import create_video_qa_interface
+    # 启动应用
+    from deploy.app import create_video_qa_interface_routed
     
     # 设置环境变量抑制警告
     os.environ['GRADIO_ANALYTICS_ENABLED'] = 'False'
     
-    demo = create_video_qa_interface()
-    demo.launch(
-        server_name="localhost",
-        server_port=None,  # 自动寻找可用端口
+    demo = create_video_qa_interface_routed()
+    demo.queue(default_concurrency_limit=16, max_size=64).launch(
+        # 监听所有网卡并固定端口（与根目录 start.py 打印的访问地址和 Flask 的 CORS 配置一致），不在启动时扫描空闲端口
+        # 登录状态在进程内全局共享，局域网客户端会进入当前登录用户的会话（见 deploy/app.py 中的说明）
+        server_name=os.environ.get("GRADIO_SERVER_NAME", "0.0.0.0"),
+        server_port=int(os.environ.get("GRADIO_SERVER_PORT", 7860)),
         share=False,
-        debug=True,
+        debug=False,
+        ssr_mode=False,
         theme=gr.themes.Soft(),
         show_error=True,
         quiet=False  # 显示重要信息
@@ -6,6 +6,7 @@
 
 import sys
 import os
+import asyncio
 import tempfile
 import shutil
 from pathlib import Path
@@ -53,7 +54,7 @@ def test_complete_upload_flow():
                 }
                 
                 # 调用handle_upload
-                result = handle_upload(str(video_file), True, "base")
+                result = asyncio.run(handle_upload(str(video_file), True, "base"))
                 
                 # 验证结果
                 assert len(result) == 10  # 验证返回的参数数量
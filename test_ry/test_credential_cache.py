@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+凭据缓存测试
+
+CredentialCache 命中时登录会跳过bcrypt验证，这里覆盖：
+- 相同密码命中缓存
+- 错误密码不命中，也不会被记为验证通过
+- 修改密码后旧凭据不再命中
+- 删除用户时清除其缓存凭据
+- 有效期过后失效
+- 超出容量时淘汰最久未使用的条目
+"""
+
+import sys
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# 添加项目根目录到Python路径
+sys.path.append(str(Path(__file__).parent.parent))
+
+from storage.sqlite_adapter import SQLiteAdapter
+from auth.user_manager import UserManager
+from auth.auth_utils import CredentialCache, PasswordManager
+
+
+class TestCredentialCache(unittest.TestCase):
+    """凭据缓存单元测试"""
+
+    def test_hit_with_same_password(self):
+        """相同凭据命中"""
+        cache = CredentialCache()
+        cache.add("user_1", "hash_1", "TestPassword123!")
+        self.assertTrue(cache.contains("user_1", "hash_1", "TestPassword123!"))
+
+    def test_miss_with_wrong_password(self):
+        """密码、密码哈希或用户不同均不命中"""
+        cache = CredentialCache()
+        cache.add("user_1", "hash_1", "TestPassword123!")
+        self.assertFalse(cache.contains("user_1", "hash_1", "WrongPassword123!"))
+        self.assertFalse(cache.contains("user_1", "hash_2", "TestPassword123!"))
+        self.assertFalse(cache.contains("user_2", "hash_1", "TestPassword123!"))
+
+    def test_plaintext_not_stored(self):
+        """缓存键中不包含明文密码"""
+        cache = CredentialCache()
+        cache.add("user_1", "hash_1", "TestPassword123!")
+        for key in cache._entries:
+            self.assertNotIn("TestPassword123!", key)
+            self.assertNotIn(b"TestPassword123!", key)
+
+    def test_invalidate(self):
+        """清除指定用户的全部凭据，不影响其他用户"""
+        cache = CredentialCache()
+        cache.add("user_1", "hash_1", "password_a")
+        cache.add("user_1", "hash_1", "password_b")
+        cache.add("user_2", "hash_2", "password_a")
+
+        cache.invalidate("user_1")
+        self.assertFalse(cache.contains("user_1", "hash_1", "password_a"))
+        self.assertFalse(cache.contains("user_1", "hash_1", "password_b"))
+        self.assertTrue(cache.contains("user_2", "hash_2", "password_a"))
+
+    def test_ttl_expiry(self):
+        """超过有效期后不再命中，并移除过期条目"""
+        cache = CredentialCache(ttl=60)
+        with patch("auth.auth_utils.time.monotonic", return_value=1000.0):
+            cache.add("user_1", "hash_1", "TestPassword123!")
+
+        with patch("auth.auth_utils.time.monotonic", return_value=1059.0):
+            self.assertTrue(cache.contains("user_1", "hash_1", "TestPassword123!"))
+
+        with patch("auth.auth_utils.time.monotonic", return_value=1060.0):
+            self.assertFalse(cache.contains("user_1", "hash_1", "TestPassword123!"))
+        self.assertEqual(len(cache._entries), 0)
+
+    def test_lru_eviction(self):
+        """超出容量时淘汰最久未使用的条目"""
+        cache = CredentialCache(max_items=2)
+        cache.add("user_1", "hash_1", "password")
+        cache.add("user_2", "hash_2", "password")
+
+        # 访问 user_1 后，user_2 成为最久未使用的条目
+        self.assertTrue(cache.contains("user_1", "hash_1", "password"))
+        cache.add("user_3", "hash_3", "password")
+
+        self.assertEqual(len(cache._entries), 2)
+        self.assertTrue(cache.contains("user_1", "hash_1", "password"))
+        self.assertFalse(cache.contains("user_2", "hash_2", "password"))
+        self.assertTrue(cache.contains("user_3", "hash_3", "password"))
+
+
+class TestLoginCredentialCache(unittest.TestCase):
+    """UserManager 登录时的凭据缓存"""
+
+    password = "TestPassword123!"
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.storage = SQLiteAdapter(str(self.temp_dir / "test_auth.db"))
+        self.assertTrue(self.storage.connect())
+        self.assertTrue(self.storage.initialize_schema())
+
+        self.user_manager = UserManager(self.storage, "test-jwt-secret-key")
+        result = self.user_manager.register_user("cache_user", "cache_user@example.com", self.password)
+        self.assertTrue(result['success'], result.get('message'))
+        self.user_id = result['user_id']
+
+        # 统计实际执行的bcrypt验证次数
+        self.verify = patch.object(
+            self.user_manager.password_manager, "verify_password",
+            wraps=PasswordManager.verify_password
+        ).start()
+
+    def tearDown(self):
+        patch.stopall()
+        self.storage.disconnect()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def login(self, password):
+        return self.user_manager.login_user("cache_user", password)
+
+    def test_second_login_skips_bcrypt(self):
+        """相同密码再次登录命中缓存，不再执行bcrypt验证"""
+        self.assertTrue(self.login(self.password)['success'])
+        self.assertTrue(self.login(self.password)['success'])
+        self.assertEqual(self.verify.call_count, 1)
+
+    def test_wrong_password_never_cached(self):
+        """错误密码每次都经过bcrypt验证且登录失败"""
+        self.assertTrue(self.login(self.password)['success'])
+
+        for _ in range(2):
+            result = self.login("WrongPassword123!")
+            self.assertFalse(result['success'])
+            self.assertEqual(result['message'], '密码错误')
+        self.assertEqual(self.verify.call_count, 3)
+
+    def test_password_change_invalidates(self):
+        """通过 update_user_profile 修改密码后，旧密码不再命中缓存"""
+        self.assertTrue(self.login(self.password)['success'])
+
+        new_password = "NewPassword456!"
+        result = self.user_manager.update_user_profile(self.user_id, {'password': new_password})
+        self.assertTrue(result['success'], result.get('message'))
+
+        self.assertFalse(self.login(self.password)['success'])
+        self.assertTrue(self.login(new_password)['success'])
+        self.assertEqual(self.verify.call_count, 3)
+
+    def test_delete_user_invalidates(self):
+        """删除用户时清除其缓存凭据"""
+        self.assertTrue(self.login(self.password)['success'])
+        self.assertTrue(any(key[0] == self.user_id for key in self.user_manager.credential_cache._entries))
+
+        self.assertTrue(self.user_manager.delete_user(self.user_id)['success'])
+        self.assertFalse(any(key[0] == self.user_id for key in self.user_manager.credential_cache._entries))
+
+
+if __name__ == "__main__":
+    unittest.main()
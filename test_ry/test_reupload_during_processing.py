@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+处理中重复上传测试
+
+视频ID为文件内容摘要，同一文件在处理过程中再次上传时，
+应沿用正在运行的后台任务，不重置其进度记录，也不重新提交处理
+"""
+
+import sys
+import os
+import tempfile
+import shutil
+from concurrent.futures import Future
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from deploy.utils.user_context import user_context
+from deploy.core.processing_status import reset_record
+from deploy.core import video_processor_isolated
+from deploy.core.video_processor_isolated import IsolatedVideoProcessor
+
+
+def _make_processor():
+    """创建不加载模型的处理器（只测试上传与任务登记逻辑）"""
+    processor = IsolatedVideoProcessor.__new__(IsolatedVideoProcessor)
+    processor.video_loader = Mock()
+    return processor
+
+
+def test_reupload_during_processing():
+    """处理中重复上传同一视频"""
+    print("🧪 测试处理中重复上传同一视频...")
+
+    temp_dir = Path(tempfile.mkdtemp())
+    video_file = temp_dir / "test_video.mp4"
+    video_file.write_bytes(b"fake video content")
+
+    try:
+        user_context.set_user("test_reupload_user", "testuser")
+        processor = _make_processor()
+        video_id = processor._compute_video_hash(video_file)
+
+        # 模拟第一次上传后正在运行的后台任务
+        running_job = Future()
+        video_processor_isolated._processing_jobs[("test_reupload_user", video_id)] = running_job
+        job_record = reset_record(processor.processing_status, video_id, current_step="开始处理视频")
+        job_record.update(current_step="识别中...", progress=0.5)
+
+        with patch('deploy.core.video_processor_isolated._processing_pool') as mock_pool:
+            result = processor.upload_and_process_video(str(video_file))
+
+            # 不重新提交处理，也不重置进度
+            assert result["status"] == "processing"
+            assert result["video_id"] == video_id
+            mock_pool.submit.assert_not_called()
+            assert processor.processing_status[video_id] is job_record
+            assert job_record["progress"] == 0.5
+            assert job_record["current_step"] == "识别中..."
+            print("✅ 重复上传沿用正在运行的任务")
+
+            # 后台任务的后续进度仍然写到界面读取的记录上
+            job_record.update(current_step="处理完成", progress=1.0, status="completed")
+            assert processor.get_processing_progress(video_id)["status"] == "completed"
+            mock_pool.submit.assert_not_called()
+            print("✅ 任务结束后不会被重新提交")
+            
+            # 其他模型配置的处理器读取同一条记录
+            other = _make_processor()
+            other.whisper_model = "small"
+            assert other.get_processing_progress(video_id)["status"] == "completed"
+            print("✅ 不同处理器共享处理状态记录")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 测试失败: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    finally:
+        video_processor_isolated._processing_jobs.clear()
+        video_processor_isolated._processing_records.pop("test_reupload_user", None)
+        user_context.clear_user()
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def main():
+    """主测试函数"""
+    print("🚀 开始处理中重复上传测试")
+    print("=" * 50)
+
+    success = test_reupload_during_processing()
+
+    print("=" * 50)
+    if success:
+        print("🎉 测试通过！")
+    else:
+        print("❌ 测试失败")
+    return success
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -305,6 +305,50 @@ def test_bm25_multilingual():
     return True
 
 
+def test_bm25_tokens_cache():
+    """测试分词缓存的复用与失效"""
+    print("\n" + "=" * 50)
+    print("测试BM25分词缓存")
+    print("=" * 50)
+    
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache_path = BM25Retriever.get_tokens_cache_path(Path(temp_dir) / "test_bm25_index.pkl")
+            
+            test_docs = [
+                {"id": 1, "text": "人工智能技术正在快速发展"},
+                {"id": 2, "text": "machine learning is a branch of AI"}
+            ]
+            
+            bm25_1 = BM25Retriever()
+            bm25_1.add_documents(test_docs, tokens_cache_path=cache_path)
+            if not cache_path.exists():
+                print("\n❌ 分词缓存文件未生成")
+                return False
+            
+            # 命中缓存时分词结果应与首次构建一致
+            bm25_2 = BM25Retriever()
+            bm25_2.add_documents(test_docs, tokens_cache_path=cache_path)
+            if bm25_2.corpus != bm25_1.corpus:
+                print("\n❌ 复用缓存后的分词结果不一致")
+                return False
+            
+            # 文本变化后缓存失效，重新分词
+            changed_docs = test_docs + [{"id": 3, "text": "深度学习推动了AI技术的突破"}]
+            bm25_3 = BM25Retriever()
+            bm25_3.add_documents(changed_docs, tokens_cache_path=cache_path)
+            if len(bm25_3.corpus) != len(changed_docs):
+                print("\n❌ 文本变化后分词缓存未失效")
+                return False
+        
+        print("\n✅ BM25分词缓存测试通过")
+        return True
+        
+    except Exception as e:
+        print(f"\n❌ BM25分词缓存测试失败: {str(e)}")
+        return False
+
+
 def main():
     """运行所有测试"""
     print("开始BM25检索器测试")
@@ -314,7 +358,8 @@ def main():
         test_bm25_basic,
         test_bm25_persistence,
         test_bm25_parameters,
-        test_bm25_multilingual
+        test_bm25_multilingual,
+        test_bm25_tokens_cache
     ]
     
     passed = 0
@@ -130,7 +130,21 @@ class TestHybridRetriever(unittest.TestCase):
         stats = new_hybrid.get_stats()
         self.assertEqual(stats["vector_store"]["document_count"], len(self.test_documents))
         self.assertEqual(stats["bm25_retriever"]["document_count"], len(self.test_documents))
-    
+
+    def test_attach_prebuilt_indexes(self):
+        """测试接管已构建的索引"""
+        new_hybrid = HybridRetriever(VectorStore(), BM25Retriever())
+
+        # 接管setUp中已添加文档的检索器，不重新添加文档
+        new_hybrid.attach(self.vector_store, self.bm25_retriever)
+
+        stats = new_hybrid.get_stats()
+        self.assertEqual(stats["vector_store"]["document_count"], len(self.test_documents))
+        self.assertEqual(stats["bm25_retriever"]["document_count"], len(self.test_documents))
+
+        results = new_hybrid.search("GPS定位", top_k=3)
+        self.assertGreater(len(results), 0)
+
     def test_weighted_average_fusion(self):
         """测试加权平均融合方法"""
         # 使用加权平均融合的检索器
@@ -415,6 +429,30 @@ class TestHybridRetriever(unittest.TestCase):
             results = new_hybrid.search("智能手机", top_k=3)
             self.assertGreater(len(results), 0)
 
+    def test_index_metadata_references(self):
+        """测试混合索引元数据只引用子索引文件"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            vector_index_path = Path(temp_dir) / "test_vector_index.pkl"
+            bm25_index_path = Path(temp_dir) / "test_bm25_index.pkl"
+            hybrid_index_path = Path(temp_dir) / "test_hybrid_index.pkl"
+
+            self.hybrid_retriever.save_indexes(str(vector_index_path), str(bm25_index_path))
+            self.hybrid_retriever.save_index_metadata(hybrid_index_path, vector_index_path, bm25_index_path)
+
+            # 元数据中不包含文档
+            metadata = self.hybrid_retriever.get_index_metadata(vector_index_path, bm25_index_path)
+            self.assertNotIn("documents", metadata)
+            self.assertEqual(metadata["vector_index_file"], vector_index_path.name)
+
+            # 通过元数据加载子索引并恢复融合参数
+            new_hybrid = HybridRetriever(VectorStore(), BM25Retriever(), fusion_method="rrf")
+            new_hybrid.load_from_metadata(hybrid_index_path)
+
+            self.assertEqual(new_hybrid.fusion_method, self.hybrid_retriever.fusion_method)
+            stats = new_hybrid.get_stats()
+            self.assertEqual(stats["vector_store"]["document_count"], len(self.test_documents))
+            self.assertEqual(stats["bm25_retriever"]["document_count"], len(self.test_documents))
+
 
 def run_hybrid_retriever_tests():
     """运行混合检索器测试"""
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+处理状态记录测试
+
+测试视频处理状态记录的各种行为：
+- 重新上传时原地重置记录
+- 不同视频之间的记录互不影响
+- 并发写入时读取到一致的快照
+- 日志条数上限
+"""
+
+import os
+import sys
+import threading
+import unittest
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from deploy.core.processing_status import LOG_MAXLEN, ProcessingRecord, reset_record
+
+
+class TestProcessingStatus(unittest.TestCase):
+    """处理状态记录测试类"""
+
+    def test_reset_creates_record(self):
+        """没有记录时新建并登记"""
+        status_map = {}
+        record = reset_record(status_map, "video_a", current_step="开始处理视频")
+
+        self.assertIsInstance(record, ProcessingRecord)
+        self.assertIs(status_map["video_a"], record)
+        self.assertEqual(record.video_id, "video_a")
+        self.assertEqual(record["current_step"], "开始处理视频")
+        self.assertEqual(record["status"], "processing")
+
+    def test_reupload_during_processing_keeps_record(self):
+        """处理过程中重新上传同一视频，后台任务继续写入界面读取的同一条记录"""
+        status_map = {}
+        job_record = reset_record(status_map, "video_a", current_step="开始处理视频")
+        job_record.update(current_step="识别中...", progress=0.5)
+        job_record.log("开始语音识别")
+
+        # 重新上传：原地重置，而不是换成新记录
+        record = reset_record(status_map, "video_a", current_step="开始处理视频")
+        self.assertIs(record, job_record)
+        self.assertIs(status_map["video_a"], job_record)
+
+        # 后台任务之后的写入在界面读取的快照中可见
+        job_record.update(current_step="处理完成", progress=1.0, status="completed")
+        state = status_map["video_a"].snapshot()
+        self.assertEqual(state["progress"], 1.0)
+        self.assertEqual(state["status"], "completed")
+
+    def test_records_are_per_video(self):
+        """不同视频各自持有独立的记录"""
+        status_map = {}
+        record_a = reset_record(status_map, "video_a")
+        record_b = reset_record(status_map, "video_b")
+        self.assertIsNot(record_a, record_b)
+
+        record_a.update(progress=0.8)
+        record_a.log("视频A的日志")
+        self.assertEqual(record_b["progress"], 0.0)
+        self.assertEqual(list(record_b["log_messages"]), [])
+
+        # 重置视频B不影响视频A
+        reset_record(status_map, "video_b", current_step="重新开始")
+        self.assertEqual(record_a["progress"], 0.8)
+        self.assertEqual(len(record_a["log_messages"]), 1)
+
+    def test_snapshot_consistent_during_writes(self):
+        """另一线程持续写入时，快照中的多个字段始终来自同一次更新"""
+        record = reset_record({}, "video_a")
+        stop = threading.Event()
+
+        def writer():
+            i = 0
+            while not stop.is_set():
+                i += 1
+                record.update(progress=float(i), current_step=f"step {i}")
+                record.log(f"log {i}")
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        try:
+            for _ in range(2000):
+                state = record.snapshot()
+                if state["progress"]:
+                    self.assertEqual(state["current_step"], f"step {int(state['progress'])}")
+                self.assertIsInstance(state["log_messages"], list)
+                self.assertLessEqual(len(state["log_messages"]), LOG_MAXLEN)
+        finally:
+            stop.set()
+            thread.join()
+
+    def test_snapshot_is_copy(self):
+        """快照不随记录之后的写入变化"""
+        record = reset_record({}, "video_a")
+        record.log("第一条")
+        record.add_transcript_part("第一段")
+
+        state = record.snapshot()
+        record.log("第二条")
+        record.add_transcript_part("第二段")
+        record.update(progress=0.5)
+
+        self.assertEqual(len(state["log_messages"]), 1)
+        self.assertEqual(state["transcript_parts"], ["第一段"])
+        self.assertEqual(state["progress"], 0.0)
+
+    def test_log_limit(self):
+        """日志最多保留 LOG_MAXLEN 条，超出时丢弃最早的"""
+        self.assertEqual(LOG_MAXLEN, 200)
+        record = reset_record({}, "video_a")
+        for i in range(LOG_MAXLEN + 50):
+            record.log(f"message {i}")
+
+        logs = record.snapshot()["log_messages"]
+        self.assertEqual(len(logs), LOG_MAXLEN)
+        self.assertTrue(logs[0].endswith("message 50"))
+        self.assertTrue(logs[-1].endswith(f"message {LOG_MAXLEN + 49}"))
+
+        # 重置后日志清空，上限不变
+        reset_record({"video_a": record}, "video_a")
+        self.assertEqual(len(record["log_messages"]), 0)
+        self.assertEqual(record["log_messages"].maxlen, LOG_MAXLEN)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+进度变更通知测试
+
+测试进度通知器的各种行为：
+- 其他线程调用 notify 时唤醒等待方
+- 没有变化时按超时返回
+- 等待前已有变化时立即返回
+- 不同视频的通知互不影响
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+import unittest
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from deploy.core.progress_events import ProgressNotifier
+
+
+class TestProgressNotifier(unittest.TestCase):
+    """进度通知器测试类"""
+
+    def setUp(self):
+        self.notifier = ProgressNotifier()
+
+    def test_notify_from_other_thread_wakes_waiter(self):
+        """后台线程调用 notify 后，等待中的协程立即返回新版本号"""
+        async def wait():
+            timer = threading.Timer(0.05, self.notifier.notify, args=("video_a",))
+            timer.start()
+            start = time.monotonic()
+            version = await self.notifier.wait_for_change("video_a", 0, timeout=5)
+            return version, time.monotonic() - start
+
+        version, elapsed = asyncio.run(wait())
+        self.assertEqual(version, 1)
+        self.assertLess(elapsed, 2)
+        self.assertEqual(self.notifier._waiters, {})
+
+    def test_timeout_without_change(self):
+        """没有变化时超时返回原版本号，并移除等待登记"""
+        async def wait():
+            start = time.monotonic()
+            version = await self.notifier.wait_for_change("video_a", 0, timeout=0.05)
+            return version, time.monotonic() - start
+
+        version, elapsed = asyncio.run(wait())
+        self.assertEqual(version, 0)
+        self.assertGreaterEqual(elapsed, 0.04)
+        self.assertEqual(self.notifier._waiters, {})
+
+    def test_returns_immediately_when_already_changed(self):
+        """等待前版本号已变化时不等待"""
+        self.notifier.notify("video_a")
+        self.notifier.notify("video_a")
+
+        version = asyncio.run(self.notifier.wait_for_change("video_a", 0, timeout=5))
+        self.assertEqual(version, 2)
+        self.assertEqual(self.notifier.version("video_a"), 2)
+
+    def test_notify_other_video_does_not_wake(self):
+        """其他视频的通知不会唤醒等待方"""
+        async def wait():
+            timer = threading.Timer(0.01, self.notifier.notify, args=("video_b",))
+            timer.start()
+            return await self.notifier.wait_for_change("video_a", 0, timeout=0.1)
+
+        self.assertEqual(asyncio.run(wait()), 0)
+        self.assertEqual(self.notifier.version("video_b"), 1)
+
+    def test_notify_ignores_empty_video_id(self):
+        """没有视频ID的记录不计版本"""
+        self.notifier.notify(None)
+        self.notifier.notify("")
+        self.assertEqual(self.notifier._versions, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
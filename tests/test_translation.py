@@ -9,6 +9,7 @@
 - 批量翻译
 - 转录结果翻译
 - 翻译缓存
+- 持久化翻译缓存
 """
 
 import os
@@ -21,6 +22,7 @@ from pathlib import Path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from modules.text.translator import TextTranslator, TranslationResult, translate_text, translate_for_embedding
+from modules.text.translation_cache import TranslationCache
 
 
 class TestTranslation(unittest.TestCase):
@@ -268,6 +270,70 @@ class TestTranslation(unittest.TestCase):
         
         print("✅ 翻译缓存测试通过")
     
+    def test_persistent_cache_round_trip(self):
+        """测试持久化翻译缓存的写入和读取"""
+        print("\n=== 测试持久化翻译缓存 ===")
+        
+        db_path = self.test_cache_dir / "test_translate_cache.sqlite"
+        if db_path.exists():
+            db_path.unlink()
+        cache = TranslationCache(db_path)
+        
+        try:
+            self.assertIsNone(cache.get("深度学习", "zh", "en"))
+            
+            cache.set("深度学习", "zh", "en", "Deep learning", 0.9, "deep-translator")
+            self.assertEqual(cache.get("深度学习", "zh", "en"), ("Deep learning", 0.9, "deep-translator"))
+            
+            # 语言对不同时不命中
+            self.assertIsNone(cache.get("深度学习", "zh", "ja"))
+            
+            # 同一文件重新打开后仍可命中
+            reopened = TranslationCache(db_path)
+            self.assertEqual(reopened.get("深度学习", "zh", "en")[0], "Deep learning")
+            reopened._conn.close()
+        finally:
+            cache._conn.close()
+            db_path.unlink()
+        
+        print("✅ 持久化翻译缓存测试通过")
+    
+    def test_cached_method_tagging(self):
+        """测试缓存命中结果的翻译方法标记"""
+        print("\n=== 测试缓存命中标记 ===")
+        
+        # 默认不开启持久化缓存
+        translator = TextTranslator(default_method="mock")
+        self.assertIsNone(translator.persistent_cache)
+        
+        # 内存缓存命中：在原方法名后追加 _cached，且不修改缓存中的原结果
+        result1 = translator.translate("神经网络", target_lang="en")
+        result2 = translator.translate("神经网络", target_lang="en")
+        self.assertEqual(result2.translation_method, f"{result1.translation_method}_cached")
+        self.assertFalse(result1.translation_method.endswith("_cached"))
+        self.assertEqual(result1.translated_text, result2.translated_text)
+        
+        # 持久化缓存命中：返回缓存中的译文，并同样带 _cached 标记
+        db_path = self.test_cache_dir / "test_translate_tagging.sqlite"
+        if db_path.exists():
+            db_path.unlink()
+        cache = TranslationCache(db_path)
+        try:
+            cache.set("人工智能", "zh", "en", "Artificial intelligence", None, "deep-translator")
+            translator.persistent_cache = cache
+            result3 = translator.translate("人工智能", target_lang="en", source_lang="zh")
+            self.assertEqual(result3.translated_text, "Artificial intelligence")
+            self.assertEqual(result3.translation_method, "deep-translator_cached")
+            
+            # 模拟翻译的结果不写入持久化缓存
+            translator.translate("机器学习", target_lang="en", source_lang="zh")
+            self.assertIsNone(cache.get("机器学习", "zh", "en"))
+        finally:
+            cache._conn.close()
+            db_path.unlink()
+        
+        print("✅ 缓存命中标记测试通过")
+    
     def test_convenience_functions(self):
         """测试便捷函数"""
         print("\n=== 测试便捷函数 ===")